@@ -1,66 +1,270 @@
-"""Orchestrator: choose which cloud provider modules to run based on Pulumi config.
-This script keeps imports lazy so unused providers don't need to be installed when not used.
+"""Orchestrator: the AWS stage, then Confluent and Databricks once their roles exist.
+
+The provider SDKs are imported when their stage runs, a first run never loads
+the Confluent and Databricks SDKs. `profileEvaluation` logs the time of every
+import, create_* step and invoke (see profiler.py).
 """
 
+import lob
+import profiler
+import pulumi
 import resources_manager as resources
-import resources_aws as aws
-import resources_confluent as cflt
-import resources_databricks as dbx
+import sources
+import stages
+from typing import Callable
+
+PROFILER = profiler.Profiler()
 
 
 def main():
-    rsm = resources.ResourcesManager()
-    aws.create_networking(rsm)
-    aws.create_kms_key(rsm)
-    aws.create_rds_oracle(rsm)
-    aws.create_s3_bucket(rsm)
-    aws.create_tableflow_access_policy(rsm)
-
-    topicNames = [
-        "rds1.ADMIN.PHARMA_DOSE_REGIMENS",
-        "rds1.ADMIN.PHARMA_EVENT",
-        "rds1.ADMIN.PHARMA_NOTES_ATTACH",
-    ]
+    rsm = _step("ResourcesManager", resources.ResourcesManager)
+    if rsm.config.profile_evaluation:
+        # invokes stay unwrapped unless they are reported
+        PROFILER.instrument_invokes(pulumi.runtime)
+    aws = PROFILER.load("pulumi_aws", "resources_aws")
+    _step("aws.create_networking", aws.create_networking, rsm)
+    _step("aws.create_kms_key", aws.create_kms_key, rsm)
+    for source in rsm.config.sources:
+        _step(f"aws.create_rds_oracle[{source.name}]", aws.create_rds_oracle, rsm, source)
+    _step("aws.create_s3_bucket", aws.create_s3_bucket, rsm)
+    if lob.offload_tables(rsm.table_catalog):
+        for source in rsm.config.sources:
+            _step(
+                f"aws.create_lob_offload_role[{source.name}]",
+                aws.create_lob_offload_role,
+                rsm,
+                source,
+            )
+    _step("aws.create_tableflow_access_policy", aws.create_tableflow_access_policy, rsm)
 
     run_stage_2 = True
+    if run_stage_2:
+        # the role lookups, cached for the checks below
+        _step("rsm.stage_2_probes", rsm.stage_2_probes)
     if (
         run_stage_2
         and rsm.tableflow_access_role_exists()
         and rsm.databricks_access_role_exists()
     ):
-        dbx.create_service_principal(rsm)
-        dbx.create_storage_credentials(rsm)
-        aws.update_dbx_access_role(rsm)
-
-        cflt.create_environment(rsm)
-        cflt.create_standard_cluster(rsm)
-        cflt.create_service_account(rsm)
-        cflt.create_provider_integration(rsm)
-        aws.update_tableflow_access_role(rsm)
-
-        for topicName in topicNames:
-            cflt.create_tableflow_topic(rsm, topicName)
-
-        cflt.create_xstream_connector(rsm)
-
-        dbx.create_catalog(rsm)
-        dbx.create_external_storage(rsm)
-        cflt.create_unity_integration(rsm)
+        graph = stage_2_graph(rsm)
+        if rsm.config.print_step_graph and pulumi.runtime.is_dry_run():
+            graph.validate()
+            pulumi.log.info(graph.describe())
+        _run_with_waits(rsm, graph)
     else:
         # we create those deny all roles on the first run so that we can reference them later
         # this is a chicken and egg problem with these roles as both Confluent and Databricks
         # need the reference to bind the resources on their end before being able to provide
         # the external id for the final role setup (done in stage 2)
-        rsm.aws_tableflow_access_role = aws.create_deny_all_assume_role(
+        rsm.aws_tableflow_access_role = _step(
+            "aws.create_deny_all_assume_role",
+            aws.create_deny_all_assume_role,
             rsm,
             rsm.tableflow_access_role_name,
             "Role for Confluent Tableflow to access S3 bucket",
         )
-        rsm.aws_databricks_access_role = aws.create_deny_all_assume_role(
+        rsm.aws_databricks_access_role = _step(
+            "aws.create_deny_all_assume_role",
+            aws.create_deny_all_assume_role,
             rsm,
             rsm.dbx_access_role_name,
             "Role for Databricks to access S3 bucket",
         )
 
+    if rsm.config.profile_evaluation:
+        pulumi.log.info(PROFILER.report())
+
+
+def stage_2_graph(rsm: resources.ResourcesManager) -> stages.StepGraph:
+    """Declare the stage 2 steps with the ResourcesManager attributes they use."""
+    env = "cflt_environment"
+    cluster = "cflt_kafka_cluster"
+    sp = "dbx_service_principal"
+    aws = PROFILER.load("pulumi_aws", "resources_aws")
+    cflt = PROFILER.load("pulumi_confluentcloud", "resources_confluent")
+    dbx = PROFILER.load("pulumi_databricks", "resources_databricks")
+    return stages.StepGraph(
+        [
+            stages.Step(
+                "dbx.create_service_principal",
+                lambda: dbx.create_service_principal(rsm),
+                provides=(sp, "dbx_service_principal_secret"),
+            ),
+            stages.Step(
+                "dbx.create_storage_credentials",
+                lambda: dbx.create_storage_credentials(rsm),
+                needs=(sp,),
+                provides=("dbx_storage_credentials",),
+            ),
+            stages.Step(
+                "aws.update_dbx_access_role",
+                lambda: aws.update_dbx_access_role(rsm),
+                needs=("aws_tableflow_access_policy", "dbx_storage_credentials"),
+                provides=("aws_databricks_access_role",),
+            ),
+            stages.Step(
+                "cflt.create_environment",
+                lambda: cflt.create_environment(rsm),
+                provides=(env,),
+            ),
+            stages.Step(
+                "cflt.create_standard_cluster",
+                lambda: cflt.create_standard_cluster(rsm),
+                needs=(env,),
+                provides=(cluster,),
+                duration=300,
+            ),
+            stages.Step(
+                "cflt.create_service_account",
+                lambda: cflt.create_service_account(rsm),
+                needs=(env, cluster),
+                provides=(
+                    "cflt_xstream_service_account",
+                    "cflt_xstream_service_account_env_admin_role",
+                    "cflt_xstream_service_account_kafka_api_key",
+                    "cflt_xstream_service_account_tableflow_api_key",
+                ),
+            ),
+            stages.Step(
+                "cflt.create_provider_integration",
+                lambda: cflt.create_provider_integration(rsm),
+                needs=(env, cluster),
+                provides=("cflt_s3_provider_integration",),
+            ),
+            stages.Step(
+                "aws.update_tableflow_access_role",
+                lambda: aws.update_tableflow_access_role(rsm),
+                needs=("aws_tableflow_access_policy", "cflt_s3_provider_integration"),
+                provides=("aws_tableflow_access_role",),
+            ),
+            stages.Step(
+                "cflt.create_tableflow_topics",
+                _per_source(
+                    rsm,
+                    lambda source: cflt.create_tableflow_topics(
+                        rsm, rsm.table_catalog, source
+                    ),
+                ),
+                needs=(
+                    env,
+                    cluster,
+                    "cflt_xstream_service_account_kafka_api_key",
+                    "cflt_xstream_service_account_tableflow_api_key",
+                    "aws_tableflow_bucket",
+                    "cflt_s3_provider_integration",
+                ),
+                provides=("cflt_kafka_topics",),
+                # Tableflow assumes the role, its trust policy has to be in place
+                waits_for=("aws_tableflow_access_role",),
+                duration=60,
+            ),
+            stages.Step(
+                "cflt.create_xstream_connector",
+                _per_source(
+                    rsm,
+                    lambda source: cflt.create_xstream_connector(
+                        rsm, rsm.table_catalog.qualified_names(), source
+                    ),
+                ),
+                needs=(
+                    "aws_rds_instances",
+                    "aws_tableflow_bucket",
+                    env,
+                    cluster,
+                    "cflt_xstream_service_account",
+                    "cflt_xstream_service_account_env_admin_role",
+                ),
+                provides=("cflt_xstream_connector", "cflt_xstream_connectors"),
+                # the connector would auto-create single partition topics
+                waits_for=("cflt_kafka_topics",),
+                duration=120,
+            ),
+            stages.Step(
+                "dbx.create_catalog",
+                lambda: dbx.create_catalog(rsm),
+                needs=(sp,),
+                provides=("dbx_catalog",),
+            ),
+            stages.Step(
+                "dbx.create_external_storage",
+                lambda: dbx.create_external_storage(rsm),
+                needs=(
+                    sp,
+                    "aws_databricks_access_role",
+                    "aws_tableflow_bucket",
+                    "dbx_storage_credentials",
+                ),
+                provides=("dbx_external_location",),
+            ),
+            stages.Step(
+                "cflt.create_unity_integration",
+                lambda: cflt.create_unity_integration(rsm),
+                needs=(
+                    "dbx_catalog",
+                    sp,
+                    "dbx_service_principal_secret",
+                    env,
+                    cluster,
+                    "cflt_xstream_service_account_tableflow_api_key",
+                ),
+                provides=("cflt_unity_integration",),
+                # Unity reads the tables through the external location
+                waits_for=("dbx_external_location",),
+            ),
+            stages.Step(
+                "dbx.create_table_grants",
+                lambda: dbx.create_table_grants(rsm, rsm.table_catalog),
+                needs=("dbx_catalog", cluster, "cflt_unity_integration"),
+            ),
+        ],
+        available=(
+            "aws_rds_instances",
+            "aws_tableflow_bucket",
+            "aws_tableflow_access_policy",
+        ),
+    )
+
+
+def _step(name: str, create: Callable, *args):
+    """Run a create_* function, timed as a step."""
+    return PROFILER.call("step", name, create, *args)
+
+
+def _per_source(
+    rsm: resources.ResourcesManager, create: Callable[[sources.Source], None]
+) -> Callable[[], None]:
+    """Step running a create_* function once per source."""
+
+    def run():
+        for source in rsm.config.sources:
+            create(source)
+
+    return run
+
+
+def _run_with_waits(rsm: resources.ResourcesManager, graph: stages.StepGraph):
+    """Run the graph, adding depends_on only for the steps' waits_for."""
+    current: list[stages.Step] = []
+
+    def add_waits(args: pulumi.ResourceTransformationArgs):
+        if not current or not current[0].waits_for:
+            return None
+        depends_on = []
+        for attr in current[0].waits_for:
+            value = getattr(rsm, attr)
+            depends_on.extend(value if isinstance(value, list) else [value])
+        return pulumi.ResourceTransformationResult(
+            args.props,
+            pulumi.ResourceOptions.merge(
+                args.opts, pulumi.ResourceOptions(depends_on=depends_on)
+            ),
+        )
+
+    def enter(step: stages.Step):
+        current[:] = [step]
+
+    pulumi.runtime.register_stack_transformation(add_waits)
+    graph.run(before_step=enter, run_step=lambda step: _step(step.name, step.run))
+
 
 __main__ = main()
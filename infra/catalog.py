@@ -0,0 +1,427 @@
+"""Declarative catalog of the captured Oracle tables.
+
+The catalog (tables.yaml by default, JSON is accepted as well) describes per
+table the topic settings (including compaction, see compaction.py), the
+Tableflow formats, the Unity grants, the LOB
+capture strategy (see lob.py), the captured columns and the message key (see
+message_keys.py). Entries inherit from a
+`defaults` block so large catalogs stay short:
+
+    defaults:
+      schema: ADMIN
+      topic:
+        compaction:
+          policy: compact
+      tableflow:
+        formats: [ICEBERG, DELTA]
+    tables:
+      - name: PHARMA_EVENT
+        topic:
+          compaction:
+            policy: compact,delete
+            retentionMs: 2592000000
+      - name: PHARMA_NOTES_ATTACH
+        tableflow:
+          formats: [DELTA]
+          retentionMs: 86400000
+        columns:
+          exclude: [NOTE_TEXT]
+
+Loading is memoised per file, duplicate entries are dropped and equal settings
+share one instance, so the planning done by the resource modules runs once per
+distinct setting instead of once per table.
+"""
+
+import dataclasses
+import functools
+import json
+import os
+import re
+
+import oracle_schema
+
+DEFAULT_CATALOG_PATH = "tables.yaml"
+TABLE_FORMATS = ("ICEBERG", "DELTA")
+LOB_STRATEGIES = ("inline", "skip", "offload")
+CLEANUP_POLICIES = ("compact", "compact,delete", "delete")
+KEY_STRATEGIES = ("pk", "business", "composite")
+DEFAULT_LOB_THRESHOLD_BYTES = 256 * 1024
+# Tableflow expires snapshots (Iceberg) and versions (Delta) after 7 days
+DEFAULT_TABLEFLOW_RETENTION_MS = 7 * 24 * 3600 * 1000
+
+
+@dataclasses.dataclass(frozen=True)
+class Grant:
+    principal: str
+    privileges: tuple[str, ...]
+
+
+@dataclasses.dataclass(frozen=True)
+class CompactionSettings:
+    """Cleanup policy and retention of the topic, see compaction.py."""
+
+    policy: str = "compact"
+    # retention of the delete part of a compact,delete or delete policy
+    retention_ms: int | None = None
+    # how long tombstones of deleted rows are kept after compaction
+    delete_retention_ms: int | None = None
+    min_compaction_lag_ms: int | None = None
+    max_compaction_lag_ms: int | None = None
+    # overrides the segment roll planned from the table profile
+    segment_ms: int | None = None
+
+
+@dataclasses.dataclass(frozen=True)
+class TopicSettings:
+    """Topic overrides, partitions and config are planned when not set.
+
+    Entries of `config` take precedence over the compaction settings.
+    """
+
+    partitions: int | None = None
+    config: tuple[tuple[str, str], ...] = ()
+    compaction: CompactionSettings = CompactionSettings()
+
+
+@dataclasses.dataclass(frozen=True)
+class TableflowSettings:
+    """Tableflow formats and snapshot retention, see tableflow.py for the cost."""
+
+    formats: tuple[str, ...] = TABLE_FORMATS
+    retention_ms: int | None = None
+
+
+@dataclasses.dataclass(frozen=True)
+class LobSettings:
+    """LOB capture strategy, see lob.py."""
+
+    strategy: str = "inline"
+    threshold_bytes: int = -1
+
+
+@dataclasses.dataclass(frozen=True)
+class ColumnSettings:
+    """Column projection, either include or exclude is set (bare column names)."""
+
+    include: tuple[str, ...] = ()
+    exclude: tuple[str, ...] = ()
+
+
+@dataclasses.dataclass(frozen=True)
+class KeySettings:
+    """Message key, the primary key or business columns (see message_keys.py)."""
+
+    strategy: str = "pk"
+    columns: tuple[str, ...] = ()
+
+
+@dataclasses.dataclass(frozen=True)
+class TableSpec:
+    """One captured table and the resources derived from it."""
+
+    name: str
+    schema: str
+    topic: TopicSettings
+    tableflow: TableflowSettings
+    grants: tuple[Grant, ...] = ()
+    lob: LobSettings = LobSettings()
+    columns: ColumnSettings = ColumnSettings()
+    key: KeySettings = KeySettings()
+
+    @property
+    def qualified_name(self) -> str:
+        """<schema>.<table> as used by the connector include list."""
+        return f"{self.schema}.{self.name}"
+
+    def topic_name(self, topic_prefix: str) -> str:
+        """Topic the connector writes the table to."""
+        return f"{topic_prefix}.{self.qualified_name}"
+
+    def excluded_columns(self, table: oracle_schema.Table) -> tuple[str, ...]:
+        """Columns of the table definition the connector drops."""
+        if self.columns.include:
+            return tuple(
+                name
+                for name in table.column_names
+                if name not in self.columns.include and name not in table.primary_key
+            )
+        return self.columns.exclude
+
+
+class TableCatalog:
+    """Deduplicated, ordered set of table specs."""
+
+    def __init__(self, tables: list[TableSpec]):
+        by_name: dict[str, TableSpec] = {}
+        for table in tables:
+            existing = by_name.get(table.qualified_name)
+            if existing is not None and existing != table:
+                raise ValueError(
+                    f"Table {table.qualified_name} is declared twice with different settings"
+                )
+            by_name[table.qualified_name] = table
+        self.tables: tuple[TableSpec, ...] = tuple(by_name.values())
+        # keyed by <schema>.<table>, a bare name may be in several schemas
+        self._lookup: dict[str, TableSpec] = by_name
+        self._schemas: dict[str, list[str]] = {}
+        for table in self.tables:
+            self._schemas.setdefault(table.name, []).append(table.qualified_name)
+
+    def __iter__(self):
+        return iter(self.tables)
+
+    def __len__(self) -> int:
+        return len(self.tables)
+
+    def qualified_names(self) -> list[str]:
+        return [t.qualified_name for t in self.tables]
+
+    def topic_names(self, topic_prefix: str) -> list[str]:
+        return [t.topic_name(topic_prefix) for t in self.tables]
+
+    def get(self, table_name: str) -> TableSpec | None:
+        """Look a table up by qualified or bare name.
+
+        Raises ValueError for a bare name declared in several schemas.
+        """
+        key = table_name.upper()
+        if "." not in key:
+            qualified_names = self._schemas.get(key, [])
+            if len(qualified_names) > 1:
+                raise ValueError(
+                    f"Table {table_name} is in several schemas, use one of "
+                    f"{', '.join(qualified_names)}"
+                )
+            key = qualified_names[0] if qualified_names else key
+        return self._lookup.get(key)
+
+    def require(self, table_name: str) -> TableSpec:
+        """Like get, but raise KeyError for tables missing in the catalog."""
+        table = self.get(table_name)
+        if table is None:
+            raise KeyError(f"Table {table_name} is not in the table catalog")
+        return table
+
+
+def validate_columns(
+    tables: TableCatalog, schema: dict[str, oracle_schema.Table]
+):
+    """Raise ValueError for projected columns missing in sql/schema.sql."""
+    errors = []
+    for spec in tables:
+        table = schema.get(spec.name)
+        if table is None:
+            errors.append(f"{spec.qualified_name} is not defined in the schema")
+            continue
+        for name in spec.columns.include + spec.columns.exclude:
+            if name not in table.column_names:
+                errors.append(f"{spec.qualified_name} has no column {name}")
+        for name in set(spec.columns.exclude) & set(table.primary_key):
+            errors.append(
+                f"{spec.qualified_name}: primary key column {name} cannot be excluded"
+            )
+        excluded = spec.excluded_columns(table)
+        for name in spec.key.columns:
+            if name not in table.column_names:
+                errors.append(f"{spec.qualified_name} has no key column {name}")
+            elif name in excluded:
+                errors.append(
+                    f"{spec.qualified_name}: key column {name} is not captured"
+                )
+            elif table.column(name).is_lob:
+                errors.append(
+                    f"{spec.qualified_name}: LOB column {name} cannot be a key column"
+                )
+    if errors:
+        raise ValueError("Invalid column projection: " + "; ".join(errors))
+
+
+def column_exclude_list(
+    tables: list[TableSpec], schema: dict[str, oracle_schema.Table]
+) -> str:
+    """Connector column.exclude.list for the projections of the tables.
+
+    Include lists are turned into exclude lists so tables without projection
+    keep all columns in the same connector.
+    """
+    patterns = []
+    for spec in tables:
+        excluded = spec.excluded_columns(schema[spec.name])
+        if excluded:
+            patterns.append(
+                re.escape(f"{spec.qualified_name}.")
+                + f"({'|'.join(excluded)})"
+            )
+    return ",".join(patterns)
+
+
+def parse_catalog(data: dict) -> TableCatalog:
+    """Build a catalog from the decoded catalog document."""
+    defaults = data.get("defaults") or {}
+    interned: dict = {}
+    tables = []
+    for entry in data.get("tables") or []:
+        if isinstance(entry, str):
+            entry = {"name": entry}
+        tables.append(_parse_table(entry, defaults, interned))
+    return TableCatalog(tables)
+
+
+def load_catalog(path: str = DEFAULT_CATALOG_PATH) -> TableCatalog:
+    """Load the catalog file, memoised on path and modification time."""
+    return _load_catalog(os.path.abspath(path), os.stat(path).st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_catalog(path: str, mtime_ns: int) -> TableCatalog:
+    with open(path, "r") as f:
+        if path.endswith(".json"):
+            data = json.load(f)
+        else:
+            # pyyaml is installed as a dependency of the pulumi sdk
+            import yaml
+
+            data = yaml.safe_load(f)
+    return parse_catalog(data or {})
+
+
+def _intern(interned: dict, value):
+    """Share one instance between equal settings."""
+    return interned.setdefault(value, value)
+
+
+def _parse_table(entry: dict, defaults: dict, interned: dict) -> TableSpec:
+    if "name" not in entry:
+        raise ValueError(f"Catalog entry without name: {entry}")
+    topic = {**(defaults.get("topic") or {}), **(entry.get("topic") or {})}
+    topic_config = {
+        **((defaults.get("topic") or {}).get("config") or {}),
+        **((entry.get("topic") or {}).get("config") or {}),
+    }
+    tableflow = {**(defaults.get("tableflow") or {}), **(entry.get("tableflow") or {})}
+    formats = tuple(f.upper() for f in tableflow.get("formats") or TABLE_FORMATS)
+    unknown = set(formats) - set(TABLE_FORMATS)
+    if unknown or not formats:
+        raise ValueError(
+            f"{entry['name']}: table formats must be a subset of {TABLE_FORMATS}"
+        )
+    retention_ms = tableflow.get("retentionMs")
+    if retention_ms is not None and int(retention_ms) <= 0:
+        raise ValueError(f"{entry['name']}: Tableflow retentionMs must be positive")
+    partitions = topic.get("partitions")
+    if partitions is not None and int(partitions) < 1:
+        raise ValueError(f"{entry['name']}: partitions must be at least 1")
+    compaction = _parse_compaction(
+        entry["name"],
+        {
+            **((defaults.get("topic") or {}).get("compaction") or {}),
+            **((entry.get("topic") or {}).get("compaction") or {}),
+        },
+    )
+
+    lob = {**(defaults.get("lob") or {}), **(entry.get("lob") or {})}
+    lob_strategy = str(lob.get("strategy") or "inline").lower()
+    if lob_strategy not in LOB_STRATEGIES:
+        raise ValueError(
+            f"{entry['name']}: LOB strategy must be one of {LOB_STRATEGIES}"
+        )
+    lob_threshold = int(
+        lob.get(
+            "thresholdBytes",
+            -1 if lob_strategy == "inline" else DEFAULT_LOB_THRESHOLD_BYTES,
+        )
+    )
+    if lob_strategy != "inline" and lob_threshold <= 0:
+        raise ValueError(f"{entry['name']}: LOB thresholdBytes must be positive")
+
+    columns = {**(defaults.get("columns") or {}), **(entry.get("columns") or {})}
+    include = tuple(str(c).upper() for c in columns.get("include") or ())
+    exclude = tuple(str(c).upper() for c in columns.get("exclude") or ())
+    if include and exclude:
+        raise ValueError(
+            f"{entry['name']}: set either columns.include or columns.exclude"
+        )
+
+    key = {**(defaults.get("key") or {}), **(entry.get("key") or {})}
+    key_strategy = str(key.get("strategy") or "pk").lower()
+    key_columns = tuple(str(c).upper() for c in key.get("columns") or ())
+    if key_strategy not in KEY_STRATEGIES:
+        raise ValueError(f"{entry['name']}: key strategy must be one of {KEY_STRATEGIES}")
+    if (key_strategy == "pk") == bool(key_columns):
+        raise ValueError(
+            f"{entry['name']}: key columns are required for business and composite "
+            "keys and not allowed for pk"
+        )
+    cleanup_policy = topic_config.get("cleanup.policy", compaction.policy)
+    if key_strategy == "business" and "compact" in str(cleanup_policy):
+        # compaction keeps one row per business key, use composite instead
+        raise ValueError(
+            f"{entry['name']}: business keys are not unique, use a composite key "
+            "on compacted topics"
+        )
+
+    grants = entry.get("grants", defaults.get("grants")) or []
+    return TableSpec(
+        name=str(entry["name"]).upper(),
+        schema=str(entry.get("schema") or defaults.get("schema") or "ADMIN").upper(),
+        topic=_intern(
+            interned,
+            TopicSettings(
+                partitions=int(partitions) if partitions is not None else None,
+                config=tuple(sorted((k, str(v)) for k, v in topic_config.items())),
+                compaction=_intern(interned, compaction),
+            ),
+        ),
+        tableflow=_intern(
+            interned,
+            TableflowSettings(
+                formats=formats,
+                retention_ms=int(retention_ms) if retention_ms is not None else None,
+            ),
+        ),
+        lob=_intern(interned, LobSettings(lob_strategy, lob_threshold)),
+        columns=_intern(interned, ColumnSettings(include, exclude)),
+        key=_intern(interned, KeySettings(key_strategy, key_columns)),
+        grants=tuple(
+            Grant(
+                principal=g["principal"],
+                privileges=tuple(p.upper() for p in g["privileges"]),
+            )
+            for g in grants
+        ),
+    )
+
+
+def _parse_compaction(table_name: str, values: dict) -> CompactionSettings:
+    policy = str(values.get("policy") or "compact").replace(" ", "").lower()
+    if policy not in CLEANUP_POLICIES:
+        raise ValueError(
+            f"{table_name}: compaction policy must be one of {CLEANUP_POLICIES}"
+        )
+    durations = {}
+    for key, field in (
+        ("retentionMs", "retention_ms"),
+        ("deleteRetentionMs", "delete_retention_ms"),
+        ("minCompactionLagMs", "min_compaction_lag_ms"),
+        ("maxCompactionLagMs", "max_compaction_lag_ms"),
+        ("segmentMs", "segment_ms"),
+    ):
+        if values.get(key) is None:
+            continue
+        durations[field] = int(values[key])
+        if durations[field] < 0:
+            raise ValueError(f"{table_name}: compaction {key} must not be negative")
+    if "retention_ms" in durations and policy == "compact":
+        raise ValueError(
+            f"{table_name}: compaction retentionMs needs policy compact,delete"
+        )
+    return CompactionSettings(policy=policy, **durations)
+
+
+if __name__ == "__main__":
+    # validate the catalog against sql/schema.sql and show the connector projection
+    tables = load_catalog()
+    schema = oracle_schema.load_schema()
+    validate_columns(tables, schema)
+    print(f"{len(tables)} tables, column.exclude.list:")
+    print(column_exclude_list(list(tables), schema) or "(none)")
@@ -0,0 +1,276 @@
+"""Confluent Cloud cluster tier planner for create_standard_cluster.
+
+Adds up what the deployment puts on the cluster (CDC and heartbeat topic
+partitions of every source, change throughput from `tableProfiles`, connector
+tasks) and picks the cheapest tier that holds it within TARGET_UTILIZATION:
+Basic, Standard, Enterprise (eCKUs scale on their own, the count is what the
+load needs) or Dedicated with a CKU count. The limits are the documented
+per-cluster quotas before replication, check them when Confluent changes them.
+
+`clusterTier` pins a tier (`auto` plans it) and `clusterMinTier` keeps the
+plan from recommending a smaller tier than the cluster already has, Confluent
+Cloud cannot downgrade a cluster in place:
+
+    python cluster_tiers.py
+    python cluster_tiers.py --stack dev --min-tier basic
+"""
+
+import argparse
+import dataclasses
+import math
+
+MB = 1000 * 1000
+AVAILABILITIES = ("SINGLE_ZONE", "MULTI_ZONE")
+# share of a limit the plan may use, the rest absorbs bursts and snapshots
+TARGET_UTILIZATION = 0.8
+# producer, admin and offset connections of a connector task to the brokers
+CONNECTIONS_PER_CONNECTOR_TASK = 20
+
+
+@dataclasses.dataclass(frozen=True)
+class Workload:
+    """Everything the deployment puts on the cluster, before replication."""
+
+    partitions: int
+    ingress_bytes_per_sec: float
+    egress_bytes_per_sec: float
+    connector_tasks: int
+
+    @property
+    def connections(self) -> int:
+        return self.connector_tasks * CONNECTIONS_PER_CONNECTOR_TASK
+
+    @classmethod
+    def total(cls, usages) -> "Workload":
+        """Sum of per-source usages (sources.SourceUsage)."""
+        return cls(
+            partitions=sum(u.partitions for u in usages),
+            ingress_bytes_per_sec=sum(u.ingress_bytes_per_sec for u in usages),
+            egress_bytes_per_sec=sum(u.egress_bytes_per_sec for u in usages),
+            connector_tasks=sum(u.connector_tasks for u in usages),
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class Tier:
+    """Limits of a cluster type, per (e)CKU for the scaling tiers."""
+
+    name: str
+    partitions: int
+    ingress_bytes_per_sec: float
+    egress_bytes_per_sec: float
+    connections: int
+    availabilities: tuple[str, ...]
+    # (e)CKU range of the scaling tiers, None for fixed-size tiers
+    max_units: int | None = None
+    # fewer CKUs are not offered across zones
+    min_multi_zone_units: int = 1
+
+    @property
+    def scales(self) -> bool:
+        return self.max_units is not None
+
+
+BASIC = Tier("basic", 4096, 250 * MB, 750 * MB, 1000, ("SINGLE_ZONE",))
+STANDARD = Tier("standard", 4096, 250 * MB, 750 * MB, 1000, AVAILABILITIES)
+ENTERPRISE = Tier(
+    "enterprise", 3000, 60 * MB, 180 * MB, 3000, ("MULTI_ZONE",), max_units=10
+)
+DEDICATED = Tier(
+    "dedicated",
+    4500,
+    50 * MB,
+    150 * MB,
+    18000,
+    AVAILABILITIES,
+    max_units=152,
+    min_multi_zone_units=2,
+)
+# cheapest first
+TIERS = (BASIC, STANDARD, ENTERPRISE, DEDICATED)
+TIER_NAMES = tuple(t.name for t in TIERS)
+
+
+@dataclasses.dataclass(frozen=True)
+class ClusterPlan:
+    tier: Tier
+    availability: str
+    # (e)CKUs of the scaling tiers
+    units: int | None
+    # used share per limit, e.g. {"partitions": 0.12}
+    utilization: dict[str, float]
+
+    @property
+    def description(self) -> str:
+        units = ""
+        if self.units is not None:
+            units = f" {self.units} {'eCKU' if self.tier is ENTERPRISE else 'CKU'}"
+        return f"{self.tier.name}{units} {self.availability}"
+
+    def cluster_args(self) -> dict:
+        """Tier and availability arguments of confluentcloud.KafkaCluster.
+
+        Imports the Confluent SDK, the planner itself runs without it.
+        """
+        import pulumi_confluentcloud as confluentcloud
+
+        if self.tier is DEDICATED:
+            assert self.units is not None, "a dedicated plan has a CKU count"
+            config = {"dedicated": confluentcloud.KafkaClusterDedicatedArgs(cku=self.units)}
+        elif self.tier is ENTERPRISE:
+            # the only tier argument that is a list
+            config = {"enterprises": [confluentcloud.KafkaClusterEnterpriseArgs()]}
+        elif self.tier is BASIC:
+            config = {"basic": confluentcloud.KafkaClusterBasicArgs()}
+        else:
+            config = {"standard": confluentcloud.KafkaClusterStandardArgs()}
+        return {"availability": self.availability, **config}
+
+
+def tier(name: str) -> Tier:
+    for candidate in TIERS:
+        if candidate.name == name:
+            return candidate
+    raise ValueError(f"Unknown cluster tier {name}, use one of {TIER_NAMES}")
+
+
+def utilization(workload: Workload, tier: Tier, units: int | None) -> dict[str, float]:
+    """Share of every limit of a tier (at a number of units) the workload uses."""
+    scale = units or 1
+    return {
+        "partitions": workload.partitions / (tier.partitions * scale),
+        "ingress": workload.ingress_bytes_per_sec / (tier.ingress_bytes_per_sec * scale),
+        "egress": workload.egress_bytes_per_sec / (tier.egress_bytes_per_sec * scale),
+        "connections": workload.connections / (tier.connections * scale),
+    }
+
+
+def units_needed(workload: Workload, tier: Tier, target: float) -> int:
+    """(e)CKUs that keep every limit of a scaling tier under the target share."""
+    peak = max(utilization(workload, tier, 1).values())
+    return max(1, math.ceil(peak / target - 1e-9))
+
+
+def fit(
+    workload: Workload, tier: Tier, availability: str, target: float
+) -> ClusterPlan | None:
+    """Plan on one tier, None if it cannot hold the workload within the target."""
+    if availability not in tier.availabilities:
+        if availability == "SINGLE_ZONE" and "MULTI_ZONE" in tier.availabilities:
+            # a multi-zone cluster serves a single-zone deployment too
+            availability = "MULTI_ZONE"
+        else:
+            return None
+    units = None
+    if tier.max_units is not None:
+        units = units_needed(workload, tier, target)
+        if availability == "MULTI_ZONE":
+            units = max(units, tier.min_multi_zone_units)
+        if units > tier.max_units:
+            return None
+    used = utilization(workload, tier, units)
+    if max(used.values()) > target:
+        return None
+    return ClusterPlan(tier, availability, units, used)
+
+
+def plan(
+    workload: Workload,
+    pinned: str | None = None,
+    minimum: str = STANDARD.name,
+    availability: str = "SINGLE_ZONE",
+    target: float = TARGET_UTILIZATION,
+) -> tuple[ClusterPlan, list[str]]:
+    """Cheapest tier from `minimum` up holding the workload, and warnings.
+
+    A `pinned` tier is used as long as the workload stays within its hard
+    limits, above the target share the plan carries a warning recommending the
+    tier that fits. Raises ValueError if no tier holds the workload.
+    """
+    if availability not in AVAILABILITIES:
+        raise ValueError(
+            f"Unknown availability {availability}, use one of {AVAILABILITIES}"
+        )
+    first = TIERS.index(tier(minimum))
+    recommended = None
+    for candidate in TIERS[first:]:
+        recommended = fit(workload, candidate, availability, target)
+        if recommended is not None:
+            break
+
+    if pinned is None or pinned == "auto":
+        if recommended is None:
+            raise ValueError(
+                f"{_describe(workload)} does not fit any cluster tier, "
+                "split the sources over several clusters"
+            )
+        return recommended, []
+
+    pinned_tier = tier(pinned)
+    chosen = fit(workload, pinned_tier, availability, target) or fit(
+        workload, pinned_tier, availability, 1.0
+    )
+    if chosen is None:
+        raise ValueError(
+            f"{_describe(workload)} exceeds a {pinned_tier.name} {availability} "
+            f"cluster, use clusterTier "
+            f"{recommended.tier.name if recommended else 'auto'}"
+        )
+    warnings = []
+    if max(chosen.utilization.values()) > target:
+        busiest = max(chosen.utilization, key=lambda limit: chosen.utilization[limit])
+        warnings.append(
+            f"{_describe(workload)} uses {chosen.utilization[busiest]:.0%} of the "
+            f"{busiest} of a {chosen.description} cluster, the plan recommends "
+            f"{recommended.description if recommended else 'several clusters'}"
+        )
+    return chosen, warnings
+
+
+def _describe(workload: Workload) -> str:
+    return (
+        f"{workload.partitions} partitions, "
+        f"{workload.ingress_bytes_per_sec / MB:,.1f} MB/s in, "
+        f"{workload.egress_bytes_per_sec / MB:,.1f} MB/s out, "
+        f"{workload.connector_tasks} connector tasks"
+    )
+
+
+if __name__ == "__main__":
+    import sources
+
+    parser = argparse.ArgumentParser(
+        description="Print the Confluent Cloud cluster tier the stack's load needs."
+    )
+    parser.add_argument("--stack")
+    parser.add_argument("--tier", help="pinned tier, defaults to clusterTier")
+    parser.add_argument("--min-tier", help="defaults to clusterMinTier")
+    parser.add_argument("--availability", help="defaults to clusterAvailability")
+    parser.add_argument(
+        "--readers", type=int, default=sources.DEFAULT_READERS, help="consumers per topic"
+    )
+    args = parser.parse_args()
+
+    config, stack_sources, usages = sources.usages_from_config(args.stack, args.readers)
+    workload = Workload.total(usages)
+    availability = args.availability or config.get("clusterAvailability") or "SINGLE_ZONE"
+    print(f"{len(usages)} sources: {_describe(workload)}")
+    for candidate in TIERS:
+        option = fit(workload, candidate, availability, TARGET_UTILIZATION)
+        if option is None:
+            print(f"  {candidate.name:<11} does not fit")
+            continue
+        used = ", ".join(f"{k} {v:.0%}" for k, v in option.utilization.items())
+        print(f"  {option.description:<28} {used}")
+    try:
+        chosen, warnings = plan(
+            workload,
+            args.tier or config.get("clusterTier"),
+            args.min_tier or config.get("clusterMinTier") or STANDARD.name,
+            availability,
+        )
+    except ValueError as e:
+        raise SystemExit(str(e))
+    for warning in warnings:
+        print(f"warning: {warning}")
+    print(f"provisioned: {chosen.description}")
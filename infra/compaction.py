@@ -0,0 +1,257 @@
+"""Compaction and retention of the CDC topics and their steady-state size.
+
+The `topic.compaction` block of the catalog sets the cleanup policy
+(`compact`, the hybrid `compact,delete` or `delete`), the retention of the
+delete part, the tombstone retention and the compaction lag of a topic. Deleted
+rows leave a tombstone only while the connector has `tombstones.on.delete`
+enabled, `delete.retention.ms` is set for those topics alone.
+
+Confluent Cloud runs the log cleaner with a fixed `min.cleanable.dirty.ratio`
+of 0.5: a partition is compacted once half of it holds superseded versions. A
+shorter segment roll and `maxCompactionLagMs` bound how long obsolete CLOB
+versions stay around; the calculator shows what a topic holds in steady state
+and what a consumer reading it from the start has to fetch:
+
+    python compaction.py
+    python compaction.py --stack dev --keys PHARMA_EVENT=5000000
+"""
+
+import argparse
+import dataclasses
+import math
+import os
+
+import catalog
+import offline_config
+import oracle_schema
+import redo
+import sizing
+
+# fixed on Confluent Cloud, cleaning starts at this share of dirty bytes
+DIRTY_RATIO = 0.5
+# topic configs the broker sets and Confluent Cloud does not let you change
+FIXED_CONFIGS = (
+    "min.cleanable.dirty.ratio",
+    "segment.jitter.ms",
+    "segment.index.bytes",
+    "file.delete.delay.ms",
+    "flush.messages",
+    "flush.ms",
+    "index.interval.bytes",
+    "preallocate",
+    "unclean.leader.election.enable",
+)
+# Kafka default, long enough for Tableflow and lagging consumers to see deletes
+DEFAULT_DELETE_RETENTION_MS = 24 * 3600 * 1000
+# Confluent Cloud limit for max.compaction.lag.ms
+MIN_MAX_COMPACTION_LAG_MS = 6 * 3600 * 1000
+# key, headers and record overhead of a tombstone
+TOMBSTONE_BYTES = 100
+# days of inserts making up the key count when it is not configured
+DEFAULT_KEY_DAYS = 30
+
+
+@dataclasses.dataclass(frozen=True)
+class TopicSize:
+    """Bytes a topic holds, over all partitions."""
+
+    # latest version of every live key
+    clean_bytes: float
+    # superseded versions not cleaned yet, at the cleaner threshold
+    dirty_bytes: float
+    # open segments and records within min.compaction.lag.ms, never compacted
+    uncompacted_bytes: float
+    tombstone_bytes: float
+
+    @property
+    def steady_bytes(self) -> float:
+        """Average size, the dirty part grows and shrinks with every cleaning."""
+        return (
+            self.clean_bytes
+            + self.dirty_bytes / 2
+            + self.uncompacted_bytes
+            + self.tombstone_bytes
+        )
+
+    @property
+    def max_bytes(self) -> float:
+        """Size right before a cleaning, what a rebootstrapping consumer reads."""
+        return (
+            self.clean_bytes
+            + self.dirty_bytes
+            + self.uncompacted_bytes
+            + self.tombstone_bytes
+        )
+
+
+def tombstones_on_delete(connector_config: dict[str, str]) -> bool:
+    return str(connector_config.get("tombstones.on.delete", "true")).lower() == "true"
+
+
+def topic_config(
+    settings: catalog.CompactionSettings, tombstones: bool
+) -> dict[str, str]:
+    """Topic config entries of the compaction settings."""
+    config = {"cleanup.policy": settings.policy}
+    compacted = "compact" in settings.policy
+    if settings.retention_ms is not None:
+        config["retention.ms"] = str(settings.retention_ms)
+    if settings.segment_ms is not None:
+        if settings.segment_ms < sizing.MIN_SEGMENT_MS:
+            raise ValueError(
+                f"segmentMs must be at least {sizing.MIN_SEGMENT_MS} on Confluent Cloud"
+            )
+        config["segment.ms"] = str(settings.segment_ms)
+    if not compacted:
+        return config
+
+    if tombstones:
+        config["delete.retention.ms"] = str(
+            settings.delete_retention_ms
+            if settings.delete_retention_ms is not None
+            else DEFAULT_DELETE_RETENTION_MS
+        )
+    elif settings.delete_retention_ms is not None:
+        raise ValueError(
+            "deleteRetentionMs has no effect, the connector writes no tombstones "
+            "(tombstones.on.delete is false)"
+        )
+    if settings.min_compaction_lag_ms is not None:
+        config["min.compaction.lag.ms"] = str(settings.min_compaction_lag_ms)
+    if settings.max_compaction_lag_ms is not None:
+        if settings.max_compaction_lag_ms < MIN_MAX_COMPACTION_LAG_MS:
+            raise ValueError(
+                f"maxCompactionLagMs must be at least {MIN_MAX_COMPACTION_LAG_MS} "
+                "on Confluent Cloud"
+            )
+        if settings.max_compaction_lag_ms < (settings.min_compaction_lag_ms or 0):
+            raise ValueError("maxCompactionLagMs must not be below minCompactionLagMs")
+        config["max.compaction.lag.ms"] = str(settings.max_compaction_lag_ms)
+    return config
+
+
+def validate_topic_config(topic_name: str, config: dict[str, str]):
+    """Raise ValueError for configs Confluent Cloud rejects."""
+    fixed = sorted(set(config) & set(FIXED_CONFIGS))
+    if fixed:
+        raise ValueError(
+            f"{topic_name}: {', '.join(fixed)} cannot be set on Confluent Cloud, "
+            "use segmentMs and maxCompactionLagMs to compact sooner"
+        )
+    policy = config.get("cleanup.policy", "delete").replace(" ", "")
+    if policy not in catalog.CLEANUP_POLICIES:
+        raise ValueError(f"{topic_name}: unknown cleanup.policy {policy}")
+
+
+def estimate(
+    workload: redo.TableWorkload,
+    live_keys: int,
+    partitions: int,
+    config: dict[str, str],
+) -> TopicSize:
+    """Steady-state size of a CDC topic from its change rate and key count.
+
+    Updates write the full row again, deletes the old row (rewrite mode) and a
+    tombstone. With `compact,delete` only keys written within `retention.ms`
+    stay live.
+    """
+    profile = workload.profile
+    record_bytes = profile.avg_row_bytes
+    inserts = profile.rows_per_second
+    updates = inserts * workload.update_pct / 100
+    deletes = inserts * workload.delete_pct / 100
+    write_bytes = (inserts + updates + deletes) * record_bytes + deletes * TOMBSTONE_BYTES
+
+    policy = config.get("cleanup.policy", "delete").replace(" ", "")
+    retention_s = _seconds(config, "retention.ms", 7 * 24 * 3600 * 1000)
+    segment_s = _seconds(config, "segment.ms", 7 * 24 * 3600 * 1000)
+    segment_bytes = int(config.get("segment.bytes", sizing.MAX_SEGMENT_BYTES))
+    open_segments = partitions * min(
+        segment_bytes, write_bytes / partitions * segment_s
+    )
+    if "compact" not in policy:
+        return TopicSize(0.0, 0.0, write_bytes * retention_s, 0.0)
+
+    if policy == "compact,delete":
+        live_keys = min(live_keys, math.ceil((inserts + updates) * retention_s))
+    clean = live_keys * record_bytes
+    dirty = clean * DIRTY_RATIO / (1 - DIRTY_RATIO)
+    if "max.compaction.lag.ms" in config:
+        # segments older than the lag are cleaned whatever the ratio
+        dirty = min(dirty, write_bytes * _seconds(config, "max.compaction.lag.ms", 0))
+    uncompacted = open_segments + write_bytes * _seconds(
+        config, "min.compaction.lag.ms", 0
+    )
+    tombstones = deletes * TOMBSTONE_BYTES * _seconds(
+        config, "delete.retention.ms", DEFAULT_DELETE_RETENTION_MS
+    )
+    size = TopicSize(clean, dirty, uncompacted, tombstones)
+    if policy == "compact,delete":
+        # nothing outlives the retention, compacted or not
+        cap = write_bytes * retention_s + open_segments
+        if size.max_bytes > cap:
+            scale = cap / size.max_bytes
+            size = TopicSize(
+                clean * scale, dirty * scale, uncompacted * scale, tombstones * scale
+            )
+    return size
+
+
+def _seconds(config: dict[str, str], key: str, default_ms: int) -> float:
+    return int(config.get(key, default_ms)) / 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Print the compaction settings and steady-state size of the CDC topics."
+    )
+    parser.add_argument("--stack")
+    parser.add_argument(
+        "--keys",
+        action="append",
+        metavar="TABLE=KEYS",
+        help="live keys per table, defaults to keyCardinality in tableProfiles "
+        f"or {DEFAULT_KEY_DAYS} days of inserts",
+    )
+    args = parser.parse_args()
+
+    config = offline_config.load_config(args.stack)
+    schema = oracle_schema.load_schema()
+    tables = catalog.load_catalog(
+        os.path.join(
+            offline_config.INFRA_DIR,
+            config.get("tableCatalog") or catalog.DEFAULT_CATALOG_PATH,
+        )
+    )
+    tombstones = tombstones_on_delete(offline_config.load_connector_defaults())
+    keys = {}
+    for entry in args.keys or []:
+        name, _, count = entry.partition("=")
+        keys[name.upper()] = int(count)
+
+    profiles = config.get("tableProfiles") or {}
+    for name, workload in redo.workloads_from_config(config, schema).items():
+        spec = tables.require(name)
+        plan = sizing.plan_topic(workload.profile)
+        topic = {
+            **plan.config,
+            **topic_config(spec.topic.compaction, tombstones),
+            **dict(spec.topic.config),
+        }
+        validate_topic_config(name, topic)
+        live_keys = keys.get(name) or profiles[name].get("keyCardinality")
+        if live_keys is None:
+            inserts = workload.profile.rows_per_second * 86400 * DEFAULT_KEY_DAYS
+            live_keys = math.ceil(inserts * (1 - workload.delete_pct / 100))
+        size = estimate(
+            workload,
+            int(live_keys),
+            spec.topic.partitions or plan.partitions,
+            topic,
+        )
+        print(
+            f"{name:<22} {topic['cleanup.policy']:<15} {int(live_keys):>12} keys  "
+            f"steady {size.steady_bytes / 2**30:9.1f} GiB  "
+            f"max {size.max_bytes / 2**30:9.1f} GiB  "
+            f"(dirty {size.dirty_bytes / 2**30:.1f} GiB)"
+        )
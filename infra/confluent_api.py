@@ -0,0 +1,294 @@
+"""Pooled client for the Confluent Cloud REST APIs.
+
+Requests go over keep-alive connections taken from a pool per host that all
+sessions share, so one `pulumi up` pays a TLS handshake per connection
+instead of one per call, and at most MAX_CONCURRENT_REQUESTS run against a
+host at once. Connection errors, 429 and 5xx responses are retried with
+bounded exponential backoff; a 429 waits for the `Retry-After` or
+`RateLimit-Reset` the API sends. A request on an idle connection the server
+has closed in the meantime is sent again on a new connection, POST included.
+Every response body is parsed once.
+
+GET responses are cached for the life of the session (one `pulumi up`) and
+dropped again when the resource or its collection is written. Reads that
+bypass the cache send the ETag of the cached response, a 304 reuses it.
+The base URL can point to a local stub server (http://127.0.0.1:<port>) for
+offline runs.
+"""
+
+import base64
+import dataclasses
+import http.client
+import json
+import random
+import threading
+import time
+import urllib.parse
+
+DEFAULT_BASE_URL = "https://api.confluent.cloud"
+DEFAULT_TIMEOUT_SECONDS = 30
+DEFAULT_RETRIES = 4
+BACKOFF_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 8
+# longest wait a rate limit response can ask for before the request fails
+MAX_RATE_LIMIT_WAIT_SECONDS = 60
+# idle connections kept and requests in flight per host
+POOL_SIZE = 4
+MAX_CONCURRENT_REQUESTS = 4
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# errors of an idle connection the server closed before it read the request
+CLOSED_BY_SERVER = (
+    http.client.RemoteDisconnected,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+
+class ApiError(Exception):
+    """A request failed with an error status after all retries."""
+
+    def __init__(self, method: str, path: str, status: int, body):
+        super().__init__(f"{method} {path} failed with {status}: {body}")
+        self.status = status
+        self.body = body
+
+
+@dataclasses.dataclass
+class _CachedResponse:
+    etag: str | None
+    body: dict | None
+
+
+class _HostPool:
+    """Idle keep-alive connections and the request limit of one host."""
+
+    def __init__(self, scheme: str, host: str, port: int | None, timeout: float):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+        self._idle: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    def acquire(self, reuse: bool = True) -> tuple[http.client.HTTPConnection, bool]:
+        """An idle connection or a new one, and whether it was idle."""
+        if reuse:
+            with self._lock:
+                if self._idle:
+                    return self._idle.pop(), True
+        if self.scheme == "https":
+            connection = http.client.HTTPSConnection(
+                self.host, self.port, timeout=self.timeout
+            )
+        else:
+            connection = http.client.HTTPConnection(
+                self.host, self.port, timeout=self.timeout
+            )
+        return connection, False
+
+    def release(
+        self, connection: http.client.HTTPConnection, response: http.client.HTTPResponse
+    ):
+        with self._lock:
+            if not response.will_close and len(self._idle) < POOL_SIZE:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+_pools: dict[tuple, _HostPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool(base_url: str, timeout: float) -> _HostPool:
+    url = urllib.parse.urlsplit(base_url)
+    if not url.hostname:
+        raise ValueError(f"No host in the base URL {base_url}")
+    key = (url.scheme, url.hostname, url.port)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = _HostPool(url.scheme, url.hostname, url.port, timeout)
+        return pool
+
+
+class Session:
+    """API key authenticated requests over the shared pool of the host."""
+
+    def __init__(
+        self,
+        key: str,
+        secret: str,
+        base_url: str = DEFAULT_BASE_URL,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        retries: int = DEFAULT_RETRIES,
+    ):
+        self.pool = _pool(base_url, timeout)
+        self.retries = retries
+        token = base64.b64encode(f"{key}:{secret}".encode()).decode()
+        self.headers = {
+            "Authorization": f"Basic {token}",
+            "Accept": "application/json",
+        }
+        self._cache: dict[str, _CachedResponse] = {}
+        self._cache_lock = threading.Lock()
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, str] | None = None,
+        body: dict | None = None,
+        cached: bool = True,
+    ) -> dict | None:
+        """Send a request and return the decoded JSON body, None if empty.
+
+        GETs are answered from the cache unless `cached` is false. POST is
+        only retried on 429, the other statuses may have created the
+        resource already.
+        """
+        if params:
+            path = f"{path}?{urllib.parse.urlencode(params)}"
+        headers = dict(self.headers)
+        with self._cache_lock:
+            hit = self._cache.get(path) if method == "GET" else None
+        if hit is not None:
+            if cached:
+                return hit.body
+            if hit.etag:
+                headers["If-None-Match"] = hit.etag
+
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+        status, response_headers, decoded = self._send(method, path, payload, headers)
+
+        if status == 304 and hit is not None:
+            return hit.body
+        if status >= 400:
+            raise ApiError(method, path, status, decoded)
+        if decoded is not None and not isinstance(decoded, dict):
+            raise ApiError(method, path, status, f"not a JSON object: {decoded}")
+        with self._cache_lock:
+            if method == "GET":
+                self._cache[path] = _CachedResponse(response_headers.get("ETag"), decoded)
+            else:
+                self._invalidate(path)
+        return decoded
+
+    def _send(
+        self, method: str, path: str, payload: bytes | None, headers: dict[str, str]
+    ) -> tuple[int, http.client.HTTPMessage, dict | str | None]:
+        retry_statuses = (429,) if method == "POST" else RETRY_STATUSES
+        attempt = 0
+        while True:
+            last = attempt >= self.retries
+            with self.pool.slots:
+                try:
+                    response, data = self._exchange(method, path, payload, headers)
+                except (ConnectionError, TimeoutError, http.client.HTTPException):
+                    if last or method == "POST":
+                        raise
+                    response = data = None
+
+            # back off without holding a request slot
+            if response is None or data is None:
+                self._backoff(attempt)
+                attempt += 1
+                continue
+            if response.status in retry_statuses and not last:
+                wait = _rate_limit_wait(response) if response.status == 429 else None
+                if wait is not None and wait > MAX_RATE_LIMIT_WAIT_SECONDS:
+                    raise ApiError(method, path, 429, f"rate limited for {wait}s")
+                self._backoff(attempt, wait)
+                attempt += 1
+                continue
+            return response.status, response.headers, _decode(data)
+
+    def _exchange(
+        self, method: str, path: str, payload: bytes | None, headers: dict[str, str]
+    ) -> tuple[http.client.HTTPResponse, bytes]:
+        """Send the request once, on a new connection if the idle one was closed.
+
+        A server closing an idle keep-alive connection is only noticed when
+        the next request goes out on it, before the server read any of it.
+        """
+        connection, reused = self.pool.acquire()
+        while True:
+            try:
+                connection.request(method, path, body=payload, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except CLOSED_BY_SERVER:
+                connection.close()
+                if not reused:
+                    raise
+                # the other idle connections are likely closed as well
+                connection, reused = self.pool.acquire(reuse=False)
+                continue
+            except BaseException:
+                connection.close()
+                raise
+            self.pool.release(connection, response)
+            return response, data
+
+    def _invalidate(self, path: str):
+        """Drop cached reads of a written resource and of its collection."""
+        resource = path.split("?")[0]
+        collection = resource.rsplit("/", 1)[0]
+        for cached_path in list(self._cache):
+            cached_resource = cached_path.split("?")[0]
+            if cached_resource in (resource, collection) or cached_resource.startswith(
+                f"{resource}/"
+            ):
+                del self._cache[cached_path]
+
+    def _backoff(self, attempt: int, wait: float | None = None):
+        if wait is not None:
+            time.sleep(wait)
+            return
+        delay = min(MAX_BACKOFF_SECONDS, BACKOFF_SECONDS * 2**attempt)
+        time.sleep(delay * random.uniform(0.5, 1.0))
+
+
+_sessions: dict[tuple[str, str], Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def session(key: str, secret: str, base_url: str = DEFAULT_BASE_URL) -> Session:
+    """Shared session per base URL and API key."""
+    with _sessions_lock:
+        existing = _sessions.get((base_url, key))
+        if existing is None:
+            existing = _sessions[(base_url, key)] = Session(key, secret, base_url)
+        return existing
+
+
+def _rate_limit_wait(response: http.client.HTTPResponse) -> float | None:
+    """Seconds a 429 response asks to wait, None if it does not say."""
+    for header in ("Retry-After", "RateLimit-Reset"):
+        value = response.headers.get(header)
+        if value is not None:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                continue
+    return None
+
+
+def _decode(data: bytes) -> dict | str | None:
+    if not data:
+        return None
+    try:
+        return json.loads(data)
+    except json.JSONDecodeError:
+        return data.decode(errors="replace")
@@ -0,0 +1,110 @@
+"""Latency vs throughput presets for the XStream connectors.
+
+A preset expands into a consistent set of the batch, queue and poll settings
+documented for the fully managed OracleXStreamSource connector, which does not
+accept producer overrides. It is selected with `connectorPreset` in
+Pulumi.yaml and can be set per outbound server with `connectorPresets` (e.g.
+`{xout_2: bulk}`). The `default` preset sets nothing and keeps the connector
+defaults (max.batch.size 2048, max.queue.size 8192).
+
+Records wait in the queue and in the batch being written, so with rows of
+~500KB their count times the record size has to stay within the memory
+budget (`connectorMemoryBudgetBytes`):
+
+    python connector_presets.py
+    python connector_presets.py --record-bytes 2048
+"""
+
+import argparse
+
+import oracle_schema
+
+DEFAULT_MEMORY_BUDGET_BYTES = 1024 * 1024 * 1024
+DEFAULT_PRESET = "default"
+
+PRESETS = {
+    # the connector defaults, the config of the connectors before presets
+    DEFAULT_PRESET: {},
+    # small batches and short polls
+    "low-latency": {
+        "max.batch.size": "256",
+        "max.queue.size": "1024",
+        "max.queue.size.in.bytes": str(64 * 1024 * 1024),
+        "poll.interval.ms": "50",
+    },
+    "balanced": {
+        "max.batch.size": "512",
+        "max.queue.size": "2048",
+        "max.queue.size.in.bytes": str(256 * 1024 * 1024),
+        "poll.interval.ms": "500",
+    },
+    # large batches for snapshots and bursts, needs small records or a budget
+    "bulk": {
+        "max.batch.size": "4096",
+        "max.queue.size": "16384",
+        "max.queue.size.in.bytes": str(1024 * 1024 * 1024),
+        "poll.interval.ms": "1000",
+    },
+}
+
+
+def preset_config(name: str | None) -> dict[str, str]:
+    """Connector config entries of a preset, none is the default preset."""
+    if not name:
+        return {}
+    if name not in PRESETS:
+        raise ValueError(f"Unknown connector preset {name}, use one of {sorted(PRESETS)}")
+    return dict(PRESETS[name])
+
+
+def queue_memory_bytes(config: dict[str, str], record_bytes: int) -> int:
+    """Bytes held by the queue and the batch in flight at most."""
+    queue_records = int(config.get("max.queue.size", 8192))
+    queue_bytes = queue_records * record_bytes
+    queue_limit = int(config.get("max.queue.size.in.bytes", 0))
+    if queue_limit > 0:
+        queue_bytes = min(queue_bytes, queue_limit)
+    return queue_bytes + int(config.get("max.batch.size", 2048)) * record_bytes
+
+
+def check(
+    name: str,
+    config: dict[str, str],
+    record_bytes: int,
+    budget_bytes: int = DEFAULT_MEMORY_BUDGET_BYTES,
+):
+    """Raise ValueError for inconsistent sizes or a queue above the budget."""
+    batch = int(config.get("max.batch.size", 2048))
+    queue = int(config.get("max.queue.size", 8192))
+    if queue <= batch:
+        raise ValueError(f"{name}: max.queue.size must be larger than max.batch.size")
+    memory = queue_memory_bytes(config, record_bytes)
+    if memory > budget_bytes:
+        raise ValueError(
+            f"{name}: queue and batch hold up to {memory / 2**20:.0f} MiB of "
+            f"{record_bytes} byte records, more than the budget of "
+            f"{budget_bytes / 2**20:.0f} MiB; pick a smaller preset or raise "
+            "connectorMemoryBudgetBytes"
+        )
+
+
+if __name__ == "__main__":
+    schema = oracle_schema.load_schema()
+    largest_row = max(oracle_schema.estimate_row_bytes(t) for t in schema.values())
+    parser = argparse.ArgumentParser(
+        description="Check the memory of the connector presets against a budget."
+    )
+    parser.add_argument("--record-bytes", type=int, default=largest_row)
+    parser.add_argument("--budget-bytes", type=int, default=DEFAULT_MEMORY_BUDGET_BYTES)
+    args = parser.parse_args()
+
+    for preset in PRESETS:
+        values = preset_config(preset)
+        memory = queue_memory_bytes(values, args.record_bytes)
+        try:
+            check(preset, values, args.record_bytes, args.budget_bytes)
+            status = "ok"
+        except ValueError:
+            # the default preset only warns, the connectors keep their config
+            status = "over budget" + (" (warning)" if preset == DEFAULT_PRESET else "")
+        print(f"{preset:<12} {memory / 2**20:8.0f} MiB  {status}")
@@ -0,0 +1,316 @@
+"""Bulk test data driver with the data shape of sql/proc_bulk_create.sql.
+
+Produces the same rows as generate_trial_data_bulk, one batch per simulated
+second, and writes them either as bulk files or as array-bound batches
+(`executemany`) against a database:
+
+    python datagen.py --target csv --out /tmp/trial --duration 60
+    python datagen.py --target sqlite --db /tmp/trial.db --rows-per-second 200
+    python datagen.py --target oracle --dsn host:1521/ORCL --user admin --paced
+
+The sqlite target is a local stand-in using the tables of sql/schema.sql, the
+oracle target needs the optional python-oracledb package (requirements-dev.txt).
+"""
+
+import argparse
+import csv
+import datetime
+import os
+import random
+import time
+
+import oracle_schema
+
+SENTENCES = (
+    "Patient reported mild headache after taking the medication.",
+    "Dosage adjustment made based on recent lab results.",
+    "Patient compliance has been excellent throughout the trial.",
+    "Adverse event documented and reported to regulatory authorities.",
+    "Follow-up appointment scheduled for next week.",
+    "Medication batch number verified and recorded.",
+    "Patient education provided regarding proper administration.",
+    "Vital signs within normal range during visit.",
+    "Query regarding side effects addressed satisfactorily.",
+    "Progress notes updated in patient record.",
+)
+EVENT_TYPES = ("baseline", "follow-up", "adverse_event", "dose_administered", "lab_visit")
+FREQUENCIES = ("once daily", "twice daily", "every 8 hours", "every 12 hours", "as needed")
+ATTACHMENT_TYPES = ("pdf", "image", "document", "spreadsheet", "presentation")
+# distinct CLOB values built once and reused, like c_block_count in the procedure
+BLOCK_COUNT = 8
+
+EVENT_COLUMNS = (
+    "EVENT_ID", "PATIENT_ID", "TRIAL_ID", "EVENT_TYPE", "EVENT_DATE", "DESCRIPTION",
+    "STATUS", "SITE_ID", "INVESTIGATOR_ID", "LONG_DESCRIPTION",
+)  # fmt: skip
+REGIMEN_COLUMNS = (
+    "REGIMEN_ID", "EVENT_ID", "PATIENT_ID", "MEDICATION_ID", "TRIAL_ID", "FREQUENCY",
+    "DOSAGE_AMOUNT", "START_DATE", "END_DATE", "INSTRUCTIONS", "STATUS",
+    "LONG_DESCRIPTION",
+)  # fmt: skip
+NOTE_COLUMNS = (
+    "NOTE_ID", "REGIMEN_ID", "NOTE_TEXT", "ATTACHMENT_PATH", "ATTACHMENT_TYPE",
+    "CREATED_BY",
+)  # fmt: skip
+COLUMNS = {
+    "PHARMA_EVENT": EVENT_COLUMNS,
+    "PHARMA_DOSE_REGIMENS": REGIMEN_COLUMNS,
+    "PHARMA_NOTES_ATTACH": NOTE_COLUMNS,
+}
+
+
+def build_block(rng: random.Random, size: int) -> str:
+    """CLOB of `size` characters, doubled instead of appended per sentence."""
+    seed = ""
+    while len(seed) < 4000:
+        seed += rng.choice(SENTENCES) + " "
+    block = seed
+    while len(block) < size:
+        block += block
+    return block[:size]
+
+
+class Batch:
+    """Rows generated for one second."""
+
+    def __init__(self):
+        self.inserts: dict[str, list[tuple]] = {name: [] for name in COLUMNS}
+        self.completed_event_ids: list[int] = []
+        self.deleted_note_ids: list[int] = []
+
+
+class TrialDataGenerator:
+    def __init__(
+        self,
+        rows_per_second: int = 15,
+        bytes_per_second: int = 0,
+        update_pct: float = 0.0,
+        delete_pct: float = 0.0,
+        start_id: int = 1,
+        seed: int = 42,
+    ):
+        self.rows_per_second = rows_per_second
+        self.update_pct = update_pct
+        self.delete_pct = delete_pct
+        self.rng = random.Random(seed)
+        clob_bytes = oracle_schema.DEFAULT_CLOB_BYTES
+        if bytes_per_second > 0:
+            clob_bytes = max(1, bytes_per_second // rows_per_second)
+        self.blocks = [build_block(self.rng, clob_bytes) for _ in range(BLOCK_COUNT)]
+        # ids are bound explicitly so child rows can reference them in the batch
+        self.next_ids = {name: start_id for name in COLUMNS}
+
+    def _ids(self, table: str) -> list[int]:
+        start = self.next_ids[table]
+        self.next_ids[table] += self.rows_per_second
+        return list(range(start, start + self.rows_per_second))
+
+    def second(self, sec: int) -> Batch:
+        rng, n = self.rng, self.rows_per_second
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        batch = Batch()
+
+        event_ids = self._ids("PHARMA_EVENT")
+        for i, event_id in enumerate(event_ids, start=1):
+            batch.inserts["PHARMA_EVENT"].append(
+                (
+                    event_id,
+                    rng.randrange(1000, 9999),
+                    rng.randrange(100, 999),
+                    rng.choice(EVENT_TYPES),
+                    now - datetime.timedelta(days=30, seconds=-rng.randrange(2592000)),
+                    "Generated event for testing purposes",
+                    rng.choice(("scheduled", "missed")),
+                    rng.randrange(10, 99),
+                    rng.randrange(100, 999),
+                    self.blocks[(sec * n + i) % BLOCK_COUNT],
+                )
+            )
+
+        regimen_ids = self._ids("PHARMA_DOSE_REGIMENS")
+        for i, regimen_id in enumerate(regimen_ids, start=1):
+            batch.inserts["PHARMA_DOSE_REGIMENS"].append(
+                (
+                    regimen_id,
+                    rng.choice(event_ids),
+                    rng.randrange(1000, 9999),
+                    rng.randrange(100, 999),
+                    rng.randrange(100, 999),
+                    rng.choice(FREQUENCIES),
+                    f"{rng.randrange(10, 500)}mg",
+                    now + datetime.timedelta(days=rng.randrange(0, 30)),
+                    now + datetime.timedelta(days=rng.randrange(30, 365)),
+                    "Take with food. Do not crush tablets.",
+                    rng.choice(("active", "completed")),
+                    self.blocks[(sec * n + i + 1) % BLOCK_COUNT],
+                )
+            )
+
+        note_ids = self._ids("PHARMA_NOTES_ATTACH")
+        for i, note_id in enumerate(note_ids, start=1):
+            attachment_type = rng.choice(ATTACHMENT_TYPES)
+            batch.inserts["PHARMA_NOTES_ATTACH"].append(
+                (
+                    note_id,
+                    rng.choice(regimen_ids),
+                    self.blocks[(sec * n + i + 2) % BLOCK_COUNT],
+                    f"/attachments/trial_{rng.randrange(1000, 9999)}.{attachment_type}",
+                    attachment_type,
+                    rng.randrange(100, 999),
+                )
+            )
+
+        batch.completed_event_ids = event_ids[: int(n * self.update_pct / 100)]
+        batch.deleted_note_ids = note_ids[: int(n * self.delete_pct / 100)]
+        return batch
+
+
+class CsvWriter:
+    """One CSV file per table, loadable with SQL*Loader or external tables."""
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.files = {
+            name: open(os.path.join(directory, f"{name.lower()}.csv"), "w", newline="")
+            for name in COLUMNS
+        }
+        self.writers = {name: csv.writer(f) for name, f in self.files.items()}
+        for name, writer in self.writers.items():
+            writer.writerow(COLUMNS[name])
+        self.files["changes"] = open(
+            os.path.join(directory, "changes.csv"), "w", newline=""
+        )
+        self.changes = csv.writer(self.files["changes"])
+        self.changes.writerow(("OPERATION", "TABLE_NAME", "ID"))
+
+    def write(self, batch: Batch):
+        for name, rows in batch.inserts.items():
+            self.writers[name].writerows(rows)
+        self.changes.writerows(
+            ("U", "PHARMA_EVENT", i) for i in batch.completed_event_ids
+        )
+        self.changes.writerows(
+            ("D", "PHARMA_NOTES_ATTACH", i) for i in batch.deleted_note_ids
+        )
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+
+
+class DbWriter:
+    """Array-bound batches through DB-API executemany, one commit per second."""
+
+    def __init__(self, connection, placeholder: str):
+        self.connection = connection
+        self.placeholder = placeholder
+
+    def _marks(self, count: int) -> str:
+        if self.placeholder == "?":
+            return ", ".join("?" * count)
+        return ", ".join(f":{i}" for i in range(1, count + 1))
+
+    def write(self, batch: Batch):
+        cursor = self.connection.cursor()
+        # parents first so the foreign keys hold
+        for name in ("PHARMA_EVENT", "PHARMA_DOSE_REGIMENS", "PHARMA_NOTES_ATTACH"):
+            columns = COLUMNS[name]
+            cursor.executemany(
+                f"INSERT INTO {name} ({', '.join(columns)}) "
+                f"VALUES ({self._marks(len(columns))})",
+                batch.inserts[name],
+            )
+        mark = self._marks(1)
+        cursor.executemany(
+            f"UPDATE PHARMA_EVENT SET STATUS = 'completed' WHERE EVENT_ID = {mark}",
+            [(i,) for i in batch.completed_event_ids],
+        )
+        cursor.executemany(
+            f"DELETE FROM PHARMA_NOTES_ATTACH WHERE NOTE_ID = {mark}",
+            [(i,) for i in batch.deleted_note_ids],
+        )
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+def sqlite_stand_in(path: str):
+    """SQLite database with the tables of sql/schema.sql."""
+    import sqlite3
+
+    connection = sqlite3.connect(path)
+    types = {"NUMBER": "INTEGER", "CLOB": "TEXT", "VARCHAR2": "TEXT"}
+    for table in oracle_schema.load_schema().values():
+        columns = ", ".join(
+            f"{c.name} {types.get(c.data_type, 'TEXT')}"
+            + (" PRIMARY KEY" if c.primary_key else "")
+            for c in table.columns
+        )
+        connection.execute(f"CREATE TABLE IF NOT EXISTS {table.name} ({columns})")
+    return connection
+
+
+def run(generator: TrialDataGenerator, writer, duration: int, paced: bool) -> float:
+    """Generate and write `duration` seconds of data, return rows per second."""
+    start = time.perf_counter()
+    rows = 0
+    for sec in range(duration):
+        second_start = time.perf_counter()
+        batch = generator.second(sec)
+        writer.write(batch)
+        rows += sum(len(r) for r in batch.inserts.values())
+        if paced:
+            time.sleep(max(0.0, 1.0 - (time.perf_counter() - second_start)))
+    writer.close()
+    return rows / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate trial data into CSV files, SQLite or Oracle."
+    )
+    parser.add_argument("--target", choices=("csv", "sqlite", "oracle"), default="csv")
+    parser.add_argument("--out", default="trial_data", help="csv output directory")
+    parser.add_argument("--db", default="trial_data.db", help="sqlite database file")
+    parser.add_argument("--dsn", help="oracle dsn, e.g. host:1521/ORCL")
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--password", default=os.environ.get("ORACLE_PASSWORD"))
+    parser.add_argument("--duration", type=int, default=10)
+    parser.add_argument("--rows-per-second", type=int, default=15)
+    parser.add_argument("--bytes-per-second", type=int, default=0)
+    parser.add_argument("--update-pct", type=float, default=0.0)
+    parser.add_argument("--delete-pct", type=float, default=0.0)
+    parser.add_argument("--start-id", type=int, default=1, help="first id per table")
+    parser.add_argument("--paced", action="store_true", help="hold one batch per second")
+    args = parser.parse_args()
+
+    if args.target == "csv":
+        output = CsvWriter(args.out)
+    elif args.target == "sqlite":
+        output = DbWriter(sqlite_stand_in(args.db), "?")
+    else:
+        try:
+            import oracledb  # pyright: ignore[reportMissingImports]
+        except ImportError:
+            raise SystemExit(
+                "--target oracle needs the oracledb package, "
+                "pip install -r requirements-dev.txt"
+            )
+        output = DbWriter(
+            oracledb.connect(user=args.user, password=args.password, dsn=args.dsn), ":"
+        )
+
+    rate = run(
+        TrialDataGenerator(
+            args.rows_per_second,
+            args.bytes_per_second,
+            args.update_pct,
+            args.delete_pct,
+            args.start_id,
+        ),
+        output,
+        args.duration,
+        args.paced,
+    )
+    print(f"wrote {rate:.0f} rows/s")
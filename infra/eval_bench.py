@@ -0,0 +1,210 @@
+"""Benchmark the evaluation of the Pulumi program under Pulumi mocks.
+
+Runs __main__.py in a fresh interpreter per run, so every run pays the SDK
+imports like `pulumi preview` does, with the engine replaced by
+pulumi.runtime.set_mocks: resources echo their inputs and the invokes answer
+from canned results, no cloud account is needed. Stage 1 runs with the stage 2
+roles missing, stage 2 with them in place. Reports the median import, create_*
+step and invoke times recorded by profiler.py:
+
+    python eval_bench.py
+    python eval_bench.py --stage 1 --runs 5 --json eval.json
+    python eval_bench.py --max-seconds 20   # exit 1 above, e.g. in CI
+
+The config is the offline config of the stack (offline_config.py) with a
+stand-in password and Databricks external id, the packages of requirements.txt have to be installed.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import offline_config
+
+ACCOUNT_ID = "123456789012"
+PASSWORD = "bench-password"
+# stage 2 needs the external id Databricks shows once the role exists
+EXTERNAL_ID = "bench-external-id"
+# tokens of the invokes the program makes and their canned results
+INVOKE_RESULTS = {
+    "aws:index/getCallerIdentity:getCallerIdentity": {
+        "accountId": ACCOUNT_ID,
+        "arn": f"arn:aws:iam::{ACCOUNT_ID}:user/bench",
+        "id": ACCOUNT_ID,
+        "userId": "AIDABENCH",
+    },
+    "aws:ec2/getVpc:getVpc": {"cidrBlock": "172.31.0.0/16"},
+    "aws:ec2/getInternetGateway:getInternetGateway": {
+        "internetGatewayId": "igw-0bench"
+    },
+}
+STACK_REFERENCE = "pulumi:pulumi:StackReference"
+GET_ROLE = "aws:iam/getRole:getRole"
+
+
+def _role_arn(name: str) -> str:
+    return f"arn:aws:iam::{ACCOUNT_ID}:role/{name}"
+
+
+def evaluate(stack: str | None, stage: int) -> dict:
+    """Run the program once under mocks, the profiler timings and the total."""
+    started = time.perf_counter()
+    import pulumi
+
+    config = offline_config.load_config(stack)
+    prefix = config.get("resourcePrefix") or "demo"
+    project = _project_name()
+
+    class Mocks(pulumi.runtime.Mocks):
+        def new_resource(self, args: pulumi.runtime.MockResourceArgs):
+            if args.typ == STACK_REFERENCE:
+                # the outputs stage 1 exports, the ARNs of the stage 2 roles
+                roles = [
+                    f"{prefix}-tableflow-access-role",
+                    f"{prefix}-dbx-access-role",
+                ]
+                return args.name, {"outputs": {r: _role_arn(r) for r in roles}}
+            outputs = {
+                "arn": f"arn:aws:bench:::{args.name}",
+                **args.inputs,
+            }
+            return f"{args.name}-id", outputs
+
+        def call(
+            self, args: pulumi.runtime.MockCallArgs
+        ) -> tuple[dict, list[tuple[str, str]] | None]:
+            if args.token == GET_ROLE:
+                if stage == 1:
+                    # an invoke failure, like the provider reports a missing role
+                    return {}, [("name", f"NoSuchEntity: role {args.args['name']}")]
+                return {"arn": _role_arn(args.args["name"]), **args.args}, []
+            return {"id": args.token, **INVOKE_RESULTS.get(args.token, {})}, []
+
+    raw = {
+        (key if ":" in key else f"{project}:{key}"): (
+            value if isinstance(value, str) else json.dumps(value)
+        )
+        for key, value in config.items()
+        if value is not None
+    }
+    raw["rds:cfltUserPassword"] = PASSWORD
+    raw["dbx:storageCredsExternalId"] = (
+        raw.get("dbx:storageCredsExternalId") or EXTERNAL_ID
+    )
+    # probes would be answered from the cache of earlier runs
+    raw[f"{project}:probeCacheTtl"] = "0"
+    # invokes are only timed with profileEvaluation
+    raw[f"{project}:profileEvaluation"] = "true"
+    pulumi.runtime.config.set_all_config(raw, ["rds:cfltUserPassword"])
+    pulumi.runtime.set_mocks(
+        Mocks(), project=project, stack=stack or "bench", preview=True
+    )
+
+    namespace: dict = {}
+
+    @pulumi.runtime.test
+    def run():
+        with open(os.path.join(offline_config.INFRA_DIR, "__main__.py"), "r") as f:
+            code = compile(f.read(), "__main__.py", "exec")
+        exec(code, namespace)
+
+    run()
+    result = namespace["PROFILER"].as_dict()
+    # the evaluation plus the resource registrations the mocks answered
+    result["total"] = time.perf_counter() - started
+    return result
+
+
+def _project_name() -> str:
+    import yaml
+
+    with open(os.path.join(offline_config.INFRA_DIR, "Pulumi.yaml"), "r") as f:
+        return yaml.safe_load(f)["name"]
+
+
+def run_once(stack: str | None, stage: int) -> dict:
+    """evaluate in a fresh interpreter, so the imports are not cached."""
+    command = [sys.executable, __file__, "--child", "--stage", str(stage)]
+    if stack:
+        command += ["--stack", stack]
+    completed = subprocess.run(
+        command,
+        capture_output=True,
+        text=True,
+        cwd=offline_config.INFRA_DIR,
+    )
+    if completed.returncode != 0:
+        raise SystemExit(completed.stderr.strip() or completed.stdout.strip())
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+def summarize(runs: list[dict]) -> dict:
+    """Medians of the totals, per kind and per timed section over the runs."""
+    sections: dict[tuple[str, str], list[float]] = {}
+    for result in runs:
+        seen: dict[tuple[str, str], float] = {}
+        for timing in result["timings"]:
+            key = (timing["kind"], timing["name"])
+            seen[key] = seen.get(key, 0.0) + timing["seconds"]
+        for key, seconds in seen.items():
+            sections.setdefault(key, []).append(seconds)
+    return {
+        "runs": len(runs),
+        "total": statistics.median(r["total"] for r in runs),
+        "evaluation": statistics.median(r["elapsed"] for r in runs),
+        "totals": {
+            kind: statistics.median(r["totals"][kind] for r in runs)
+            for kind in runs[0]["totals"]
+        },
+        "sections": [
+            {"kind": kind, "name": name, "seconds": statistics.median(seconds)}
+            for (kind, name), seconds in sorted(
+                sections.items(), key=lambda item: -statistics.median(item[1])
+            )
+        ],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time the Pulumi program evaluation under Pulumi mocks."
+    )
+    parser.add_argument("--stack")
+    parser.add_argument("--stage", type=int, choices=(1, 2), default=2)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15, help="slowest sections shown")
+    parser.add_argument("--json", help="write the summary to this file")
+    parser.add_argument(
+        "--max-seconds", type=float, help="fail if the median total is above"
+    )
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = evaluate(args.stack, args.stage)
+        # the program logs to stdout, the result is the last line
+        print(json.dumps(result))
+        raise SystemExit(0)
+
+    summary = summarize([run_once(args.stack, args.stage) for _ in range(args.runs)])
+    summary["stage"] = args.stage
+    totals = summary["totals"]
+    print(
+        f"stage {args.stage}, median of {summary['runs']} runs: "
+        f"{summary['total']:.2f}s total, {summary['evaluation']:.2f}s evaluation "
+        f"(imports {totals['import']:.2f}s, steps {totals['step']:.2f}s, "
+        f"invokes {totals['invoke']:.2f}s)"
+    )
+    for section in summary["sections"][: args.top]:
+        print(f"  {section['seconds']:8.3f}s  {section['kind']:<6}  {section['name']}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+    if args.max_seconds is not None and summary["total"] > args.max_seconds:
+        raise SystemExit(
+            f"evaluation took {summary['total']:.2f}s, more than {args.max_seconds}s"
+        )
@@ -0,0 +1,183 @@
+"""Connector heartbeats and the restart replay they bound.
+
+The connector only stores a new redo position when it emits a record. While
+the captured tables are idle and other sessions keep writing redo, the stored
+position stays behind: a restart mines everything since then again and RDS
+cannot purge those archive logs. With `heartbeatIntervalMs` the connector
+writes a heartbeat record every interval to `__cflt-heartbeat.<topicPrefix>`.
+With `heartbeatTable` it also updates a captured heartbeat table on every
+heartbeat, so the position advances even when nothing else it captures
+changes (create it with sql/heartbeat_setup.sql, generated by this module):
+
+    python heartbeat.py --other-redo-mb-per-hour 2000 --idle-hours 8
+    python heartbeat.py --sql --stack dev > ../sql/heartbeat_setup.sql
+"""
+
+import argparse
+import dataclasses
+
+import redo
+
+TOPIC_PREFIX = "__cflt-heartbeat"
+HEARTBEAT_TABLE = "CDC_HEARTBEAT"
+# Kafka Connect commits source offsets once a minute
+OFFSET_FLUSH_SECONDS = 60
+
+
+@dataclasses.dataclass(frozen=True)
+class HeartbeatSettings:
+    # 0 disables heartbeats
+    interval_ms: int = 0
+    table: bool = False
+
+    def config(self, schema_name: str) -> dict[str, str]:
+        """Connector config entries."""
+        if not self.interval_ms:
+            return {"heartbeat.interval.ms": "0"}
+        values = {
+            "heartbeat.interval.ms": str(self.interval_ms),
+            "topic.heartbeat.prefix": TOPIC_PREFIX,
+        }
+        if self.table:
+            values["heartbeat.action.query"] = (
+                f"UPDATE {schema_name}.{HEARTBEAT_TABLE} "
+                "SET ts = SYSTIMESTAMP WHERE id = 1"
+            )
+        return values
+
+
+def settings(interval_ms: int | None, table: bool = False) -> HeartbeatSettings:
+    if interval_ms is not None and interval_ms < 0:
+        raise ValueError("heartbeatIntervalMs must not be negative")
+    if table and not interval_ms:
+        raise ValueError("heartbeatTable needs heartbeatIntervalMs")
+    return HeartbeatSettings(interval_ms or 0, table)
+
+
+def heartbeat_topic(topic_prefix: str) -> str:
+    return f"{TOPIC_PREFIX}.{topic_prefix}"
+
+
+def replay_window_seconds(heartbeat: HeartbeatSettings, idle_seconds: float) -> float:
+    """Worst-case time between the stored position and a restart.
+
+    Without a heartbeat table the position moves only with captured changes,
+    so an idle period of the captured tables counts in full.
+    """
+    if heartbeat.table:
+        return heartbeat.interval_ms / 1000 + OFFSET_FLUSH_SECONDS
+    return idle_seconds + OFFSET_FLUSH_SECONDS
+
+
+def replay_seconds(
+    window_seconds: float,
+    redo_bytes_per_second: float,
+    capture_bytes_per_sec: float = redo.DEFAULT_CAPTURE_BYTES_PER_SEC,
+) -> float:
+    """Time to mine the redo of the replay window again after a restart."""
+    return window_seconds * redo_bytes_per_second / capture_bytes_per_sec
+
+
+def render_table_sql(schema_name: str, user_name: str, server_names: list[str]) -> str:
+    """Heartbeat table, its supplemental logging and capture.
+
+    `user_name` is the connector's database user (`rds:cfltUserName`).
+    """
+    table = f"{schema_name}.{HEARTBEAT_TABLE}"
+    lines = [
+        "-- generated by infra/heartbeat.py (python heartbeat.py --sql)",
+        "-- heartbeat table updated by heartbeat.action.query, create as the admin user",
+        f"-- connector user {user_name}, outbound servers {', '.join(server_names)}",
+        f"CREATE TABLE {table} (",
+        "    id NUMBER(1) PRIMARY KEY,",
+        "    ts TIMESTAMP NOT NULL",
+        ");",
+        f"INSERT INTO {table} (id, ts) VALUES (1, SYSTIMESTAMP);",
+        "COMMIT;",
+        f"ALTER TABLE {table}",
+        f"  ADD SUPPLEMENTAL LOG GROUP {HEARTBEAT_TABLE}_LOG (ID, TS) ALWAYS;",
+        f"GRANT UPDATE ON {table} TO {user_name};",
+        "",
+        "-- !!! change user to cfltadmin here, add the heartbeat table to the outbound servers",
+    ]
+    for server_name in server_names:
+        lines += [
+            "BEGIN",
+            "  DBMS_XSTREAM_ADM.ALTER_OUTBOUND(",
+            f"     server_name => '{server_name}',",
+            f"     table_names => '{table}',",
+            "     add         => TRUE);",
+            "END;",
+            "/",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Estimate the restart replay per heartbeat interval or print the heartbeat SQL."
+    )
+    parser.add_argument("--sql", action="store_true", help="print the heartbeat table SQL")
+    parser.add_argument("--schema", default="ADMIN")
+    parser.add_argument("--stack", help="stack of the connector user and outbound servers")
+    parser.add_argument("--source", help="name of the source, defaults to the first")
+    parser.add_argument(
+        "--server-name",
+        action="append",
+        help="defaults to the outbound servers of the source's shards",
+    )
+    parser.add_argument("--user-name", help="defaults to rds:cfltUserName of the stack")
+    parser.add_argument("--interval-ms", type=int, default=60000)
+    parser.add_argument(
+        "--other-redo-mb-per-hour",
+        type=float,
+        default=1024,
+        help="redo of tables that are not captured",
+    )
+    parser.add_argument(
+        "--idle-hours",
+        type=float,
+        default=24,
+        help="longest time without changes to the captured tables",
+    )
+    parser.add_argument(
+        "--capture-mb-per-sec",
+        type=float,
+        default=redo.DEFAULT_CAPTURE_BYTES_PER_SEC / 2**20,
+    )
+    args = parser.parse_args()
+
+    if args.sql:
+        server_names = args.server_name
+        user_name = args.user_name
+        if not server_names or not user_name:
+            import sources
+            import xstream
+
+            try:
+                stack = sources.offline_stack(args.stack)
+                source = sources.find(stack.sources, args.source)
+            except ValueError as e:
+                raise SystemExit(str(e))
+            server_names = server_names or xstream.server_names(
+                source.xout_server_name, source.xstream_shards
+            )
+            user_name = user_name or stack.config.get("rds:cfltUserName")
+        if not user_name:
+            raise SystemExit("rds:cfltUserName is not set, pass --user-name")
+        print(render_table_sql(args.schema, user_name, server_names), end="")
+    else:
+        # while the captured tables are idle, only the other redo is written
+        redo_rate = args.other_redo_mb_per_hour * 2**20 / 3600
+        for name, heartbeat in (
+            ("none", HeartbeatSettings()),
+            ("topic only", HeartbeatSettings(args.interval_ms)),
+            ("with table", HeartbeatSettings(args.interval_ms, table=True)),
+        ):
+            window = replay_window_seconds(heartbeat, args.idle_hours * 3600)
+            seconds = replay_seconds(window, redo_rate, args.capture_mb_per_sec * 2**20)
+            print(
+                f"{name:<11} replay window {window / 3600:6.2f}h, "
+                f"{window * redo_rate / 2**30:7.2f} GiB redo, "
+                f"{seconds / 60:6.1f} min to mine again"
+            )
@@ -0,0 +1,514 @@
+"""LOB capture strategies for the XStream connector and their cost.
+
+Three strategies can be declared per table in the catalog:
+
+- `inline`: LOB values are written to the topic as they are (default).
+- `skip`: LOB values above the threshold are replaced by the connector's
+  `skip.value.placeholder`, readers fetch them from the database by key.
+- `offload`: like skip, but the placeholder is a pointer into the Tableflow
+  bucket, `s3://<bucket>/lob-offload/`. A job in the database uploads the
+  LOB values to `lob-offload/<topic>/<primary key>.<COLUMN>.lob`, so readers
+  append `<topic>/<primary key>.<COLUMN>.lob` to the pointer. The RDS
+  instance gets the S3_INTEGRATION option and a role writing that prefix;
+  the trigger, job and directories are created with the SQL of this module:
+
+    python lob.py
+    python lob.py --offload-sql --stack dev > ../sql/lob_offload_setup.sql
+
+The job reads the value when it runs, about a minute after the change, so an
+object holds the latest value of the row and shows up after the pointer.
+
+The XStream connector knows a single LOB threshold, so tables sharing a
+connector (see xstream.py) are reduced to one setting by `connector_settings`.
+"""
+
+import argparse
+import dataclasses
+from typing import Iterable
+
+import catalog
+import oracle_schema
+import sizing
+
+STRATEGIES = ("inline", "skip", "offload")
+SKIP_PLACEHOLDER = "__cflt_skipped_value"
+OFFLOAD_PREFIX = "lob-offload/"
+# the job uploads values above this share of the threshold: it measures UTF-8
+# bytes, the connector may count a CLOB in another encoding
+OFFLOAD_THRESHOLD_MARGIN = 0.5
+OFFLOAD_QUEUE_TABLE = "CDC_LOB_OFFLOAD"
+OFFLOAD_PACKAGE = "CDC_LOB_OFFLOAD_PKG"
+OFFLOAD_JOB = "CDC_LOB_OFFLOAD_JOB"
+# seconds between two runs of the job
+OFFLOAD_JOB_INTERVAL_SECONDS = 60
+
+# Confluent Cloud keeps three replicas of every partition
+REPLICATION_FACTOR = 3
+# bytes of a parquet data file relative to the AVRO record bytes
+PARQUET_SIZE_RATIO = 0.35
+# Tableflow rewrites small files about once while compacting them
+TABLEFLOW_COMPACTION_REWRITES = 1.0
+# spread of the LOB sizes around the average (0.5 means +-50%)
+LOB_SIZE_SPREAD = 0.5
+
+
+@dataclasses.dataclass(frozen=True)
+class ConnectorLobSettings:
+    threshold_bytes: int
+    handling_mode: str
+    offload: bool = False
+    warnings: tuple[str, ...] = ()
+
+    def config(self) -> dict[str, str]:
+        """Connector config entries, the offload pointer is set by the caller."""
+        values = {
+            "lob.oversize.threshold": str(self.threshold_bytes),
+            "lob.oversize.handling.mode": self.handling_mode,
+        }
+        if self.handling_mode == "skip" and not self.offload:
+            values["skip.value.placeholder"] = SKIP_PLACEHOLDER
+        return values
+
+
+@dataclasses.dataclass(frozen=True)
+class LobCost:
+    """Estimated bytes per second for one table and strategy.
+
+    Write amplification is the Tableflow bytes relative to the source rows.
+    """
+
+    strategy: str
+    broker_bytes_per_sec: float
+    s3_offload_bytes_per_sec: float
+    tableflow_bytes_per_sec: float
+    write_amplification: float
+
+
+def offload_pointer(bucket_name: str) -> str:
+    """Placeholder the connector writes in place of an offloaded LOB."""
+    return f"s3://{bucket_name}/{OFFLOAD_PREFIX}"
+
+
+def offload_key(topic: str, primary_key: str, column: str) -> str:
+    """S3 key of an offloaded LOB value."""
+    return f"{OFFLOAD_PREFIX}{topic}/{primary_key}.{column}.lob"
+
+
+def offload_tables(tables: Iterable[catalog.TableSpec]) -> list[catalog.TableSpec]:
+    return [t for t in tables if t.lob.strategy == "offload"]
+
+
+def connector_settings(tables: list[catalog.TableSpec]) -> ConnectorLobSettings:
+    """Reduce the LOB settings of the tables captured by one connector.
+
+    The lowest threshold of the skip/offload tables wins; inline tables in the
+    same connector are reported since their LOBs will be cut as well.
+    """
+    limited = [t for t in tables if t.lob.strategy != "inline"]
+    if not limited:
+        return ConnectorLobSettings(threshold_bytes=-1, handling_mode="fail")
+
+    strategies = {t.lob.strategy for t in limited}
+    if len(strategies) > 1:
+        raise ValueError(
+            "skip and offload tables must be captured by different connectors: "
+            + ", ".join(t.qualified_name for t in limited)
+        )
+    threshold = min(t.lob.threshold_bytes for t in limited)
+    warnings = tuple(
+        f"{t.qualified_name} is inline but shares a connector "
+        f"with LOB threshold {threshold}"
+        for t in tables
+        if t.lob.strategy == "inline"
+    )
+    return ConnectorLobSettings(
+        threshold_bytes=threshold,
+        handling_mode="skip",
+        offload=strategies == {"offload"},
+        warnings=warnings,
+    )
+
+
+def oversize_fraction(avg_lob_bytes: int, threshold_bytes: int) -> float:
+    """Share of LOB values above the threshold, sizes uniform around the average."""
+    if threshold_bytes < 0 or avg_lob_bytes <= 0:
+        return 0.0
+    low = avg_lob_bytes * (1 - LOB_SIZE_SPREAD)
+    high = avg_lob_bytes * (1 + LOB_SIZE_SPREAD)
+    if threshold_bytes <= low:
+        return 1.0
+    if threshold_bytes >= high:
+        return 0.0
+    return (high - threshold_bytes) / (high - low)
+
+
+def estimate(
+    profile: sizing.TableProfile,
+    strategy: str,
+    threshold_bytes: int = -1,
+    table_formats: int = 2,
+) -> LobCost:
+    """Broker, offload and Tableflow bytes per second for a strategy."""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown LOB strategy {strategy}, use one of {STRATEGIES}")
+
+    moved = uploaded = 0.0
+    if strategy != "inline":
+        moved = profile.lob_bytes * oversize_fraction(profile.lob_bytes, threshold_bytes)
+    if strategy == "offload":
+        uploaded = profile.lob_bytes * oversize_fraction(
+            profile.lob_bytes, int(threshold_bytes * OFFLOAD_THRESHOLD_MARGIN)
+        )
+    placeholder = len(SKIP_PLACEHOLDER) if moved else 0
+    record_bytes = profile.avg_row_bytes - moved + placeholder
+    topic_bytes = profile.rows_per_second * record_bytes
+
+    tableflow = (
+        topic_bytes
+        * PARQUET_SIZE_RATIO
+        * table_formats
+        * (1 + TABLEFLOW_COMPACTION_REWRITES)
+    )
+    return LobCost(
+        strategy=strategy,
+        broker_bytes_per_sec=topic_bytes * REPLICATION_FACTOR,
+        s3_offload_bytes_per_sec=profile.rows_per_second * uploaded,
+        tableflow_bytes_per_sec=tableflow,
+        write_amplification=(
+            tableflow / profile.bytes_per_second if profile.bytes_per_second else 0.0
+        ),
+    )
+
+
+def offload_columns(
+    spec: catalog.TableSpec, table: oracle_schema.Table
+) -> tuple[str, tuple[oracle_schema.Column, ...]]:
+    """Primary key and captured LOB columns of an offload table.
+
+    Raises ValueError for tables the offload job cannot address.
+    """
+    if len(table.primary_key) != 1:
+        raise ValueError(f"{spec.qualified_name}: offload needs a single column primary key")
+    excluded = spec.excluded_columns(table)
+    columns = tuple(c for c in table.columns if c.is_lob and c.name not in excluded)
+    if not columns:
+        raise ValueError(f"{spec.qualified_name}: offload but no captured LOB column")
+    return table.primary_key[0], columns
+
+
+def render_offload_sql(
+    tables: list[catalog.TableSpec],
+    schema: dict[str, oracle_schema.Table],
+    topic_prefix: str,
+    bucket_name: str,
+) -> str:
+    """Queue table, upload job, directories and triggers of the offload tables."""
+    if not tables:
+        raise ValueError("The table catalog has no offload tables")
+    owner = tables[0].schema
+    queue = f"{owner}.{OFFLOAD_QUEUE_TABLE}"
+    package = f"{owner}.{OFFLOAD_PACKAGE}"
+    # connectors may share tables, the lowest threshold cuts them all
+    threshold = int(min(t.lob.threshold_bytes for t in tables) * OFFLOAD_THRESHOLD_MARGIN)
+    columns = {spec.name: offload_columns(spec, schema[spec.name]) for spec in tables}
+
+    lines = [
+        "-- generated by infra/lob.py (python lob.py --offload-sql)",
+        "-- LOB offload to S3, create as the admin user once `pulumi up` added the",
+        "-- S3_INTEGRATION role to the instance",
+    ]
+    for spec in tables:
+        lines += [
+            "BEGIN",
+            "  rdsadmin.rdsadmin_util.create_directory(",
+            f"    p_directory_name => '{_directory(spec)}');",
+            "END;",
+            "/",
+        ]
+    lines += [
+        "",
+        "-- LOB values waiting for the job: QUEUED, WRITTEN to a file, UPLOADING",
+        f"CREATE TABLE {queue} (",
+        "    table_name  VARCHAR2(128) NOT NULL,",
+        "    column_name VARCHAR2(128) NOT NULL,",
+        "    pk          VARCHAR2(200) NOT NULL,",
+        "    state       VARCHAR2(9) DEFAULT 'QUEUED' NOT NULL,",
+        "    task_id     VARCHAR2(64),",
+        "    changed_at  TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL,",
+        f"    CONSTRAINT {OFFLOAD_QUEUE_TABLE}_PK PRIMARY KEY (table_name, column_name, pk)",
+        ");",
+        "",
+        f"CREATE OR REPLACE PACKAGE {package} AS",
+        "  -- queue a LOB value, called by the triggers",
+        "  PROCEDURE enqueue(p_table VARCHAR2, p_column VARCHAR2, p_pk VARCHAR2);",
+        "  -- upload the queued values, run by the scheduler job",
+        "  PROCEDURE run;",
+        "END;",
+        "/",
+        "",
+        f"CREATE OR REPLACE PACKAGE BODY {package} AS",
+        f"  c_bucket    CONSTANT VARCHAR2(63) := '{bucket_name}';",
+        f"  c_threshold CONSTANT INTEGER := {threshold};",
+        "",
+        "  PROCEDURE enqueue(p_table VARCHAR2, p_column VARCHAR2, p_pk VARCHAR2) IS",
+        "  BEGIN",
+        f"    MERGE INTO {queue} q",
+        "    USING (SELECT p_table t, p_column c, p_pk k FROM dual) n",
+        "    ON (q.table_name = n.t AND q.column_name = n.c AND q.pk = n.k)",
+        "    WHEN MATCHED THEN",
+        "      UPDATE SET q.state = 'QUEUED', q.task_id = NULL, q.changed_at = SYSTIMESTAMP",
+        "    WHEN NOT MATCHED THEN",
+        "      INSERT (table_name, column_name, pk) VALUES (n.t, n.c, n.k);",
+        "  END;",
+        "",
+        "  FUNCTION directory_of(p_table VARCHAR2) RETURN VARCHAR2 IS",
+        "  BEGIN",
+        "    RETURN CASE p_table",
+        *(f"      WHEN '{spec.name}' THEN '{_directory(spec)}'" for spec in tables),
+        "    END;",
+        "  END;",
+        "",
+        "  FUNCTION s3_prefix_of(p_table VARCHAR2) RETURN VARCHAR2 IS",
+        "  BEGIN",
+        "    RETURN CASE p_table",
+        *(
+            f"      WHEN '{spec.name}' THEN "
+            f"'{OFFLOAD_PREFIX}{spec.topic_name(topic_prefix)}/'"
+            for spec in tables
+        ),
+        "    END;",
+        "  END;",
+        "",
+        "  -- the object key is the S3 prefix of the table and the file name",
+        "  FUNCTION file_of(p_column VARCHAR2, p_pk VARCHAR2) RETURN VARCHAR2 IS",
+        "  BEGIN",
+        "    RETURN p_pk || '.' || p_column || '.lob';",
+        "  END;",
+        "",
+        "  FUNCTION utf8(p_text CLOB) RETURN BLOB IS",
+        "    v_value   BLOB;",
+        "    v_dest    INTEGER := 1;",
+        "    v_src     INTEGER := 1;",
+        "    v_context INTEGER := DBMS_LOB.DEFAULT_LANG_CTX;",
+        "    v_warning INTEGER;",
+        "  BEGIN",
+        "    DBMS_LOB.CREATETEMPORARY(v_value, TRUE);",
+        "    DBMS_LOB.CONVERTTOBLOB(v_value, p_text, DBMS_LOB.LOBMAXSIZE, v_dest, v_src,",
+        "                           NLS_CHARSET_ID('AL32UTF8'), v_context, v_warning);",
+        "    RETURN v_value;",
+        "  END;",
+        "",
+        "  PROCEDURE write_file(p_directory VARCHAR2, p_file VARCHAR2, p_value BLOB) IS",
+        "    v_file   UTL_FILE.FILE_TYPE;",
+        "    v_buffer RAW(32767);",
+        "    v_amount BINARY_INTEGER;",
+        "    v_offset INTEGER := 1;",
+        "    v_length INTEGER := DBMS_LOB.GETLENGTH(p_value);",
+        "  BEGIN",
+        "    v_file := UTL_FILE.FOPEN(p_directory, p_file, 'wb', 32767);",
+        "    WHILE v_offset <= v_length LOOP",
+        "      v_amount := 32767;",
+        "      DBMS_LOB.READ(p_value, v_amount, v_offset, v_buffer);",
+        "      UTL_FILE.PUT_RAW(v_file, v_buffer, TRUE);",
+        "      v_offset := v_offset + v_amount;",
+        "    END LOOP;",
+        "    UTL_FILE.FCLOSE(v_file);",
+        "  END;",
+        "",
+        "  -- DONE or FAILED from the log of an upload task, NULL while it runs",
+        "  FUNCTION task_state(p_task_id VARCHAR2) RETURN VARCHAR2 IS",
+        "  BEGIN",
+        "    FOR l IN (SELECT text FROM TABLE(rdsadmin.rds_file_util.read_text_file(",
+        "                'BDUMP', 'dbtask-' || p_task_id || '.log'))) LOOP",
+        "      IF l.text LIKE '%finished successfully%' THEN",
+        "        RETURN 'DONE';",
+        "      ELSIF l.text LIKE '%[ERROR]%' THEN",
+        "        RETURN 'FAILED';",
+        "      END IF;",
+        "    END LOOP;",
+        "    RETURN NULL;",
+        "  EXCEPTION",
+        "    WHEN OTHERS THEN",
+        "      -- the task has not written its log yet",
+        "      RETURN NULL;",
+        "  END;",
+        "",
+        "  -- remove the files of finished uploads, upload failed ones again",
+        "  PROCEDURE finish_uploads IS",
+        "    v_state VARCHAR2(6);",
+        "  BEGIN",
+        f"    FOR t IN (SELECT DISTINCT task_id FROM {queue}",
+        "              WHERE state = 'UPLOADING') LOOP",
+        "      v_state := task_state(t.task_id);",
+        "      IF v_state = 'DONE' THEN",
+        f"        FOR r IN (SELECT table_name, column_name, pk FROM {queue}",
+        "                  WHERE state = 'UPLOADING' AND task_id = t.task_id) LOOP",
+        "          BEGIN",
+        "            UTL_FILE.FREMOVE(directory_of(r.table_name), file_of(r.column_name, r.pk));",
+        "          EXCEPTION",
+        "            WHEN UTL_FILE.INVALID_OPERATION THEN",
+        "              NULL;",
+        "          END;",
+        "        END LOOP;",
+        f"        DELETE FROM {queue} WHERE state = 'UPLOADING' AND task_id = t.task_id;",
+        "      ELSIF v_state = 'FAILED' THEN",
+        f"        UPDATE {queue} SET state = 'WRITTEN', task_id = NULL",
+        "        WHERE state = 'UPLOADING' AND task_id = t.task_id;",
+        "      END IF;",
+        "      COMMIT;",
+        "    END LOOP;",
+        "  END;",
+        "",
+        "  -- write the current values above the threshold to files, drop the others",
+        "  PROCEDURE write_queued IS",
+        "    v_value BLOB;",
+        "    v_text  CLOB;",
+        "  BEGIN",
+        f"    FOR r IN (SELECT ROWID AS rid, table_name, column_name, pk, changed_at",
+        f"              FROM {queue} WHERE state = 'QUEUED') LOOP",
+        "      v_value := NULL;",
+        "      BEGIN",
+    ]
+    first = True
+    for spec in tables:
+        pk, lob_columns = columns[spec.name]
+        for column in lob_columns:
+            keyword = "IF" if first else "ELSIF"
+            first = False
+            condition = f"r.table_name = '{spec.name}' AND r.column_name = '{column.name}'"
+            select = (
+                f"SELECT {column.name} INTO v_value FROM {spec.qualified_name} "
+                f"WHERE {pk} = r.pk;"
+            )
+            lines.append(f"        {keyword} {condition} THEN")
+            if column.data_type == "BLOB":
+                lines.append(f"          {select}")
+            else:
+                lines += [
+                    f"          {select.replace('v_value', 'v_text')}",
+                    "          IF v_text IS NOT NULL THEN",
+                    "            v_value := utf8(v_text);",
+                    "          END IF;",
+                ]
+    lines += [
+        "        END IF;",
+        "      EXCEPTION",
+        "        WHEN NO_DATA_FOUND THEN",
+        "          -- the row was deleted since",
+        "          NULL;",
+        "      END;",
+        "      IF v_value IS NULL OR DBMS_LOB.GETLENGTH(v_value) <= c_threshold THEN",
+        f"        DELETE FROM {queue} WHERE ROWID = r.rid AND changed_at = r.changed_at;",
+        "      ELSE",
+        "        write_file(directory_of(r.table_name), file_of(r.column_name, r.pk), v_value);",
+        f"        UPDATE {queue} SET state = 'WRITTEN'",
+        "        WHERE ROWID = r.rid AND changed_at = r.changed_at;",
+        "      END IF;",
+        "      IF v_value IS NOT NULL AND DBMS_LOB.ISTEMPORARY(v_value) = 1 THEN",
+        "        DBMS_LOB.FREETEMPORARY(v_value);",
+        "      END IF;",
+        "      COMMIT;",
+        "    END LOOP;",
+        "  END;",
+        "",
+        "  -- one upload task per table directory, it uploads every file in it",
+        "  PROCEDURE upload_written IS",
+        "    v_task_id VARCHAR2(64);",
+        "  BEGIN",
+        f"    FOR t IN (SELECT DISTINCT table_name FROM {queue}",
+        "              WHERE state = 'WRITTEN') LOOP",
+        "      v_task_id := rdsadmin.rdsadmin_s3_tasks.upload_to_s3(",
+        "        p_bucket_name    => c_bucket,",
+        "        p_prefix         => '',",
+        "        p_s3_prefix      => s3_prefix_of(t.table_name),",
+        "        p_directory_name => directory_of(t.table_name));",
+        f"      UPDATE {queue} SET state = 'UPLOADING', task_id = v_task_id",
+        "      WHERE table_name = t.table_name AND state = 'WRITTEN';",
+        "      COMMIT;",
+        "    END LOOP;",
+        "  END;",
+        "",
+        "  PROCEDURE run IS",
+        "  BEGIN",
+        "    finish_uploads;",
+        "    write_queued;",
+        "    upload_written;",
+        "  END;",
+        "END;",
+        "/",
+        "",
+        "-- queue every change of a captured LOB column, the job checks the size",
+    ]
+    for spec in tables:
+        pk, lob_columns = columns[spec.name]
+        lines += [
+            f"CREATE OR REPLACE TRIGGER {spec.schema}.{spec.name}_LOB_OFFLOAD",
+            f"AFTER INSERT OR UPDATE OF {', '.join(c.name for c in lob_columns)}"
+            f" ON {spec.qualified_name}",
+            "FOR EACH ROW",
+            "BEGIN",
+            *(
+                f"  {package}.enqueue('{spec.name}', '{c.name}', TO_CHAR(:new.{pk}));"
+                for c in lob_columns
+            ),
+            "END;",
+            "/",
+        ]
+    lines += [
+        "",
+        "BEGIN",
+        "  DBMS_SCHEDULER.CREATE_JOB(",
+        f"    job_name        => '{owner}.{OFFLOAD_JOB}',",
+        "    job_type        => 'STORED_PROCEDURE',",
+        f"    job_action      => '{package}.RUN',",
+        f"    repeat_interval => 'FREQ=SECONDLY;INTERVAL={OFFLOAD_JOB_INTERVAL_SECONDS}',",
+        "    enabled         => TRUE);",
+        "END;",
+        "/",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def _directory(spec: catalog.TableSpec) -> str:
+    return f"LOB_OFFLOAD_{spec.name}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Estimate the bytes of every LOB strategy or print the offload SQL."
+    )
+    parser.add_argument("--offload-sql", action="store_true", help="print the offload SQL")
+    parser.add_argument("--stack")
+    parser.add_argument("--source", help="name of the source, defaults to the first")
+    parser.add_argument("--bucket", help="defaults to the Tableflow bucket of the stack")
+    parser.add_argument("--threshold-bytes", type=int, default=64 * 1024)
+    args = parser.parse_args()
+
+    if args.offload_sql:
+        import sources
+
+        try:
+            stack = sources.offline_stack(args.stack)
+            source = sources.find(stack.sources, args.source)
+            # the bucket of resources_aws.create_s3_bucket
+            bucket = args.bucket or f"{source.resource_prefix}-tableflow-bucket"
+            sql = render_offload_sql(
+                offload_tables(stack.tables),
+                oracle_schema.load_schema(),
+                source.topic_prefix,
+                bucket,
+            )
+        except ValueError as e:
+            raise SystemExit(str(e))
+        print(sql, end="")
+    else:
+        for sample in sizing.SAMPLE_PROFILES.values():
+            for name in STRATEGIES:
+                cost = estimate(sample, name, threshold_bytes=args.threshold_bytes)
+                print(
+                    f"{sample.table_name:<22} {name:<8} "
+                    f"broker={cost.broker_bytes_per_sec / 2**20:7.2f}MiB/s "
+                    f"offload={cost.s3_offload_bytes_per_sec / 2**20:6.2f}MiB/s "
+                    f"tableflow={cost.tableflow_bytes_per_sec / 2**20:6.2f}MiB/s "
+                    f"amplification={cost.write_amplification:.2f}"
+                )
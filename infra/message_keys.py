@@ -0,0 +1,257 @@
+"""Message key strategies of the CDC topics and a partition skew analyzer.
+
+The `key` block of a catalog entry selects the record key:
+
+- `pk` (default): the primary key, records are spread by its hash.
+- `business`: the given columns (e.g. `[EVENT_ID]`) replace the key through the
+  connector's `message.key.columns`, so all rows of an event land on one
+  partition in order. Business keys are not unique, only allowed on topics
+  that are not compacted.
+- `composite`: the business columns followed by the primary key. Keys stay
+  unique for compaction and a PartitionRouting SMT picks the partition from
+  the business columns alone, so rows of an event still share a partition.
+
+The analyzer hashes a key sample like the Kafka producer does (murmur2 over
+the Avro key in Confluent wire format) and prints the load per partition.
+For composite keys the routing SMT hashes the business column values itself,
+the analyzer uses murmur2 over their encoding, which shows the same balance
+but not the same partition numbers:
+
+    python message_keys.py --table PHARMA_DOSE_REGIMENS --partitions 6
+    python message_keys.py --table PHARMA_DOSE_REGIMENS --partitions 6 \\
+        --strategy business --columns EVENT_ID --csv /tmp/trial/pharma_dose_regimens.csv
+"""
+
+import argparse
+import collections
+import csv
+import re
+
+import catalog
+import oracle_schema
+
+ROUTING_TYPE = "io.debezium.transforms.partitions.PartitionRouting"
+TOPIC_PREDICATE_TYPE = "org.apache.kafka.connect.transforms.predicates.TopicNameMatches"
+# schema registry id in the key of every record, changes the hashes, not the balance
+DEFAULT_SCHEMA_ID = 100001
+
+_MURMUR_SEED = 0x9747B28C
+_MURMUR_M = 0x5BD1E995
+_MASK = 0xFFFFFFFF
+
+
+def key_columns(spec: catalog.TableSpec, table: oracle_schema.Table) -> tuple[str, ...]:
+    """Columns of the record key, in key order."""
+    if spec.key.strategy == "pk":
+        return table.primary_key
+    if spec.key.strategy == "business":
+        return spec.key.columns
+    return spec.key.columns + tuple(
+        c for c in table.primary_key if c not in spec.key.columns
+    )
+
+
+def partition_columns(
+    spec: catalog.TableSpec, table: oracle_schema.Table
+) -> tuple[str, ...]:
+    """Columns deciding the partition of a record."""
+    if spec.key.strategy == "pk":
+        return table.primary_key
+    return spec.key.columns
+
+
+def message_key_columns(
+    specs: list[catalog.TableSpec],
+    db_name: str,
+    schema: dict[str, oracle_schema.Table],
+) -> str:
+    """Connector message.key.columns for the tables not keyed by primary key."""
+    entries = []
+    for spec in specs:
+        if spec.key.strategy == "pk":
+            continue
+        columns = key_columns(spec, schema[spec.name])
+        entries.append(f"{db_name}.{spec.qualified_name}:{','.join(columns)}")
+    return ";".join(entries)
+
+
+def routing_config(
+    specs: list[catalog.TableSpec], topic_prefix: str, partitions: dict[str, int]
+) -> dict[str, str]:
+    """PartitionRouting SMTs of the composite keys, `transforms` lists them.
+
+    They have to run before ExtractNewRecordState, `change.<column>` reads the
+    after (or for deletes the before) image of the change event. `partitions`
+    maps table names to the partition count of their topic.
+    """
+    config = {}
+    names = []
+    predicates = []
+    for spec in specs:
+        if spec.key.strategy != "composite":
+            continue
+        name = f"route_{spec.name.lower()}"
+        predicate = f"is_{spec.name.lower()}"
+        names.append(name)
+        predicates.append(predicate)
+        config[f"transforms.{name}.type"] = ROUTING_TYPE
+        config[f"transforms.{name}.partition.payload.fields"] = ",".join(
+            f"change.{c}" for c in spec.key.columns
+        )
+        config[f"transforms.{name}.partition.topic.num"] = str(partitions[spec.name])
+        config[f"transforms.{name}.partition.hash.function"] = "murmur"
+        config[f"transforms.{name}.predicate"] = predicate
+        config[f"predicates.{predicate}.type"] = TOPIC_PREDICATE_TYPE
+        config[f"predicates.{predicate}.pattern"] = re.escape(
+            spec.topic_name(topic_prefix)
+        )
+    if names:
+        config["transforms"] = ",".join(names)
+        config["predicates"] = ",".join(predicates)
+    return config
+
+
+def murmur2(data: bytes) -> int:
+    """Kafka's murmur2 hash as a signed 32 bit integer."""
+    length = len(data)
+    h = (_MURMUR_SEED ^ length) & _MASK
+    for i in range(0, length - length % 4, 4):
+        k = int.from_bytes(data[i : i + 4], "little")
+        k = (k * _MURMUR_M) & _MASK
+        k ^= k >> 24
+        k = (k * _MURMUR_M) & _MASK
+        h = (h * _MURMUR_M) & _MASK
+        h ^= k
+    tail = length & ~3
+    remaining = length % 4
+    if remaining == 3:
+        h ^= data[tail + 2] << 16
+    if remaining >= 2:
+        h ^= data[tail + 1] << 8
+    if remaining >= 1:
+        h ^= data[tail]
+        h = (h * _MURMUR_M) & _MASK
+    h ^= h >> 13
+    h = (h * _MURMUR_M) & _MASK
+    h ^= h >> 15
+    return h - (1 << 32) if h & 0x80000000 else h
+
+
+def partition(key: bytes, partitions: int) -> int:
+    """Partition the default partitioner assigns to a record key."""
+    return (murmur2(key) & 0x7FFFFFFF) % partitions
+
+
+def avro_key(
+    table: oracle_schema.Table,
+    columns: tuple[str, ...],
+    values: tuple,
+    schema_id: int = DEFAULT_SCHEMA_ID,
+) -> bytes:
+    """Serialized key record: magic byte, schema id and the Avro fields."""
+    data = bytearray(b"\x00" + schema_id.to_bytes(4, "big"))
+    for name, value in zip(columns, values):
+        column = table.column(name)
+        if column.nullable and not column.primary_key:
+            # optional fields are a union of null and the type
+            data += _varint(0 if value in (None, "") else 1)
+            if value in (None, ""):
+                continue
+        if column.data_type in ("NUMBER", "INTEGER"):
+            data += _varint(int(value))
+        else:
+            encoded = str(value).encode()
+            data += _varint(len(encoded)) + encoded
+    return bytes(data)
+
+
+def partition_load(keys, partitions: int) -> list[int]:
+    """Records per partition for an iterable of serialized keys."""
+    counts = collections.Counter(partition(key, partitions) for key in keys)
+    return [counts.get(p, 0) for p in range(partitions)]
+
+
+def skew(load: list[int]) -> float:
+    """Busiest partition relative to an even spread, 1.0 is perfectly even."""
+    total = sum(load)
+    return max(load) * len(load) / total if total else 1.0
+
+
+def _varint(value: int) -> bytes:
+    """Avro zig-zag varint of a long."""
+    value = (value << 1) ^ (value >> 63)
+    data = bytearray()
+    while value & ~0x7F:
+        data.append((value & 0x7F) | 0x80)
+        value >>= 7
+    data.append(value)
+    return bytes(data)
+
+
+def _generated_rows(table_name: str, seconds: int, rows_per_second: int):
+    """Rows of the trial data generator, updates repeat the key of their row."""
+    import datagen
+
+    generator = datagen.TrialDataGenerator(rows_per_second, update_pct=20)
+    for sec in range(seconds):
+        batch = generator.second(sec)
+        rows = batch.inserts[table_name]
+        yield from (dict(zip(datagen.COLUMNS[table_name], row)) for row in rows)
+        if table_name == "PHARMA_EVENT":
+            by_id = {row[0]: row for row in rows}
+            for event_id in batch.completed_event_ids:
+                yield dict(zip(datagen.COLUMNS[table_name], by_id[event_id]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Show how a key strategy spreads a table's records over partitions."
+    )
+    parser.add_argument("--table", default="PHARMA_DOSE_REGIMENS")
+    parser.add_argument("--partitions", type=int, default=6)
+    parser.add_argument(
+        "--strategy", choices=catalog.KEY_STRATEGIES, help="defaults to the catalog"
+    )
+    parser.add_argument("--columns", help="business key columns, comma separated")
+    parser.add_argument("--csv", help="key sample with a header row, e.g. from datagen.py")
+    parser.add_argument("--seconds", type=int, default=600, help="generated sample")
+    parser.add_argument("--rows-per-second", type=int, default=15)
+    parser.add_argument("--schema-id", type=int, default=DEFAULT_SCHEMA_ID)
+    args = parser.parse_args()
+
+    schema = oracle_schema.load_schema()
+    table = schema[args.table.upper()]
+    spec = catalog.load_catalog().require(table.name)
+    if args.strategy:
+        columns = tuple(c.strip().upper() for c in (args.columns or "").split(",") if c)
+        spec = catalog.TableSpec(
+            name=spec.name,
+            schema=spec.schema,
+            topic=spec.topic,
+            tableflow=spec.tableflow,
+            key=catalog.KeySettings(args.strategy, columns),
+        )
+
+    if args.csv:
+        with open(args.csv, "r", newline="") as f:
+            rows = [{k.upper(): v for k, v in row.items()} for row in csv.DictReader(f)]
+    else:
+        rows = list(_generated_rows(table.name, args.seconds, args.rows_per_second))
+
+    columns = partition_columns(spec, table)
+    load = partition_load(
+        (
+            avro_key(table, columns, tuple(row[c] for c in columns), args.schema_id)
+            for row in rows
+        ),
+        args.partitions,
+    )
+    print(
+        f"{table.name} {spec.key.strategy} key ({', '.join(key_columns(spec, table))}), "
+        f"partitioned by {', '.join(columns)}: {len(rows)} records, "
+        f"{len({tuple(row[c] for c in columns) for row in rows})} distinct"
+    )
+    for p, count in enumerate(load):
+        share = count / len(rows) if rows else 0.0
+        print(f"  partition {p:>3} {count:>9} {share:7.1%} {'#' * round(share * 100)}")
+    print(f"  skew {skew(load):.2f} (busiest partition vs. even spread)")
@@ -0,0 +1,47 @@
+"""Read the Pulumi project and stack config without the Pulumi engine.
+
+Offline tools (planners, simulator, benchmarks) use this to work from the same
+values `pulumi up` would see. Keys are returned the way ResourcesManager reads
+them: project keys without namespace (`tableProfiles`) and other namespaces
+with their prefix (`rds:instanceClass`). Secrets are not decrypted.
+"""
+
+import json
+import os
+
+INFRA_DIR = os.path.dirname(os.path.abspath(__file__))
+CONNECTOR_DEFAULTS_PATH = os.path.join(INFRA_DIR, "connect_xstream_default.json")
+
+
+def load_config(stack: str | None = None, project_dir: str = INFRA_DIR) -> dict:
+    """Merge the project config in Pulumi.yaml with Pulumi.<stack>.yaml."""
+    # pyyaml is installed as a dependency of the pulumi sdk
+    import yaml
+
+    with open(os.path.join(project_dir, "Pulumi.yaml"), "r") as f:
+        project = yaml.safe_load(f)
+    project_name = project["name"]
+
+    values = {}
+    for key, value in (project.get("config") or {}).items():
+        if isinstance(value, dict) and "value" in value:
+            value = value["value"]
+        values[_strip_namespace(key, project_name)] = value
+
+    if stack is not None:
+        with open(os.path.join(project_dir, f"Pulumi.{stack}.yaml"), "r") as f:
+            stack_config = (yaml.safe_load(f) or {}).get("config") or {}
+        for key, value in stack_config.items():
+            values[_strip_namespace(key, project_name)] = value
+    return values
+
+
+def load_connector_defaults(path: str = CONNECTOR_DEFAULTS_PATH) -> dict[str, str]:
+    """The connector defaults create_xstream_connector starts from."""
+    with open(path, "r") as f:
+        return json.load(f)["config"]
+
+
+def _strip_namespace(key: str, project_name: str) -> str:
+    prefix = f"{project_name}:"
+    return key[len(prefix) :] if key.startswith(prefix) else key
@@ -0,0 +1,136 @@
+"""Parse the demo schema in sql/schema.sql into table and column definitions.
+
+Only the subset of Oracle DDL used by the demo is understood (CREATE TABLE with
+inline column definitions). It is used by the offline planners to estimate row
+sizes without a database connection.
+"""
+
+import dataclasses
+import math
+import os
+import re
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "..", "sql", "schema.sql")
+
+# average size of a CLOB generated by sql/proc_create.sql
+DEFAULT_CLOB_BYTES = 500 * 1024
+
+_CREATE_TABLE = re.compile(
+    r"CREATE\s+TABLE\s+(\w+)\s*\((.*?)\);", re.IGNORECASE | re.DOTALL
+)
+_COLUMN = re.compile(r"^(\w+)\s+(\w+)(?:\s*\(\s*(\d+)(?:\s*,\s*(-?\d+))?\s*\))?(.*)$")
+_CONSTRAINT_KEYWORDS = ("CONSTRAINT", "PRIMARY", "FOREIGN", "UNIQUE", "CHECK")
+
+
+@dataclasses.dataclass(frozen=True)
+class Column:
+    name: str
+    data_type: str
+    length: int | None = None
+    # NUMBER(p,s), None when not declared (0 for a NUMBER with a precision)
+    scale: int | None = None
+    encrypted: bool = False
+    primary_key: bool = False
+    nullable: bool = True
+
+    @property
+    def is_lob(self) -> bool:
+        return self.data_type in ("CLOB", "BLOB", "NCLOB")
+
+
+@dataclasses.dataclass(frozen=True)
+class Table:
+    name: str
+    columns: tuple[Column, ...]
+
+    @property
+    def primary_key(self) -> tuple[str, ...]:
+        return tuple(c.name for c in self.columns if c.primary_key)
+
+    @property
+    def column_names(self) -> tuple[str, ...]:
+        return tuple(c.name for c in self.columns)
+
+    def column(self, name: str) -> Column:
+        for c in self.columns:
+            if c.name == name.upper():
+                return c
+        raise KeyError(f"Column {name} not found in table {self.name}")
+
+
+def parse_schema(sql: str) -> dict[str, Table]:
+    """Parse CREATE TABLE statements into tables keyed by upper case table name."""
+    sql = re.sub(r"--[^\n]*", "", sql)
+    tables: dict[str, Table] = {}
+    for match in _CREATE_TABLE.finditer(sql):
+        name = match.group(1).upper()
+        columns = []
+        for definition in _split_columns(match.group(2)):
+            column = _parse_column(definition)
+            if column is not None:
+                columns.append(column)
+        tables[name] = Table(name=name, columns=tuple(columns))
+    return tables
+
+
+def load_schema(path: str = SCHEMA_PATH) -> dict[str, Table]:
+    """Load and parse the schema file, sql/schema.sql by default."""
+    with open(path, "r") as f:
+        return parse_schema(f.read())
+
+
+def estimate_column_bytes(column: Column, clob_bytes: int = DEFAULT_CLOB_BYTES) -> int:
+    """Estimate the average stored size of a column value in bytes."""
+    if column.is_lob:
+        return clob_bytes
+    if column.data_type == "NUMBER":
+        # Oracle stores two digits per byte plus a length/exponent byte
+        return math.ceil((column.length or 38) / 2) + 1
+    if column.data_type in ("VARCHAR2", "NVARCHAR2", "CHAR", "RAW"):
+        # assume values use half of the declared length on average
+        return max(1, (column.length or 1) // 2)
+    if column.data_type == "DATE":
+        return 7
+    if column.data_type == "TIMESTAMP":
+        return 11
+    return 8
+
+
+def estimate_row_bytes(table: Table, clob_bytes: int = DEFAULT_CLOB_BYTES) -> int:
+    """Estimate the average size of a row of the table in bytes."""
+    return sum(estimate_column_bytes(c, clob_bytes) for c in table.columns)
+
+
+def _split_columns(body: str) -> list[str]:
+    """Split a table body on commas that are not nested in parentheses."""
+    parts, depth, current = [], 0, []
+    for char in body:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return [" ".join(p.split()) for p in parts if p.strip()]
+
+
+def _parse_column(definition: str) -> Column | None:
+    if definition.upper().startswith(_CONSTRAINT_KEYWORDS):
+        return None
+    match = _COLUMN.match(definition)
+    if match is None:
+        return None
+    rest = match.group(5).upper()
+    return Column(
+        name=match.group(1).upper(),
+        data_type=match.group(2).upper(),
+        length=int(match.group(3)) if match.group(3) else None,
+        scale=int(match.group(4)) if match.group(4) else None,
+        encrypted="ENCRYPT" in rest,
+        primary_key="PRIMARY KEY" in rest,
+        nullable="NOT NULL" not in rest and "PRIMARY KEY" not in rest,
+    )
@@ -0,0 +1,154 @@
+"""Existence probes that gate the stage 2 resources.
+
+All probes run at once on a thread pool and definite results are cached in a
+local TTL file cache, so repeated previews skip the cloud round trips. A probe
+distinguishes "not found" from transient errors; the latter are raised instead
+of being mistaken for a missing resource.
+"""
+
+import concurrent.futures
+import contextvars
+import enum
+import json
+import os
+import time
+from typing import Callable
+
+DEFAULT_CACHE_PATH = ".probe_cache.json"
+
+# error fragments returned by AWS when an IAM entity does not exist
+_NOT_FOUND_MARKERS = ("NoSuchEntity", "cannot be found", "not found")
+
+
+class ProbeResult(str, enum.Enum):
+    EXISTS = "exists"
+    NOT_FOUND = "not_found"
+    ERROR = "error"
+
+
+class ProbeError(Exception):
+    """A probe failed for another reason than the resource being absent."""
+
+
+class ProbeCache:
+    """JSON file cache of probe results that expire after `ttl_seconds`.
+
+    Only EXISTS results are stored: resources gating stage 2 are created once
+    and kept, while a cached NOT_FOUND would hide the stage 1 result.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, namespace: str = ""):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+        self._entries: dict[str, dict] | None = None
+
+    def get(self, name: str) -> ProbeResult | None:
+        entry = self._load().get(self._key(name))
+        if entry is None or time.time() - entry["checked_at"] > self.ttl_seconds:
+            return None
+        return ProbeResult(entry["result"])
+
+    def put(self, results: dict[str, ProbeResult]):
+        entries = self._load()
+        changed = False
+        for name, result in results.items():
+            if result == ProbeResult.EXISTS:
+                entries[self._key(name)] = {
+                    "result": result.value,
+                    "checked_at": time.time(),
+                }
+                changed = True
+            elif entries.pop(self._key(name), None) is not None:
+                changed = True
+        if changed:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(entries, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    def _key(self, name: str) -> str:
+        return f"{self.namespace}/{name}" if self.namespace else name
+
+    def _load(self) -> dict[str, dict]:
+        entries = self._entries
+        if entries is None:
+            try:
+                with open(self.path, "r") as f:
+                    entries = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                entries = {}
+            self._entries = entries
+        return entries
+
+
+def is_not_found(error: Exception) -> bool:
+    """Whether an invoke error means the looked up resource does not exist."""
+    message = str(error)
+    return any(marker in message for marker in _NOT_FOUND_MARKERS)
+
+
+def lookup_probe(lookup: Callable[[], object]) -> Callable[[], ProbeResult]:
+    """Wrap a data source lookup that raises when the resource is missing."""
+
+    def probe() -> ProbeResult:
+        try:
+            lookup()
+            return ProbeResult.EXISTS
+        except Exception as e:
+            if is_not_found(e):
+                return ProbeResult.NOT_FOUND
+            raise ProbeError(str(e)) from e
+
+    return probe
+
+
+def iam_role_probe(
+    role_name: str, get_role: Callable[..., object]
+) -> Callable[[], ProbeResult]:
+    """Probe for an IAM role using `aws.iam.get_role` or a stand-in."""
+    return lookup_probe(lambda: get_role(name=role_name))
+
+
+def run_probes(
+    probes: dict[str, Callable[[], ProbeResult]],
+    cache: ProbeCache | None = None,
+) -> dict[str, ProbeResult]:
+    """Run all probes concurrently, answering from the cache where possible.
+
+    Raises ProbeError if any probe failed with a transient error.
+    """
+    results: dict[str, ProbeResult] = {}
+    pending = {}
+    for name, probe in probes.items():
+        cached = cache.get(name) if cache else None
+        if cached is not None:
+            results[name] = cached
+        else:
+            pending[name] = probe
+
+    errors: dict[str, Exception] = {}
+    if pending:
+        with concurrent.futures.ThreadPoolExecutor(len(pending)) as executor:
+            # copy the context so invokes see the pulumi runtime settings
+            futures = {
+                name: executor.submit(contextvars.copy_context().run, probe)
+                for name, probe in pending.items()
+            }
+            for name, future in futures.items():
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    results[name] = ProbeResult.ERROR
+                    errors[name] = e
+
+    if cache:
+        cache.put(
+            {n: r for n, r in results.items() if n in pending and n not in errors}
+        )
+    if errors:
+        raise ProbeError(
+            "; ".join(f"probe {name} failed: {e}" for name, e in errors.items())
+        )
+    return results
+
@@ -0,0 +1,149 @@
+"""Wall time of the Pulumi program evaluation: imports, create_* steps and invokes.
+
+__main__.py imports the provider SDKs when their stage runs and times every
+import, every create_* step and, with `profileEvaluation`, every invoke (the
+get_* lookups such as get_caller_identity, get_vpc, get_internet_gateway and
+get_role block the program until the engine answers). A StackReference is read
+by the engine in the background, its time shows in the step waiting for its
+outputs, if any. With `profileEvaluation` the report is logged on every run:
+
+    pulumi config set profileEvaluation true
+    pulumi preview
+
+eval_bench.py runs the program under Pulumi mocks and reports the same timings
+without cloud credentials, e.g. to track the evaluation time in CI.
+"""
+
+import contextlib
+import contextvars
+import dataclasses
+import functools
+import importlib
+import sys
+import time
+import types
+from typing import Callable, Iterator
+
+KINDS = ("import", "step", "invoke")
+
+
+@dataclasses.dataclass(frozen=True)
+class Timing:
+    kind: str
+    name: str
+    # since the profiler started
+    start: float
+    seconds: float
+    # timings open around this one, e.g. 1 for an invoke inside a step
+    depth: int
+
+
+class Profiler:
+    """Wall time of named sections of the evaluation, in the order they ended."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timings: list[Timing] = []
+        # per context, the stage 2 probes invoke from worker threads
+        self._depth = contextvars.ContextVar("depth", default=0)
+
+    @contextlib.contextmanager
+    def timed(self, kind: str, name: str) -> Iterator[None]:
+        depth = self._depth.get()
+        token = self._depth.set(depth + 1)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings.append(
+                Timing(
+                    kind,
+                    name,
+                    start - self.started,
+                    time.perf_counter() - start,
+                    depth,
+                )
+            )
+            self._depth.reset(token)
+
+    def call(self, kind: str, name: str, fn: Callable, *args, **kwargs):
+        with self.timed(kind, name):
+            return fn(*args, **kwargs)
+
+    def wrap(self, kind: str, name: str, fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def timed_fn(*args, **kwargs):
+            with self.timed(kind, name):
+                return fn(*args, **kwargs)
+
+        return timed_fn
+
+    def load(self, first: str, *modules: str) -> types.ModuleType:
+        """Import the modules in order, timing each, and return the last one.
+
+        Listing the SDK before the module using it, e.g. ("pulumi_aws",
+        "resources_aws"), keeps their import times apart. Loaded modules are
+        neither imported nor timed again.
+        """
+        module = self._load(first)
+        for name in modules:
+            module = self._load(name)
+        return module
+
+    def _load(self, name: str) -> types.ModuleType:
+        module = sys.modules.get(name)
+        if module is None:
+            with self.timed("import", name):
+                module = importlib.import_module(name)
+        return module
+
+    def instrument_invokes(self, runtime):
+        """Time every blocking invoke of `runtime` (pulumi.runtime) by its token.
+
+        The generated get_* functions of the provider SDKs look up
+        `pulumi.runtime.invoke` on every call, so they pick up the wrapper.
+        """
+        invoke = runtime.invoke
+        if getattr(invoke, "profiled", False):
+            return
+
+        @functools.wraps(invoke)
+        def timed_invoke(token: str, *args, **kwargs):
+            with self.timed("invoke", token):
+                return invoke(token, *args, **kwargs)
+
+        setattr(timed_invoke, "profiled", True)
+        runtime.invoke = timed_invoke
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def totals(self) -> dict[str, float]:
+        """Seconds per kind, steps include the invokes they made."""
+        totals: dict[str, float] = dict.fromkeys(KINDS, 0.0)
+        for timing in self.timings:
+            totals[timing.kind] = totals.get(timing.kind, 0.0) + timing.seconds
+        return totals
+
+    def as_dict(self) -> dict:
+        return {
+            "elapsed": self.elapsed(),
+            "totals": self.totals(),
+            "timings": [dataclasses.asdict(t) for t in self.timings],
+        }
+
+    def report(self, min_seconds: float = 0.0) -> str:
+        """Totals and the timings of at least `min_seconds` in the order they started."""
+        totals = self.totals()
+        lines = [
+            f"evaluation {self.elapsed():.2f}s: "
+            + ", ".join(f"{kind}s {totals[kind]:.2f}s" for kind in KINDS)
+        ]
+        for timing in sorted(self.timings, key=lambda t: t.start):
+            if timing.seconds < min_seconds:
+                continue
+            indent = "  " * timing.depth
+            lines.append(
+                f"  {timing.seconds:8.3f}s  {timing.kind:<6}  {indent}{timing.name}"
+            )
+        return "\n".join(lines)
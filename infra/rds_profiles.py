@@ -0,0 +1,227 @@
+"""Performance profiles for the RDS Oracle instance.
+
+A profile (`rds:profile`) expands into the instance class, gp3 storage
+settings, storage autoscaling and the capture relevant database parameters.
+Single values can be overridden with `rds:instanceClass`, `rds:allocatedStorage`,
+`rds:maxAllocatedStorage`, `rds:iops`, `rds:storageThroughput` and
+`rds:streamsPoolSize`. Combinations RDS would reject, or that starve XStream,
+fail before anything is deployed:
+
+    python rds_profiles.py
+    python rds_profiles.py --stack dev
+"""
+
+import argparse
+import dataclasses
+
+import offline_config
+
+DEFAULT_PROFILE = "demo"
+
+# gp3 for Oracle: below 400 GiB IOPS and throughput are fixed at the baseline
+GP3_PROVISIONED_MIN_STORAGE = 400
+GP3_BASELINE_IOPS = 12000
+GP3_BASELINE_THROUGHPUT = 500
+GP3_MAX_IOPS = 64000
+GP3_MAX_THROUGHPUT = 4000
+# MiB/s of throughput per provisioned IOPS
+GP3_MAX_THROUGHPUT_PER_IOPS = 0.25
+
+# memory in GiB of the instance classes the profiles use
+INSTANCE_MEMORY_GIB = {
+    "db.t3.small": 2,
+    "db.t3.medium": 4,
+    "db.t3.large": 8,
+    "db.m5.large": 8,
+    "db.m5.xlarge": 16,
+    "db.m6i.large": 8,
+    "db.m6i.xlarge": 16,
+    "db.r5.large": 16,
+    "db.r5.xlarge": 32,
+    "db.r6i.large": 16,
+    "db.r6i.xlarge": 32,
+    "db.r6i.2xlarge": 64,
+}
+# share of the instance memory the streams pool may take from the SGA
+MAX_STREAMS_POOL_SHARE = 0.25
+# XStream needs at least this much for one capture and outbound server
+MIN_STREAMS_POOL_MB = 256
+
+
+@dataclasses.dataclass(frozen=True)
+class RdsProfile:
+    """Instance, storage and capture parameters of the RDS Oracle instance."""
+
+    name: str
+    instance_class: str
+    allocated_storage: int
+    # 0 disables storage autoscaling
+    max_allocated_storage: int = 0
+    # None keeps the gp3 baseline
+    iops: int | None = None
+    storage_throughput: int | None = None
+    streams_pool_size_mb: int = MIN_STREAMS_POOL_MB
+    # forced log switch in seconds, bounds the capture latency of idle periods
+    archive_lag_target: int = 0
+    # online redo log size and groups, applied with rdsadmin (see redo_sql)
+    redo_log_size_mb: int = 128
+    redo_log_groups: int = 4
+
+    @property
+    def burstable(self) -> bool:
+        return self.instance_class.startswith("db.t")
+
+    def parameters(self) -> dict[str, str]:
+        """Parameter group entries."""
+        values = {
+            "enable_goldengate_replication": "TRUE",
+            "streams_pool_size": str(self.streams_pool_size_mb * 1024 * 1024),
+        }
+        if self.archive_lag_target:
+            values["archive_lag_target"] = str(self.archive_lag_target)
+        return values
+
+    def redo_sql(self) -> str:
+        """rdsadmin calls resizing the online redo logs to the profile."""
+        return "\n".join(
+            [
+                f"-- {self.redo_log_groups} online redo log groups of "
+                f"{self.redo_log_size_mb}M for profile {self.name}",
+                "-- drop the old groups with rdsadmin.rdsadmin_util.drop_logfile "
+                "once they are INACTIVE",
+            ]
+            + [
+                f"EXEC rdsadmin.rdsadmin_util.add_logfile(p_size => "
+                f"'{self.redo_log_size_mb}M');"
+                for _ in range(self.redo_log_groups)
+            ]
+        )
+
+
+PROFILES = {
+    profile.name: profile
+    for profile in (
+        # matches the original setup, enough for a few rows per second
+        RdsProfile(
+            name="demo",
+            instance_class="db.t3.small",
+            allocated_storage=20,
+        ),
+        RdsProfile(
+            name="load-test",
+            instance_class="db.r6i.large",
+            allocated_storage=400,
+            max_allocated_storage=1000,
+            iops=12000,
+            storage_throughput=500,
+            streams_pool_size_mb=2048,
+            archive_lag_target=300,
+            redo_log_size_mb=1024,
+        ),
+        RdsProfile(
+            name="production",
+            instance_class="db.r6i.xlarge",
+            allocated_storage=1000,
+            max_allocated_storage=4000,
+            iops=20000,
+            storage_throughput=1000,
+            streams_pool_size_mb=4096,
+            archive_lag_target=900,
+            redo_log_size_mb=2048,
+            redo_log_groups=6,
+        ),
+    )
+}
+
+# config key to profile field
+OVERRIDES = {
+    "rds:instanceClass": ("instance_class", str),
+    "rds:allocatedStorage": ("allocated_storage", int),
+    "rds:maxAllocatedStorage": ("max_allocated_storage", int),
+    "rds:iops": ("iops", int),
+    "rds:storageThroughput": ("storage_throughput", int),
+    "rds:streamsPoolSize": ("streams_pool_size_mb", int),
+}
+
+
+def validate(profile: RdsProfile):
+    """Raise ValueError for combinations RDS rejects or XStream cannot keep up with."""
+    errors = []
+    if profile.allocated_storage < 20:
+        errors.append("allocated storage must be at least 20 GiB")
+    if profile.max_allocated_storage and (
+        profile.max_allocated_storage <= profile.allocated_storage
+    ):
+        errors.append("maxAllocatedStorage must be above allocatedStorage or 0")
+
+    provisioned = profile.iops is not None or profile.storage_throughput is not None
+    if provisioned:
+        if profile.allocated_storage < GP3_PROVISIONED_MIN_STORAGE:
+            errors.append(
+                f"gp3 iops and throughput need at least "
+                f"{GP3_PROVISIONED_MIN_STORAGE} GiB of storage"
+            )
+        if profile.iops is None or profile.storage_throughput is None:
+            errors.append("gp3 iops and storageThroughput must be set together")
+        elif not GP3_BASELINE_IOPS <= profile.iops <= GP3_MAX_IOPS:
+            errors.append(f"gp3 iops must be {GP3_BASELINE_IOPS}-{GP3_MAX_IOPS}")
+        elif not GP3_BASELINE_THROUGHPUT <= profile.storage_throughput <= GP3_MAX_THROUGHPUT:
+            errors.append(
+                f"gp3 storageThroughput must be "
+                f"{GP3_BASELINE_THROUGHPUT}-{GP3_MAX_THROUGHPUT} MiB/s"
+            )
+        elif profile.storage_throughput > profile.iops * GP3_MAX_THROUGHPUT_PER_IOPS:
+            errors.append(
+                f"gp3 storageThroughput may be at most "
+                f"{GP3_MAX_THROUGHPUT_PER_IOPS} MiB/s per IOPS"
+            )
+        if profile.burstable:
+            errors.append(
+                f"{profile.instance_class} is burstable and cannot sustain "
+                "provisioned gp3 IOPS"
+            )
+
+    memory = INSTANCE_MEMORY_GIB.get(profile.instance_class)
+    if memory is None:
+        errors.append(f"unknown instance class {profile.instance_class}")
+    elif profile.streams_pool_size_mb > memory * 1024 * MAX_STREAMS_POOL_SHARE:
+        errors.append(
+            f"streams pool of {profile.streams_pool_size_mb}M exceeds "
+            f"{MAX_STREAMS_POOL_SHARE:.0%} of the {memory} GiB of {profile.instance_class}"
+        )
+    if profile.streams_pool_size_mb < MIN_STREAMS_POOL_MB:
+        errors.append(f"streams pool must be at least {MIN_STREAMS_POOL_MB}M")
+
+    if errors:
+        raise ValueError(f"RDS profile {profile.name}: " + "; ".join(errors))
+
+
+def resolve(name: str | None, overrides: dict[str, object]) -> RdsProfile:
+    """Expand a profile name, apply the `rds:*` overrides and validate the result."""
+    name = name or DEFAULT_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Unknown RDS profile {name}, use one of {sorted(PROFILES)}")
+    changes = {
+        field: convert(overrides[key])
+        for key, (field, convert) in OVERRIDES.items()
+        if overrides.get(key) is not None
+    }
+    profile = dataclasses.replace(PROFILES[name], **changes)
+    validate(profile)
+    return profile
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Print the RDS Oracle profile of a stack with its parameters and redo SQL."
+    )
+    parser.add_argument("--stack", help="validate the profile of this stack")
+    args = parser.parse_args()
+
+    for profile in PROFILES.values():
+        validate(profile)
+    config = offline_config.load_config(args.stack)
+    resolved = resolve(config.get("rds:profile"), config)
+    print(resolved)
+    print(resolved.parameters())
+    print(resolved.redo_sql())
@@ -0,0 +1,345 @@
+"""Redo and archive log capacity planner for the captured tables.
+
+Estimates the redo the CDC workload generates per hour from the table profiles
+in Pulumi.yaml and the table definitions in sql/schema.sql (including the TDE
+column encryption overhead), and derives from it the archive log retention,
+the storage the archive logs need and the redo log size. Prints the matching
+rdsadmin SQL (replacing the fixed values in sql/xstream_setup.sql) and the
+Pulumi config values:
+
+    python redo.py
+    python redo.py --stack dev --outage-hours 12 --capture-mb-per-sec 20
+
+Besides `rowsPerSecond`, a `tableProfiles` entry may set `updatePct` and
+`deletePct` (share of inserted rows updated / deleted again) and
+`updateColumns` (columns an update changes, by default STATUS or the first
+column outside the primary key).
+
+Updates are sized for the supplemental logging of sql/xstream_setup.sql:
+minimal logging plus one log group per captured table (`--supplemental
+TABLE`, see supplemental_logging.py); `ALL` and `PRIMARY KEY` size the
+database-wide modes.
+"""
+
+import argparse
+import dataclasses
+import math
+
+import offline_config
+import oracle_schema
+import rds_profiles
+import sizing
+
+# redo record header, change vector headers and undo header per row change
+REDO_ROW_OVERHEAD = 200
+# column encryption: AES block padding, 16 byte salt and 20 byte integrity MAC
+TDE_BLOCK_BYTES = 16
+TDE_SALT_BYTES = 16
+TDE_MAC_BYTES = 20
+# SecureFile LOB encryption pads every chunk to the AES block size
+LOB_CHUNK_BYTES = 8192
+
+# RDS keeps archive logs for at most 7 days
+MAX_RETENTION_HOURS = 168
+# target time between log switches, sizes the online redo logs
+LOG_SWITCH_SECONDS = 15 * 60
+MIN_REDO_LOG_MB = 128
+MAX_REDO_LOG_MB = 4096
+
+DEFAULT_OUTAGE_HOURS = 4
+# redo the connector mines per second while catching up
+DEFAULT_CAPTURE_BYTES_PER_SEC = 32 * 1024 * 1024
+# free space kept on top of the planned archive logs and data
+STORAGE_HEADROOM = 0.3
+# hours of inserts at the profiled rates the tables hold next to the archive
+# logs: the demo loads data for minutes at a time (sql/proc_bulk_create.sql,
+# datagen.py), not around the clock
+DEFAULT_LOAD_HOURS = 1.0
+
+DATABASE_LOGGING_MODES = ("ALL", "PRIMARY KEY")
+# TABLE: minimal logging and the log groups of supplemental_logging.py
+SUPPLEMENTAL_LOGGING_MODES = ("TABLE", *DATABASE_LOGGING_MODES)
+
+
+@dataclasses.dataclass(frozen=True)
+class TableWorkload:
+    """Change rate of one table, see the `tableProfiles` keys above."""
+
+    profile: sizing.TableProfile
+    update_pct: float = 0.0
+    delete_pct: float = 0.0
+    # None updates STATUS or the first plain column, see default_update_columns
+    update_columns: tuple[str, ...] | None = None
+
+
+@dataclasses.dataclass(frozen=True)
+class RedoPlan:
+    redo_bytes_per_hour: float
+    catch_up_hours: float
+    retention_hours: int
+    archive_bytes: float
+    storage_gib: int
+    redo_log_size_mb: int
+
+
+def stored_bytes(column: oracle_schema.Column, plain_bytes: int) -> int:
+    """Bytes of a column value in the redo, after column or LOB encryption."""
+    if not column.encrypted:
+        return plain_bytes
+    if column.is_lob:
+        chunks = math.ceil(plain_bytes / LOB_CHUNK_BYTES)
+        return chunks * math.ceil(LOB_CHUNK_BYTES / TDE_BLOCK_BYTES) * TDE_BLOCK_BYTES
+    padded = (plain_bytes // TDE_BLOCK_BYTES + 1) * TDE_BLOCK_BYTES
+    return padded + TDE_SALT_BYTES + TDE_MAC_BYTES
+
+
+def column_bytes(column: oracle_schema.Column, clob_bytes: int) -> int:
+    return stored_bytes(column, oracle_schema.estimate_column_bytes(column, clob_bytes))
+
+
+def supplemental_columns(table: oracle_schema.Table, mode: str) -> tuple[str, ...]:
+    """Columns logged with every update under a database-wide logging mode.
+
+    LOB columns are never part of supplemental logging.
+    """
+    if mode not in DATABASE_LOGGING_MODES:
+        raise ValueError(f"Unknown database-wide supplemental logging {mode}")
+    if mode == "PRIMARY KEY":
+        return table.primary_key
+    return tuple(c.name for c in table.columns if not c.is_lob)
+
+
+def default_update_columns(table: oracle_schema.Table) -> tuple[str, ...]:
+    """STATUS as set by the data generators, else the first non-key column."""
+    if "STATUS" in table.column_names:
+        return ("STATUS",)
+    for column in table.columns:
+        if not column.primary_key and not column.is_lob:
+            return (column.name,)
+    return ()
+
+
+def redo_per_insert(table: oracle_schema.Table, clob_bytes: int) -> int:
+    return REDO_ROW_OVERHEAD + sum(column_bytes(c, clob_bytes) for c in table.columns)
+
+
+def redo_per_update(
+    table: oracle_schema.Table,
+    updated: tuple[str, ...],
+    logged: tuple[str, ...],
+    clob_bytes: int,
+) -> int:
+    """New and old (undo) values of the changed columns plus the logged columns."""
+    changed = sum(column_bytes(table.column(name), clob_bytes) for name in updated)
+    supplemental = sum(
+        column_bytes(table.column(name), clob_bytes)
+        for name in logged
+        if name not in updated
+    )
+    return REDO_ROW_OVERHEAD + 2 * changed + supplemental
+
+
+def redo_per_delete(table: oracle_schema.Table) -> int:
+    """The undo of a delete holds the row, LOB data stays in the LOB segment."""
+    return REDO_ROW_OVERHEAD + sum(
+        column_bytes(c, 0) for c in table.columns if not c.is_lob
+    )
+
+
+def redo_bytes_per_second(
+    table: oracle_schema.Table,
+    workload: TableWorkload,
+    logged: tuple[str, ...],
+) -> float:
+    """Redo of a table's inserts, updates and deletes per second."""
+    profile = workload.profile
+    lob_columns = sum(1 for c in table.columns if c.is_lob)
+    clob_bytes = profile.lob_bytes // lob_columns if lob_columns else 0
+    inserts = profile.rows_per_second
+    redo = inserts * redo_per_insert(table, clob_bytes)
+    if workload.update_pct:
+        updated = workload.update_columns or default_update_columns(table)
+        redo += (
+            inserts
+            * workload.update_pct
+            / 100
+            * redo_per_update(table, updated, logged, clob_bytes)
+        )
+    if workload.delete_pct:
+        redo += inserts * workload.delete_pct / 100 * redo_per_delete(table)
+    return redo
+
+
+def plan(
+    redo_per_second: float,
+    insert_bytes_per_second: float,
+    outage_hours: float = DEFAULT_OUTAGE_HOURS,
+    capture_bytes_per_sec: float = DEFAULT_CAPTURE_BYTES_PER_SEC,
+    load_hours: float = DEFAULT_LOAD_HOURS,
+) -> RedoPlan:
+    """Retention, storage and redo log size for the total redo rate.
+
+    The storage holds the archive logs of the retention and `load_hours` of
+    inserted rows.
+    """
+    if redo_per_second >= capture_bytes_per_sec:
+        raise ValueError(
+            f"redo of {redo_per_second / 2**20:.1f} MiB/s is more than the connector "
+            f"captures ({capture_bytes_per_sec / 2**20:.1f} MiB/s), it never catches up"
+        )
+    # backlog of the outage mined while new redo keeps coming in
+    catch_up_hours = outage_hours * redo_per_second / (
+        capture_bytes_per_sec - redo_per_second
+    )
+    retention_hours = max(1, math.ceil(outage_hours + catch_up_hours))
+    if retention_hours > MAX_RETENTION_HOURS:
+        raise ValueError(
+            f"archive logs would have to be kept {retention_hours} hours, "
+            f"RDS allows at most {MAX_RETENTION_HOURS}"
+        )
+    redo_per_hour = redo_per_second * 3600
+    archive_bytes = redo_per_hour * retention_hours
+    data_bytes = insert_bytes_per_second * 3600 * load_hours
+    storage_gib = math.ceil((archive_bytes + data_bytes) * (1 + STORAGE_HEADROOM) / 2**30)
+    log_mb = redo_per_second * LOG_SWITCH_SECONDS / 2**20
+    redo_log_size_mb = min(
+        MAX_REDO_LOG_MB,
+        max(MIN_REDO_LOG_MB, 2 ** math.ceil(math.log2(max(log_mb, 1)))),
+    )
+    return RedoPlan(
+        redo_bytes_per_hour=redo_per_hour,
+        catch_up_hours=catch_up_hours,
+        retention_hours=retention_hours,
+        archive_bytes=archive_bytes,
+        storage_gib=storage_gib,
+        redo_log_size_mb=redo_log_size_mb,
+    )
+
+
+def render_database_logging_sql(mode: str) -> str:
+    """Database-wide supplemental logging, instead of the table log groups."""
+    if mode not in DATABASE_LOGGING_MODES:
+        raise ValueError(f"Unknown database-wide supplemental logging {mode}")
+    return f"""-- enable supplemental logging
+begin
+    rdsadmin.rdsadmin_util.alter_supplemental_logging(
+        p_action => 'ADD',
+        p_type   => '{mode}');
+end;
+/
+"""
+
+
+def render_setup_sql(redo_plan: RedoPlan, logging_sql: str) -> str:
+    """Supplemental logging and retention blocks of sql/xstream_setup.sql."""
+    return f"""{logging_sql}
+-- enable archivelog retention, {redo_plan.redo_bytes_per_hour / 2**30:.1f} GiB redo per hour
+begin
+    rdsadmin.rdsadmin_util.set_configuration(
+        name  => 'archivelog retention hours',
+        value => '{redo_plan.retention_hours}');
+end;
+/"""
+
+
+def workloads_from_config(
+    config: dict, schema: dict[str, oracle_schema.Table]
+) -> dict[str, TableWorkload]:
+    """Workloads of the tables with a `tableProfiles` entry."""
+    workloads = {}
+    for name, values in (config.get("tableProfiles") or {}).items():
+        workloads[name] = TableWorkload(
+            profile=sizing.profile_from_config(name, values, schema),
+            update_pct=float(values.get("updatePct", 0)),
+            delete_pct=float(values.get("deletePct", 0)),
+            update_columns=(
+                tuple(c.upper() for c in values["updateColumns"])
+                if "updateColumns" in values
+                else None
+            ),
+        )
+    return workloads
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Plan redo and archive log capacity and print the setup SQL."
+    )
+    parser.add_argument("--stack")
+    parser.add_argument(
+        "--supplemental", choices=SUPPLEMENTAL_LOGGING_MODES, default="TABLE"
+    )
+    parser.add_argument("--outage-hours", type=float, default=DEFAULT_OUTAGE_HOURS)
+    parser.add_argument(
+        "--capture-mb-per-sec",
+        type=float,
+        default=DEFAULT_CAPTURE_BYTES_PER_SEC / 2**20,
+    )
+    parser.add_argument(
+        "--load-hours",
+        type=float,
+        default=DEFAULT_LOAD_HOURS,
+        help="hours of inserts the tables hold",
+    )
+    args = parser.parse_args()
+
+    config = offline_config.load_config(args.stack)
+    schema = oracle_schema.load_schema()
+    if args.supplemental == "TABLE":
+        # imports this module, so not at the top
+        import supplemental_logging
+
+        groups = supplemental_logging.table_log_groups(
+            supplemental_logging.load_tables(config),
+            schema,
+            offline_config.load_connector_defaults(),
+        )
+        logged = {name.split(".")[-1]: columns for name, columns in groups.items()}
+        logging_sql = supplemental_logging.render_sql(groups)
+    else:
+        logged = {
+            name: supplemental_columns(table, args.supplemental)
+            for name, table in schema.items()
+        }
+        logging_sql = render_database_logging_sql(args.supplemental)
+
+    total_redo = 0.0
+    total_inserted = 0.0
+    for name, workload in workloads_from_config(config, schema).items():
+        # minimal logging adds no columns to tables outside the catalog
+        redo = redo_bytes_per_second(schema[name], workload, logged.get(name, ()))
+        total_redo += redo
+        total_inserted += workload.profile.bytes_per_second
+        print(f"-- {name:<22} {redo * 3600 / 2**30:7.2f} GiB redo per hour")
+
+    redo_plan = plan(
+        total_redo,
+        total_inserted,
+        args.outage_hours,
+        args.capture_mb_per_sec * 2**20,
+        args.load_hours,
+    )
+    print(
+        f"-- catch-up after a {args.outage_hours:g}h outage: "
+        f"{redo_plan.catch_up_hours:.1f}h, archive logs: "
+        f"{redo_plan.archive_bytes / 2**30:.0f} GiB"
+    )
+    print(render_setup_sql(redo_plan, logging_sql))
+
+    profile = rds_profiles.resolve(config.get("rds:profile"), config)
+    storage = max(profile.allocated_storage, redo_plan.storage_gib)
+    overrides = {"rds:allocatedStorage": storage}
+    if profile.max_allocated_storage:
+        overrides["rds:maxAllocatedStorage"] = max(
+            profile.max_allocated_storage, 2 * storage
+        )
+    sized = dataclasses.replace(
+        rds_profiles.resolve(profile.name, {**config, **overrides}),
+        redo_log_size_mb=max(profile.redo_log_size_mb, redo_plan.redo_log_size_mb),
+    )
+    print()
+    print(sized.redo_sql())
+    print()
+    print("# Pulumi config")
+    for key, value in overrides.items():
+        print(f"{key}: {value}")
@@ -1,11 +1,13 @@
 import json
+import lob
 import pulumi
 import pulumi_aws as aws
 import resources_manager as resources
+import sources
 
 
 def create_networking(rsm: resources.ResourcesManager):
-    vpc_id = rsm.vpc_id
+    vpc_id = rsm.config.vpc_id
     if vpc_id:
         # get existing vpc by id
         vpc = aws.ec2.get_vpc(id=vpc_id)
@@ -20,87 +22,87 @@ def create_networking(rsm: resources.ResourcesManager):
         )
     else:
         vpc = aws.ec2.Vpc(
-            f"{rsm.resource_prefix}-vpc",
-            opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+            f"{rsm.config.resource_prefix}-vpc",
+            opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
             cidr_block="172.31.0.0/16",
             enable_dns_hostnames=True,
             enable_dns_support=True,
             tags={
-                **rsm.default_tags,
+                **rsm.config.default_tags,
             },
         )
         igw = aws.ec2.InternetGateway(
-            f"{rsm.resource_prefix}-igw",
-            opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+            f"{rsm.config.resource_prefix}-igw",
+            opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
             vpc_id=vpc.id,
             tags={
-                **rsm.default_tags,
+                **rsm.config.default_tags,
             },
         )
 
     # Create subnets in different AZs
     subnet1 = aws.ec2.Subnet(
-        f"{rsm.resource_prefix}-rds-subnet-1",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        f"{rsm.config.resource_prefix}-rds-subnet-1",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         vpc_id=vpc.id,
         cidr_block="172.31.60.0/24",
-        availability_zone=f"{rsm.region}a",
+        availability_zone=f"{rsm.config.region}a",
         tags={
-            **rsm.default_tags,
+            **rsm.config.default_tags,
         },
     )
 
     subnet2 = aws.ec2.Subnet(
-        f"{rsm.resource_prefix}-rds-subnet-2",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        f"{rsm.config.resource_prefix}-rds-subnet-2",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         vpc_id=vpc.id,
         cidr_block="172.31.61.0/24",
-        availability_zone=f"{rsm.region}b",
+        availability_zone=f"{rsm.config.region}b",
         tags={
-            **rsm.default_tags,
+            **rsm.config.default_tags,
         },
     )
 
     # Route table
     route_table = aws.ec2.RouteTable(
-        f"{rsm.resource_prefix}-rds-route-table",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        f"{rsm.config.resource_prefix}-rds-route-table",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         vpc_id=vpc.id,
         routes=[aws.ec2.RouteTableRouteArgs(cidr_block="0.0.0.0/0", gateway_id=igw.id)],
         tags={
-            **rsm.default_tags,
+            **rsm.config.default_tags,
         },
     )
 
     # Associate route table with subnets
     _ = aws.ec2.RouteTableAssociation(
-        f"{rsm.resource_prefix}-rds-rt-assoc-1",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        f"{rsm.config.resource_prefix}-rds-rt-assoc-1",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         subnet_id=subnet1.id,
         route_table_id=route_table.id,
     )
 
     _ = aws.ec2.RouteTableAssociation(
-        f"{rsm.resource_prefix}-rds-rt-assoc-2",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        f"{rsm.config.resource_prefix}-rds-rt-assoc-2",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         subnet_id=subnet2.id,
         route_table_id=route_table.id,
     )
 
     # DB subnet group
     db_subnet_group = aws.rds.SubnetGroup(
-        f"{rsm.resource_prefix}-rds-subnet-group",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        f"{rsm.config.resource_prefix}-rds-subnet-group",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         subnet_ids=[subnet1.id, subnet2.id],
         tags={
-            **rsm.default_tags,
+            **rsm.config.default_tags,
         },
     )
 
     # Security group with whitelisted IPs
     security_group = aws.ec2.SecurityGroup(
-        f"{rsm.resource_prefix}-rds-sg",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        f"{rsm.config.resource_prefix}-rds-sg",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         vpc_id=vpc.id,
         description="Security group for RDS Oracle instance with whitelisted IP access",
         ingress=[
@@ -143,7 +145,7 @@ def create_networking(rsm: resources.ResourcesManager):
             )
         ],
         tags={
-            **rsm.default_tags,
+            **rsm.config.default_tags,
         },
     )
     pulumi.export("aws_vpc_id", vpc.id)
@@ -156,14 +158,14 @@ def create_networking(rsm: resources.ResourcesManager):
 def create_s3_bucket(rsm: resources.ResourcesManager):
     """Create an S3 bucket for storage and return outputs."""
 
-    name = f"{rsm.resource_prefix}-tableflow-bucket"
+    name = f"{rsm.config.resource_prefix}-tableflow-bucket"
     tableflow_bucket = aws.s3.Bucket(
         name,
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         bucket=name,
         # Add tags
         tags={
-            **(rsm.default_tags),
+            **(rsm.config.default_tags),
             "purpose": "Storage for Delta/Iceberg tables used by Confluent Tableflow and Databricks",
         },
     )
@@ -179,8 +181,8 @@ def create_kms_key(rsm: resources.ResourcesManager):
 
     # Create a KMS key for TDE (Transparent Data Encryption)
     tde_kms_key = aws.kms.Key(
-        f"{rsm.resource_prefix}-tde-kms-key",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        f"{rsm.config.resource_prefix}-tde-kms-key",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         description="KMS key for RDS Oracle TDE encryption",
         key_usage="ENCRYPT_DECRYPT",
         enable_key_rotation=False,
@@ -188,7 +190,7 @@ def create_kms_key(rsm: resources.ResourcesManager):
         policy=json.dumps(
             {
                 "Version": "2012-10-17",
-                "Id": f"{rsm.resource_prefix}-tde-kms-key-policy-1",
+                "Id": f"{rsm.config.resource_prefix}-tde-kms-key-policy-1",
                 "Statement": [
                     {
                         "Sid": "Enable IAM User Permissions",
@@ -204,7 +206,7 @@ def create_kms_key(rsm: resources.ResourcesManager):
         ),
         # Add tags
         tags={
-            **(rsm.default_tags),
+            **(rsm.config.default_tags),
             "purpose": "Customer demo for TDE Encryption",
         },
     )
@@ -212,9 +214,9 @@ def create_kms_key(rsm: resources.ResourcesManager):
 
     # define alias if needed
     # _ = aws.kms.Alias(
-    #     f"{rsm.resource_prefix}-tde-kms-key-alias",
-    #     opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
-    #     name=f"alias/{rsm.resource_prefix}-tde-kms-key",
+    #     f"{rsm.config.resource_prefix}-tde-kms-key-alias",
+    #     opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
+    #     name=f"alias/{rsm.config.resource_prefix}-tde-kms-key",
     #     target_key_id=tde_kms_key.id,
     # )
     rsm.aws_kms_key = tde_kms_key
@@ -227,7 +229,7 @@ def create_deny_all_assume_role(
 
     role = aws.iam.Role(
         resource_name,
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         name=resource_name,
         assume_role_policy=json.dumps(
             {
@@ -242,7 +244,7 @@ def create_deny_all_assume_role(
             }
         ),
         tags={
-            **(rsm.default_tags),
+            **(rsm.config.default_tags),
             "purpose": purpose,
         },
     )
@@ -258,8 +260,8 @@ def create_tableflow_access_policy(rsm: resources.ResourcesManager):
 
     # IAM Role Policy for S3 access
     tableflow_policy = aws.iam.Policy(
-        f"{rsm.resource_prefix}-tableflow-role-policy",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        f"{rsm.config.resource_prefix}-tableflow-role-policy",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         policy=rsm.aws_tableflow_bucket.bucket.apply(
             lambda bucket_name: json.dumps(
                 {
@@ -295,6 +297,67 @@ def create_tableflow_access_policy(rsm: resources.ResourcesManager):
     rsm.aws_tableflow_access_policy = tableflow_policy
 
 
+def create_lob_offload_role(rsm: resources.ResourcesManager, source: sources.Source):
+    """Let the RDS instance of a source upload offloaded LOBs to the bucket."""
+
+    assert rsm.aws_tableflow_bucket, "AWS Tableflow S3 bucket is not defined"
+    instance = rsm.aws_rds_instances[source.name]
+
+    role = aws.iam.Role(
+        f"{source.resource_prefix}-lob-offload-role",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
+        assume_role_policy=json.dumps(
+            {
+                "Version": "2012-10-17",
+                "Statement": [
+                    {
+                        "Effect": "Allow",
+                        "Principal": {"Service": "rds.amazonaws.com"},
+                        "Action": "sts:AssumeRole",
+                    }
+                ],
+            }
+        ),
+        tags={
+            **(rsm.config.default_tags),
+            "purpose": "RDS upload of offloaded LOB values",
+        },
+    )
+    aws.iam.RolePolicy(
+        f"{source.resource_prefix}-lob-offload-role-policy",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
+        role=role.id,
+        policy=rsm.aws_tableflow_bucket.bucket.apply(
+            lambda bucket_name: json.dumps(
+                {
+                    "Version": "2012-10-17",
+                    "Statement": [
+                        {
+                            "Effect": "Allow",
+                            "Action": ["s3:ListBucket"],
+                            "Resource": [f"arn:aws:s3:::{bucket_name}"],
+                        },
+                        {
+                            "Effect": "Allow",
+                            "Action": ["s3:PutObject", "s3:GetObject"],
+                            "Resource": [
+                                f"arn:aws:s3:::{bucket_name}/{lob.OFFLOAD_PREFIX}*"
+                            ],
+                        },
+                    ],
+                }
+            )
+        ),
+    )
+    aws.rds.RoleAssociation(
+        f"{source.resource_prefix}-lob-offload-role-association",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
+        db_instance_identifier=instance.identifier,
+        feature_name="S3_INTEGRATION",
+        role_arn=role.arn,
+    )
+
+
 def update_tableflow_access_role(rsm: resources.ResourcesManager):
     """Update the AWS Tableflow IAM Policy with the latest policy document."""
 
@@ -305,7 +368,7 @@ def update_tableflow_access_role(rsm: resources.ResourcesManager):
 
     tableflow_assume_role = aws.iam.Role(
         rsm.tableflow_access_role_name,
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         name=rsm.tableflow_access_role_name,
         # apply on multiple including id
         assume_role_policy=rsm.cflt_s3_provider_integration.aws.apply(
@@ -335,7 +398,7 @@ def update_tableflow_access_role(rsm: resources.ResourcesManager):
             else ""
         ),
         tags={
-            **(rsm.default_tags),
+            **(rsm.config.default_tags),
             "purpose": "IAM role for Confluent Cloud Tableflow",
         },
     )
@@ -344,7 +407,7 @@ def update_tableflow_access_role(rsm: resources.ResourcesManager):
 
     _ = aws.iam.RolePolicyAttachment(
         f"{rsm.tableflow_access_role_name}-policy-attach",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         role=tableflow_assume_role.name,
         policy_arn=rsm.aws_tableflow_access_policy.arn,
     )
@@ -355,7 +418,7 @@ def update_dbx_access_role(rsm: resources.ResourcesManager):
 
     assert rsm.aws_tableflow_access_policy, "AWS Tableflow IAM Policy is not defined"
     assert rsm.dbx_storage_credentials, "Databricks Storage Credentials is not defined"
-    assert rsm.dbx_storage_credentials_external_id, (
+    assert rsm.config.dbx.storage_creds_external_id, (
         "External ID for Databricks is not defined in pulumi config!"
     )
 
@@ -363,7 +426,7 @@ def update_dbx_access_role(rsm: resources.ResourcesManager):
 
     dbx_assume_role = aws.iam.Role(
         rsm.dbx_access_role_name,
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         # apply on multiple including id
         name=rsm.dbx_access_role_name,
         # Unfotunately the below does not seem to be possible unless using an admin account setup instead of workspace
@@ -420,7 +483,7 @@ def update_dbx_access_role(rsm: resources.ResourcesManager):
                         "Action": "sts:AssumeRole",
                         "Condition": {
                             "StringEquals": {
-                                "sts:ExternalId": rsm.dbx_storage_credentials_external_id,
+                                "sts:ExternalId": rsm.config.dbx.storage_creds_external_id,
                             }
                         },
                     },
@@ -428,7 +491,7 @@ def update_dbx_access_role(rsm: resources.ResourcesManager):
             }
         ),
         tags={
-            **(rsm.default_tags),
+            **(rsm.config.default_tags),
             "purpose": "IAM role for DBX Unity Catalog to access S3 storage",
         },
     )
@@ -437,69 +500,77 @@ def update_dbx_access_role(rsm: resources.ResourcesManager):
 
     _ = aws.iam.RolePolicyAttachment(
         f"{rsm.dbx_access_role_name}-policy-attach",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         role=dbx_assume_role.name,
         policy_arn=rsm.aws_tableflow_access_policy.arn,
     )
 
 
 # Create RDS Oracle 19 EE non-CDB instance with TDE encryption
-def create_rds_oracle(rsm: resources.ResourcesManager):
-    """Create an RDS Oracle instance with TDE encryption enabled."""
+def create_rds_oracle(rsm: resources.ResourcesManager, source: sources.Source):
+    """Create the RDS Oracle instance of a source with TDE encryption enabled."""
 
     assert rsm.aws_kms_key, "AWS KMS key is not defined"
     assert rsm.aws_security_group, "AWS security group is not defined"
     assert rsm.aws_subnet_group, "AWS subnet group is not defined"
 
     rds_parameter_group = aws.rds.ParameterGroup(
-        f"{rsm.resource_prefix}-rds-parameter-group",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        f"{source.resource_prefix}-rds-parameter-group",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         family="oracle-ee-19",  # Parameter group family for Oracle 19c
+        # GoldenGate replication, streams pool and log switch of the profile
         parameters=[
-            aws.rds.ParameterGroupParameterArgs(
-                name="enable_goldengate_replication",
-                value="TRUE",  # Enable GoldenGate replication
-            )
+            aws.rds.ParameterGroupParameterArgs(name=name, value=value)
+            for name, value in source.rds_profile.parameters().items()
         ],
         tags={
-            **(rsm.default_tags),
+            **(rsm.config.default_tags),
         },
     )
 
     rds_option_group = aws.rds.OptionGroup(
-        f"{rsm.resource_prefix}-rds-option-group",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        f"{source.resource_prefix}-rds-option-group",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         engine_name="oracle-ee",  # Oracle Enterprise Edition
         major_engine_version="19",  # Major version for Oracle 19c
         options=[
             aws.rds.OptionGroupOptionArgs(
                 option_name="TDE",
             ),
+            # the LOB offload job uploads with rdsadmin_s3_tasks
+            *(
+                [aws.rds.OptionGroupOptionArgs(option_name="S3_INTEGRATION", version="1.0")]
+                if lob.offload_tables(rsm.table_catalog)
+                else []
+            ),
         ],
         tags={
-            **(rsm.default_tags),
+            **(rsm.config.default_tags),
         },
     )
 
     # Create an RDS Oracle instance with TDE enabled
     rds_oracle_instance = aws.rds.Instance(
-        f"{rsm.resource_prefix}-rds-oracle-tde",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        f"{source.resource_prefix}-rds-oracle-tde",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         # Basic configuration
-        instance_class=rsm.rds_instance_class,
+        instance_class=source.rds_profile.instance_class,
         engine="oracle-ee",  # Oracle Enterprise Edition
         engine_version="19.0.0.0.ru-2025-07.rur-2025-07.r1",  # Latest Oracle 19c version
         license_model="bring-your-own-license",  # BYOL for Oracle
         # Database configuration
-        db_name=rsm.rds_db_name,  # Default Oracle database name
-        username=rsm.rds_db_username,  # Master username
+        db_name=source.db_name,  # Default Oracle database name
+        username=rsm.config.rds.db_username,  # Master username
         # password="",  # Removed - using managed master password
         manage_master_user_password=True,  # Enable managed master password via Secrets Manager
         master_user_secret_kms_key_id=rsm.aws_kms_key.id,  # Use our KMS key for the secret
         port=1521,  # Default Oracle port
         # Storage configuration
-        allocated_storage=rsm.rds_allocated_storage,  # 200 GB initial storage
+        allocated_storage=source.rds_profile.allocated_storage,
+        max_allocated_storage=source.rds_profile.max_allocated_storage,  # 0 disables autoscaling
         storage_type="gp3",  # General Purpose SSD
+        iops=source.rds_profile.iops,  # None keeps the gp3 baseline
+        storage_throughput=source.rds_profile.storage_throughput,
         storage_encrypted=True,  # Enable storage encryption
         kms_key_id=rsm.aws_kms_key.arn,  # Use our KMS key for encryption
         apply_immediately=True,  # Apply changes immediately
@@ -516,7 +587,7 @@ def create_rds_oracle(rsm: resources.ResourcesManager):
         publicly_accessible=True,  # Allow public access from whitelisted IPs
         # Tags
         tags={
-            **(rsm.default_tags),
+            **(rsm.config.default_tags),
             "purpose": "CDC demo with TDE Encryption",
         },
         # Options for Oracle
@@ -524,5 +595,12 @@ def create_rds_oracle(rsm: resources.ResourcesManager):
         parameter_group_name=rds_parameter_group.name,  # Use custom parameter group
         skip_final_snapshot=True,  # skip final snapshot on deletion (for demo purposes only)
     )
-    pulumi.export("aws_rds_instance_endpoint", rds_oracle_instance.endpoint)
-    rsm.aws_rds_instance = rds_oracle_instance
+    pulumi.export(
+        "aws_rds_instance_endpoint"
+        if source.primary
+        else f"aws_rds_instance_endpoint_{source.name}",
+        rds_oracle_instance.endpoint,
+    )
+    rsm.aws_rds_instances[source.name] = rds_oracle_instance
+    if source.primary:
+        rsm.aws_rds_instance = rds_oracle_instance
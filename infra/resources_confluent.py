@@ -1,16 +1,31 @@
+import functools
+import heartbeat
 import json
 import pulumi
 import pulumi_confluentcloud as confluentcloud
-import pulumi_command as command
+import catalog
+import compaction
+import connector_presets
+import lob
+import message_keys
+import offline_config
 import resources_manager as resources
+import sizing
+import snapshot
+import sources
+import unity_integration
+
+# fields the ExtractNewRecordState SMT adds to every record, see serde_bench.py
+SMT_ADD_FIELDS = "op:operation_type,source.ts_us:operation_time,ts_ns:sortable_sequence"
+SMT_ADD_FIELDS_PREFIX = "db_"
 
 
 def create_environment(rsm: resources.ResourcesManager):
     """Create a Confluent Cloud Environment for the RDS Oracle instance."""
 
     environment = confluentcloud.Environment(
-        f"{rsm.resource_prefix}-ccloud-env-oracle-cdc-demo",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        f"{rsm.config.resource_prefix}-ccloud-env-oracle-cdc-demo",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         stream_governance={
             "package": "ADVANCED",
         },
@@ -19,22 +34,25 @@ def create_environment(rsm: resources.ResourcesManager):
 
 
 def create_standard_cluster(rsm: resources.ResourcesManager):
-    """Create a Confluent Cloud Standard Cluster for the RDS Oracle instance."""
+    """Create the Confluent Cloud Cluster for the RDS Oracle sources.
+
+    Standard unless the planned load needs a larger tier (see cluster_tiers.py).
+    """
 
     assert rsm.cflt_environment, "Confluent Environment not defined"
 
     kafka_cluster = confluentcloud.KafkaCluster(
-        f"{rsm.resource_prefix}-ccloud-cluster-oracle-cdc-demo",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
-        availability="SINGLE_ZONE",
+        f"{rsm.config.resource_prefix}-ccloud-cluster-oracle-cdc-demo",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         cloud="AWS",
-        region=rsm.region,
-        standard={},
+        region=rsm.config.region,
+        **rsm.cluster_plan.cluster_args(),
         environment={
             "id": rsm.cflt_environment.id,
         },
     )
     rsm.cflt_kafka_cluster = kafka_cluster
+    pulumi.export("cflt_kafka_cluster_tier", rsm.cluster_plan.description)
 
 
 def create_provider_integration(rsm: resources.ResourcesManager):
@@ -45,9 +63,9 @@ def create_provider_integration(rsm: resources.ResourcesManager):
         rsm.tableflow_access_role_name
     )
     tableflow_s3_provider_integration = confluentcloud.ProviderIntegration(
-        f"{rsm.resource_prefix}-tableflow-s3-integration",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
-        display_name=f"{rsm.resource_prefix}-tableflow-s3-integration",
+        f"{rsm.config.resource_prefix}-tableflow-s3-integration",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
+        display_name=f"{rsm.config.resource_prefix}-tableflow-s3-integration",
         aws={
             "customer_role_arn": tableflow_assume_role_arn.apply(lambda arn: str(arn)),
         },
@@ -62,18 +80,18 @@ def create_service_account(rsm: resources.ResourcesManager):
     assert rsm.cflt_environment, "Confluent Environment not defined"
     assert rsm.cflt_kafka_cluster, "Confluent Kafka Cluster not defined"
 
-    xstream_service_account_name = f"{rsm.resource_prefix}-xstream-sa"
+    xstream_service_account_name = f"{rsm.config.resource_prefix}-xstream-sa"
     xstream_service_account = confluentcloud.ServiceAccount(
         xstream_service_account_name,
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         display_name=xstream_service_account_name,
-        description=f"{rsm.resource_prefix} Service account for connectors",
+        description=f"{rsm.config.resource_prefix} Service account for connectors",
     )
 
     # add cluster admin role to service account
     xstream_service_account_env_admin_role = confluentcloud.RoleBinding(
         f"{xstream_service_account_name}-env-admin",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         principal=xstream_service_account.id.apply(lambda id: f"User:{id}"),
         role_name="EnvironmentAdmin",  # EnvironmentAdmin for demo, too permissive for production
         crn_pattern=rsm.cflt_environment.resource_name,
@@ -81,7 +99,7 @@ def create_service_account(rsm: resources.ResourcesManager):
 
     kafka_api_key = confluentcloud.ApiKey(
         f"{xstream_service_account_name}-kafka-api-key",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         display_name=f"{xstream_service_account_name}-kafka-api-key",
         description=f"Kafka API Key that is owned by '{xstream_service_account_name}' service account",
         owner=confluentcloud.ApiKeyOwnerArgs(
@@ -99,7 +117,7 @@ def create_service_account(rsm: resources.ResourcesManager):
 
     xstream_service_account_tableflow_api_key = confluentcloud.ApiKey(
         f"{xstream_service_account_name}-tableflow-api-key",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         display_name=f"{xstream_service_account_name}-tableflow-api-key",
         description=f"Tableflow API Key that is owned by '{xstream_service_account_name}' service account",
         owner=confluentcloud.ApiKeyOwnerArgs(
@@ -124,7 +142,30 @@ def create_service_account(rsm: resources.ResourcesManager):
     )
 
 
-def create_tableflow_topic(rsm: resources.ResourcesManager, topic_name: str):
+@functools.lru_cache(maxsize=None)
+def _topic_plan(
+    profile: sizing.TableProfile | None,
+    settings: catalog.TopicSettings,
+    tombstones: bool,
+) -> sizing.TopicPlan:
+    """Plan a topic once per distinct profile and catalog settings."""
+    plan = sizing.plan_topic(profile)
+    return sizing.TopicPlan(
+        partitions=settings.partitions or plan.partitions,
+        config={
+            **plan.config,
+            **compaction.topic_config(settings.compaction, tombstones),
+            **dict(settings.config),
+        },
+    )
+
+
+def create_tableflow_topics(
+    rsm: resources.ResourcesManager,
+    tables: catalog.TableCatalog,
+    source: sources.Source,
+):
+    """Create the CDC topic and Tableflow topic of every table of a source."""
     assert rsm.cflt_environment, "Confluent Environment not defined"
     assert rsm.cflt_kafka_cluster, "Confluent Kafka Cluster not defined"
     assert rsm.cflt_xstream_service_account_kafka_api_key, (
@@ -138,54 +179,86 @@ def create_tableflow_topic(rsm: resources.ResourcesManager, topic_name: str):
         "Confluent S3 Provider Integration not defined"
     )
 
-    topic = confluentcloud.KafkaTopic(
-        f"{rsm.resource_prefix}-{topic_name}-topic",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
-        topic_name=topic_name,
-        partitions_count=1,
-        config={
-            "cleanup.policy": "compact",
-        },
-        rest_endpoint=rsm.cflt_kafka_cluster.rest_endpoint,
-        kafka_cluster={
-            "id": rsm.cflt_kafka_cluster.id,
-        },
-        credentials={
-            "key": rsm.cflt_xstream_service_account_kafka_api_key.id,
-            "secret": rsm.cflt_xstream_service_account_kafka_api_key.secret,
-        },
+    # inputs shared by all topics, built once
+    topic_kafka_cluster = confluentcloud.KafkaTopicKafkaClusterArgs(
+        id=rsm.cflt_kafka_cluster.id
+    )
+    kafka_credentials = confluentcloud.KafkaTopicCredentialsArgs(
+        key=rsm.cflt_xstream_service_account_kafka_api_key.id,
+        secret=rsm.cflt_xstream_service_account_kafka_api_key.secret,
+    )
+    tableflow_kafka_cluster = confluentcloud.TableflowTopicKafkaClusterArgs(
+        id=rsm.cflt_kafka_cluster.id
+    )
+    environment = confluentcloud.TableflowTopicEnvironmentArgs(
+        id=rsm.cflt_environment.id
+    )
+    byob_aws = confluentcloud.TableflowTopicByobAwsArgs(
+        bucket_name=rsm.aws_tableflow_bucket.bucket,
+        provider_integration_id=rsm.cflt_s3_provider_integration.id,
+    )
+    tableflow_credentials = confluentcloud.TableflowTopicCredentialsArgs(
+        key=rsm.cflt_xstream_service_account_tableflow_api_key.id,
+        secret=rsm.cflt_xstream_service_account_tableflow_api_key.secret,
     )
 
-    _ = confluentcloud.TableflowTopic(
-        f"{rsm.resource_prefix}-{topic_name}-tableflow-topic",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources, depends_on=[topic]),
-        display_name=topic_name,
-        table_formats=[
-            "ICEBERG",
-            "DELTA",
-        ],
-        byob_aws=confluentcloud.TableflowTopicByobAwsArgs(
-            bucket_name=rsm.aws_tableflow_bucket.bucket,
-            provider_integration_id=rsm.cflt_s3_provider_integration.id,
-        ),
-        credentials=confluentcloud.TableflowTopicCredentialsArgs(
-            key=rsm.cflt_xstream_service_account_tableflow_api_key.id,
-            secret=rsm.cflt_xstream_service_account_tableflow_api_key.secret,
-        ),
-        kafka_cluster={
-            "id": rsm.cflt_kafka_cluster.id,
-        },
-        environment={
-            "id": rsm.cflt_environment.id,
-        },
+    # tombstone retention only matters when the connector writes tombstones
+    tombstones = compaction.tombstones_on_delete(
+        offline_config.load_connector_defaults()
     )
 
+    for table in tables:
+        topic_name = table.topic_name(source.topic_prefix)
+        plan = _topic_plan(
+            source.scaled(rsm.table_profile(table.name)), table.topic, tombstones
+        )
+        compaction.validate_topic_config(topic_name, plan.config)
+
+        topic = confluentcloud.KafkaTopic(
+            f"{rsm.config.resource_prefix}-{topic_name}-topic",
+            opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
+            topic_name=topic_name,
+            partitions_count=plan.partitions,
+            config=plan.config,
+            rest_endpoint=rsm.cflt_kafka_cluster.rest_endpoint,
+            kafka_cluster=topic_kafka_cluster,
+            credentials=kafka_credentials,
+        )
+        rsm.cflt_kafka_topics.append(topic)
+
+        _ = confluentcloud.TableflowTopic(
+            f"{rsm.config.resource_prefix}-{topic_name}-tableflow-topic",
+            opts=pulumi.ResourceOptions(
+                protect=rsm.config.protect_resources, depends_on=[topic]
+            ),
+            display_name=topic_name,
+            table_formats=list(table.tableflow.formats),
+            retention_ms=(
+                str(table.tableflow.retention_ms)
+                if table.tableflow.retention_ms is not None
+                else None
+            ),
+            byob_aws=byob_aws,
+            credentials=tableflow_credentials,
+            kafka_cluster=tableflow_kafka_cluster,
+            environment=environment,
+        )
+
+
+def create_xstream_connector(
+    rsm: resources.ResourcesManager, tables: list[str], source: sources.Source
+):
+    """Create Confluent Cloud XStream Connectors to capture changes from the RDS Oracle instance of a source.
 
-def create_xstream_connector(rsm: resources.ResourcesManager):
-    """Create a Confluent Cloud XStream Connector to capture changes from the RDS Oracle instance."""
+    The tables are split into the `xstreamShards` shards of the source, each
+    captured by its own outbound server and connector (see xstream.py for the
+    database side).
+    """
 
     # assert dependencies
-    assert rsm.aws_rds_instance, "AWS RDS instance not defined"
+    assert rsm.aws_rds_instances.get(source.name), (
+        f"AWS RDS instance of {source.name} not defined"
+    )
     assert rsm.cflt_environment, "Confluent Environment not defined"
     assert rsm.cflt_kafka_cluster, "Confluent Kafka Cluster not defined"
     assert rsm.cflt_xstream_service_account, (
@@ -194,6 +267,9 @@ def create_xstream_connector(rsm: resources.ResourcesManager):
     assert rsm.cflt_xstream_service_account_env_admin_role, (
         "Confluent XStream Service Account Environment Admin Role not defined"
     )
+    assert rsm.cflt_xstream_service_account_kafka_api_key, (
+        "Confluent Kafka API Key not defined"
+    )
 
     xstream_config = {}
     # load defaults
@@ -202,8 +278,8 @@ def create_xstream_connector(rsm: resources.ResourcesManager):
         xstream_config = json.load(f)["config"]
 
     # Set required values
-    xstream_config["name"] = f"{rsm.resource_prefix}-oracle-cdc-connector-xout"
-    xstream_config["topic.prefix"] = "rds1"
+    xstream_config["name"] = f"{source.resource_prefix}-oracle-cdc-connector-xout"
+    xstream_config["topic.prefix"] = source.topic_prefix
 
     # Kafka auth
     xstream_config["kafka.auth.mode"] = "SERVICE_ACCOUNT"
@@ -212,21 +288,21 @@ def create_xstream_connector(rsm: resources.ResourcesManager):
     xstream_config["auto.restart.on.user.error"] = "false"
 
     # Oracle DB connection
-    xstream_config["database.hostname"] = rsm.aws_rds_instance.endpoint.apply(
+    xstream_config["database.hostname"] = rsm.aws_rds_instances[
+        source.name
+    ].endpoint.apply(
         lambda endpoint: f"{endpoint.split(':')[0]}"
     )
     # xstream_config["database.port"] = oracle_ssl_port
     xstream_config["database.port"] = 1521
-    xstream_config["database.user"] = rsm.rds_cflt_user_name
-    xstream_config["database.dbname"] = rsm.rds_db_name
-    xstream_config["database.service.name"] = rsm.rds_db_name
-    xstream_config["database.out.server.name"] = rsm.rds_xout_server_name
+    xstream_config["database.user"] = rsm.config.rds.cflt_user_name
+    xstream_config["database.dbname"] = source.db_name
+    xstream_config["database.service.name"] = source.db_name
+    xstream_config["database.out.server.name"] = source.xout_server_name
     # xstream_config["database.tls.mode"] = "one-way"
     xstream_config["database.tls.mode"] = "disable"
     xstream_config["database.processor.licenses"] = "1"
 
-    xstream_config["table.include.list"] = "ADMIN.*"
-
     # SMT extract only the data we need
     xstream_config["transforms"] = "transform_0"
     xstream_config["transforms.transform_0.type"] = (
@@ -236,29 +312,138 @@ def create_xstream_connector(rsm: resources.ResourcesManager):
     xstream_config["transforms.transform_0.delete.tombstone.handling.mode"] = (
         "tombstone"
     )
-    xstream_config["transforms.transform_0.add.fields"] = (
-        "op:operation_type,source.ts_us:operation_time,ts_ns:sortable_sequence"
-    )
-    xstream_config["transforms.transform_0.add.fields.prefix"] = "db_"
-
-    # create datagen connector
-    xstream_connector = confluentcloud.Connector(
-        f"{rsm.resource_prefix}-ccloud-xstream-connector1",
-        opts=pulumi.ResourceOptions(
-            protect=rsm.protect_resources,
-            depends_on=[rsm.cflt_xstream_service_account_env_admin_role],
-        ),
-        kafka_cluster={
-            "id": rsm.cflt_kafka_cluster.id,
-        },
-        environment={
-            "id": rsm.cflt_environment.id,
-        },
-        config_sensitive={"database.password": rsm.rds_cflt_user_password},
-        config_nonsensitive=xstream_config,
+    xstream_config["transforms.transform_0.add.fields"] = SMT_ADD_FIELDS
+    xstream_config["transforms.transform_0.add.fields.prefix"] = SMT_ADD_FIELDS_PREFIX
+
+    # snapshot strategy, incremental backfills are signalled through a table
+    schema_name = rsm.table_catalog.tables[0].schema
+    xstream_config.update(
+        rsm.config.snapshot.config(
+            snapshot.signal_collection(source.db_name, schema_name)
+        )
     )
 
-    rsm.cflt_xstream_connector = xstream_connector
+    # heartbeats keep the stored redo position moving while the tables are idle
+    xstream_config.update(rsm.config.heartbeat.config(schema_name))
+    depends_on: list[pulumi.Resource] = [
+        rsm.cflt_xstream_service_account_env_admin_role
+    ]
+    if rsm.config.heartbeat.interval_ms:
+        heartbeat_topic_name = heartbeat.heartbeat_topic(source.topic_prefix)
+        heartbeat_topic = confluentcloud.KafkaTopic(
+            f"{rsm.config.resource_prefix}-{heartbeat_topic_name}-topic",
+            opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
+            topic_name=heartbeat_topic_name,
+            partitions_count=1,
+            config={"cleanup.policy": "delete", "retention.ms": str(24 * 3600 * 1000)},
+            rest_endpoint=rsm.cflt_kafka_cluster.rest_endpoint,
+            kafka_cluster=confluentcloud.KafkaTopicKafkaClusterArgs(
+                id=rsm.cflt_kafka_cluster.id
+            ),
+            credentials=confluentcloud.KafkaTopicCredentialsArgs(
+                key=rsm.cflt_xstream_service_account_kafka_api_key.id,
+                secret=rsm.cflt_xstream_service_account_kafka_api_key.secret,
+            ),
+        )
+        depends_on.append(heartbeat_topic)
+
+    # partition counts of the topics, needed to route composite keys
+    tombstones = compaction.tombstones_on_delete(xstream_config)
+
+    shards = rsm.xstream_shards(tables, source)
+    for shard in shards:
+        shard_config = dict(xstream_config)
+        # the catalog tables of the shard plus the signal and heartbeat tables,
+        # nothing else is captured or gets a topic auto-created
+        shard_config["table.include.list"] = shard.include_list
+        resource_name = f"{source.resource_prefix}-ccloud-xstream-connector1"
+        if len(shards) > 1:
+            # each shard reads from its own outbound server
+            shard_config["name"] = (
+                f"{source.resource_prefix}-oracle-cdc-connector-{shard.server_name}"
+            )
+            shard_config["database.out.server.name"] = shard.server_name
+            resource_name = (
+                f"{source.resource_prefix}-ccloud-xstream-connector{shard.index + 1}"
+            )
+
+        specs = [rsm.table_catalog.require(table) for table in shard.tables]
+        # batching preset, checked against the memory budget for the largest record
+        preset = rsm.config.connector_presets.get(
+            shard.server_name, rsm.config.connector_preset
+        )
+        shard_config.update(connector_presets.preset_config(preset))
+        try:
+            connector_presets.check(
+                shard_config["name"],
+                shard_config,
+                max(rsm.record_bytes(spec.name) for spec in specs),
+                rsm.config.connector_memory_budget,
+            )
+        except ValueError as e:
+            if preset not in (None, connector_presets.DEFAULT_PRESET):
+                raise
+            # connector defaults, kept as they were before presets existed
+            pulumi.log.warn(str(e))
+
+        # column projections of the catalog, validated against sql/schema.sql
+        column_exclude_list = catalog.column_exclude_list(specs, rsm.table_schema)
+        if column_exclude_list:
+            shard_config["column.exclude.list"] = column_exclude_list
+
+        # business and composite keys, composite keys are routed by their
+        # business columns before the record state is extracted
+        key_columns = message_keys.message_key_columns(
+            specs, source.db_name, rsm.table_schema
+        )
+        if key_columns:
+            shard_config["message.key.columns"] = key_columns
+        routing = message_keys.routing_config(
+            specs,
+            source.topic_prefix,
+            {
+                spec.name: _topic_plan(
+                    source.scaled(rsm.table_profile(spec.name)), spec.topic, tombstones
+                ).partitions
+                for spec in specs
+            },
+        )
+        if routing:
+            shard_config["transforms"] = (
+                f"{routing.pop('transforms')},{shard_config['transforms']}"
+            )
+            shard_config.update(routing)
+
+        # LOB handling is per connector, reduce the settings of its tables
+        lob_settings = lob.connector_settings(specs)
+        for warning in lob_settings.warnings:
+            pulumi.log.warn(warning)
+        shard_config.update(lob_settings.config())
+        if lob_settings.offload:
+            # readers append <topic>/<primary key>.<COLUMN>.lob to the pointer
+            shard_config["skip.value.placeholder"] = (
+                rsm.aws_tableflow_bucket.bucket.apply(lob.offload_pointer)
+            )
+
+        # create xstream connector
+        xstream_connector = confluentcloud.Connector(
+            resource_name,
+            opts=pulumi.ResourceOptions(
+                protect=rsm.config.protect_resources,
+                depends_on=depends_on,
+            ),
+            kafka_cluster={
+                "id": rsm.cflt_kafka_cluster.id,
+            },
+            environment={
+                "id": rsm.cflt_environment.id,
+            },
+            config_sensitive={"database.password": rsm.rds_cflt_user_password},
+            config_nonsensitive=shard_config,
+        )
+        rsm.cflt_xstream_connectors.append(xstream_connector)
+        if source.primary and shard.index == 0:
+            rsm.cflt_xstream_connector = xstream_connector
 
 
 def create_unity_integration(rsm: resources.ResourcesManager):
@@ -271,66 +456,26 @@ def create_unity_integration(rsm: resources.ResourcesManager):
         "Confluent Tableflow API Key is not defined"
     )
     # unity catalog is not yet available via Terraform
-    # directly calling the Confluent Cloud API instead
+    # managed through the Tableflow API by a dynamic provider instead
 
     # cc_unity_catalog_integration = confluentcloud.CatalogIntegration(f"{resource_prefix}-unity-catalog-integration",
     #     opts=pulumi.ResourceOptions(protect=protect_dbx),
     #     display_name=f"{resource_prefix}-unity-catalog-integration",
     # )
-    unity_integration = command.local.Command(
-        f"{rsm.resource_prefix}-create-unity-integration",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
-        create="./scripts/create_unity_integration.sh",
-        update="./scripts/update_unity_integration.sh",
-        delete="./scripts/delete_unity_integration.sh",
-        environment={
-            "INTEGRATION_ID": rsm.currentStack.get_output(
-                "unity_integration_catalog_id"
-            ),
-            "KAFKA_ID": rsm.cflt_kafka_cluster.id,
-            "ENV_ID": rsm.cflt_environment.id,
-            "TABLEFLOW_KEY": rsm.cflt_xstream_service_account_tableflow_api_key.id,
-            "TABLEFLOW_SECRET": rsm.cflt_xstream_service_account_tableflow_api_key.secret,
-            "DATA": pulumi.Output.all(
-                rsm.dbx_catalog.name,
-                rsm.dbx_service_principal.application_id,
-                rsm.dbx_service_principal_secret.secret,
-                rsm.cflt_environment.id,
-                rsm.cflt_kafka_cluster.id,
-            ).apply(
-                lambda args: json.dumps(
-                    {
-                        "spec": {
-                            "display_name": f"{rsm.resource_prefix}-create-unity-integration",
-                            "suspended": False,
-                            "config": {
-                                "kind": "Unity",
-                                "workspace_endpoint": rsm.dbx_host,
-                                "catalog_name": args[0],
-                                "client_id": args[1],
-                                "client_secret": args[2],
-                            },
-                            "environment": {"id": args[3]},
-                            "kafka_cluster": {
-                                "id": args[4],
-                            },
-                        }
-                    }
-                )
-            ),
-        },
-    )
-    pulumi.export("unity_integration_id", unity_integration.id)
-    pulumi.export("unity_integration_output", unity_integration.stdout)
-
-    # unity_integration_response = unity_integration.stdout.apply(
-    #     lambda output: json.loads(output)
-    # )
-
-    unity_integration_catalog_id = unity_integration.stdout.apply(
-        lambda output: str(json.loads(output)["id"])
-        if "id" in json.loads(output)
-        else rsm.currentStack.get_output("unity_integration_catalog_id")
+    unity = unity_integration.UnityIntegration(
+        f"{rsm.config.resource_prefix}-unity-integration",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
+        # same name as the integrations created by the former scripts, adopted on create
+        display_name=f"{rsm.config.resource_prefix}-create-unity-integration",
+        workspace_endpoint=rsm.config.dbx.host,
+        catalog_name=rsm.dbx_catalog.name,
+        client_id=rsm.dbx_service_principal.application_id,
+        client_secret=rsm.dbx_service_principal_secret.secret,
+        environment_id=rsm.cflt_environment.id,
+        kafka_cluster_id=rsm.cflt_kafka_cluster.id,
+        tableflow_key=rsm.cflt_xstream_service_account_tableflow_api_key.id,
+        tableflow_secret=rsm.cflt_xstream_service_account_tableflow_api_key.secret,
     )
-
-    pulumi.export("unity_integration_catalog_id", unity_integration_catalog_id)
+    rsm.cflt_unity_integration = unity
+    pulumi.export("unity_integration_id", unity.resource_id)
+    pulumi.export("unity_integration_catalog_id", unity.resource_id)
@@ -1,20 +1,24 @@
+import itertools
 import pulumi
 import pulumi_databricks as databricks
+import catalog
 import resources_manager as resources
 
 
 def create_service_principal(rsm: resources.ResourcesManager):
     dbx_sa = databricks.ServicePrincipal(
-        f"{rsm.resource_prefix}-dbx-sa",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
-        display_name=f"{rsm.resource_prefix} dbx service account for rds cdc demo",
+        f"{rsm.config.resource_prefix}-dbx-sa",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
+        display_name=(
+            f"{rsm.config.resource_prefix} dbx service account for rds cdc demo"
+        ),
         workspace_access=True,
         databricks_sql_access=True,
     )
 
     dbx_sa_secret = databricks.ServicePrincipalSecret(
-        f"{rsm.resource_prefix}-dbx-sa-secret",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        f"{rsm.config.resource_prefix}-dbx-sa-secret",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         service_principal_id=dbx_sa.id,
     )
     rsm.dbx_service_principal = dbx_sa
@@ -24,21 +28,21 @@ def create_service_principal(rsm: resources.ResourcesManager):
 def create_catalog(rsm: resources.ResourcesManager):
     assert rsm.dbx_service_principal, "Databricks Service Principal is not defined"
 
-    dbx_catalog_name = f"{rsm.resource_prefix}-rds-cdc-demo"
+    dbx_catalog_name = f"{rsm.config.resource_prefix}-rds-cdc-demo"
     dbx_catalog = databricks.Catalog(
         dbx_catalog_name,
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         name=dbx_catalog_name,
-        comment=f"{rsm.resource_prefix} CDC demo",
+        comment=f"{rsm.config.resource_prefix} CDC demo",
         properties={
-            **(rsm.default_tags),
+            **(rsm.config.default_tags),
             "purpose": "RDS Oracle CDC Demo",
         },
     )
 
     _ = databricks.Grants(
-        f"{rsm.resource_prefix}-dbx-catalog-grants",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        f"{rsm.config.resource_prefix}-dbx-catalog-grants",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         catalog=dbx_catalog.name,
         grants=[
             {
@@ -69,17 +73,17 @@ def create_storage_credentials(rsm: resources.ResourcesManager):
 
     dbx_assume_role_arn = rsm.currentStack.get_output(rsm.dbx_access_role_name)
     dbx_storage_creds = databricks.StorageCredential(
-        f"{rsm.resource_prefix}-dbx-storage-creds",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        f"{rsm.config.resource_prefix}-dbx-storage-creds",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         aws_iam_role={
             "role_arn": dbx_assume_role_arn.apply(lambda arn: str(arn)),
         },
-        comment=f"{rsm.resource_prefix} CDC demo",
+        comment=f"{rsm.config.resource_prefix} CDC demo",
     )
 
     _ = databricks.Grants(
-        f"{rsm.resource_prefix}-dbx-storage-creds-grants",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        f"{rsm.config.resource_prefix}-dbx-storage-creds-grants",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         credential=dbx_storage_creds.id,
         grants=[
             {
@@ -101,16 +105,16 @@ def create_external_storage(rsm: resources.ResourcesManager):
     assert rsm.dbx_storage_credentials, "Databricks Storage Credentials is not defined"
 
     dbx_external_location = databricks.ExternalLocation(
-        f"{rsm.resource_prefix}-dbx-external-location",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        f"{rsm.config.resource_prefix}-dbx-external-location",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         url=rsm.aws_tableflow_bucket.bucket.apply(lambda bucket: f"s3://{bucket}/"),
         credential_name=rsm.dbx_storage_credentials.name,
-        comment=f"{rsm.resource_prefix} external location for cdc demo",
+        comment=f"{rsm.config.resource_prefix} external location for cdc demo",
     )
 
     _ = databricks.Grants(
-        f"{rsm.resource_prefix}-dbx-external-location-grants",
-        opts=pulumi.ResourceOptions(protect=rsm.protect_resources),
+        f"{rsm.config.resource_prefix}-dbx-external-location-grants",
+        opts=pulumi.ResourceOptions(protect=rsm.config.protect_resources),
         external_location=dbx_external_location.id,
         grants=[
             {
@@ -125,3 +129,34 @@ def create_external_storage(rsm: resources.ResourcesManager):
     )
 
     rsm.dbx_external_location = dbx_external_location
+
+
+def create_table_grants(rsm: resources.ResourcesManager, tables: catalog.TableCatalog):
+    """Grant the catalog's Unity privileges on the tables materialized by Tableflow."""
+    assert rsm.dbx_catalog, "Databricks Catalog is not defined"
+    assert rsm.cflt_kafka_cluster, "Confluent Kafka Cluster is not defined"
+    assert rsm.cflt_unity_integration, "Unity Catalog Integration is not defined"
+
+    # every source publishes its own table of each catalog entry
+    for source, table in itertools.product(rsm.config.sources, tables):
+        if not table.grants:
+            continue
+        topic_name = table.topic_name(source.topic_prefix)
+        # Tableflow publishes topics into a schema named after the Kafka cluster id
+        _ = databricks.Grants(
+            f"{rsm.config.resource_prefix}-{topic_name}-dbx-table-grants",
+            opts=pulumi.ResourceOptions(
+                protect=rsm.config.protect_resources,
+                depends_on=[rsm.cflt_unity_integration],
+            ),
+            table=pulumi.Output.all(
+                rsm.dbx_catalog.name, rsm.cflt_kafka_cluster.id
+            ).apply(lambda args, t=topic_name: f"{args[0]}.{args[1]}.`{t}`"),
+            grants=[
+                {
+                    "principal": grant.principal,
+                    "privileges": list(grant.privileges),
+                }
+                for grant in table.grants
+            ],
+        )
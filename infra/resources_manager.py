@@ -1,8 +1,37 @@
-import ast
+import catalog
+import cluster_tiers
+import functools
+import oracle_schema
 import pulumi
-import pulumi_aws as aws
-import pulumi_confluentcloud as confluentcloud
-import pulumi_databricks as databricks
+import probes
+import sizing
+import sources
+import stack_config
+import typing
+import xstream
+
+if typing.TYPE_CHECKING:
+    # the provider SDKs are imported by the stage using them, see __main__.py
+    import pulumi_aws as aws
+    import pulumi_confluentcloud as confluentcloud
+    import pulumi_databricks as databricks
+
+
+def _read_config() -> tuple[dict, set[str]]:
+    """Raw values of stack_config.KEYS and the keys stored as secrets."""
+    raw = {}
+    secret_keys = set()
+    configs: dict[str, pulumi.Config] = {}
+    for key in stack_config.KEYS:
+        namespace, _, name = key.rpartition(":")
+        if namespace not in configs:
+            configs[namespace] = pulumi.Config(namespace or None)
+        full_key = configs[namespace].full_key(name)
+        # the runtime lookup, Config.get would warn about reading a secret
+        raw[key] = pulumi.runtime.config.get_config(full_key)
+        if pulumi.runtime.config.is_config_secret(full_key):
+            secret_keys.add(key)
+    return raw, secret_keys
 
 
 class ResourcesManager:
@@ -11,29 +40,50 @@ class ResourcesManager:
     """
 
     def __init__(self):
-        cfg = pulumi.Config()
-        self.currentStack = pulumi.StackReference(pulumi.get_stack())
-        self.resource_prefix: str = cfg.get("resourcePrefix") or "demo"
-        self.protect_resources: bool = cfg.get_bool("protectResources") or False
-        self.default_tags: dict[str, str] = ast.literal_eval(
-            cfg.get("defaultTags") or "{}"
-        )
+        # every config key, converted and validated once
+        self.config: stack_config.StackConfig = stack_config.load(*_read_config())
+        for warning in self.config.warnings:
+            pulumi.log.warn(warning)
         self.tableflow_access_role_name: str = (
-            f"{self.resource_prefix}-tableflow-access-role"
+            f"{self.config.resource_prefix}-tableflow-access-role"
+        )
+        self._probe_results: dict[str, probes.ProbeResult] | None = None
+        # captured tables and the topics derived from them
+        self.table_catalog: catalog.TableCatalog = catalog.load_catalog(
+            self.config.table_catalog or catalog.DEFAULT_CATALOG_PATH
+        )
+        # table definitions the column projections of the catalog are checked against
+        self.table_schema: dict[str, oracle_schema.Table] = oracle_schema.load_schema()
+        catalog.validate_columns(self.table_catalog, self.table_schema)
+        # cluster tier holding the topics, throughput and connectors of all sources
+        self.cluster_plan, warnings = cluster_tiers.plan(
+            cluster_tiers.Workload.total(
+                [
+                    sources.source_usage(
+                        source,
+                        self.table_catalog,
+                        {
+                            name: self.table_profile(name)
+                            for name in self.config.table_profiles
+                        },
+                        bool(self.config.heartbeat.interval_ms),
+                    )
+                    for source in self.config.sources
+                ]
+            ),
+            self.config.cluster_tier,
+            self.config.cluster_min_tier,
+            self.config.cluster_availability,
+        )
+        for warning in warnings:
+            pulumi.log.warn(warning)
+        self.rds_cflt_user_password: pulumi.Output[str] = pulumi.Output.secret(
+            self.config.rds.cflt_user_password.reveal()
         )
-        self.region: str = cfg.get("region") or "eu-central-1"
-        self.vpc_id: str = cfg.get("vpcId") or ""
-        rdsConfig = pulumi.Config("rds")
-        self.rds_instance_class: str = rdsConfig.get("instanceClass") or "db.t3.small"
-        self.rds_allocated_storage: int = int(rdsConfig.get("allocatedStorage") or "20")
-        self.rds_db_name: str = rdsConfig.get("dbName") or ""
-        self.rds_db_username: str = rdsConfig.get("dbUsername") or ""
-        self.rds_cflt_user_name: str = rdsConfig.get("cfltUserName") or ""
-        self.rds_cflt_user_password: str = rdsConfig.get("cfltUserPassword") or ""
-        self.rds_xout_server_name: str = rdsConfig.get("xoutServerName") or ""
         # AWS resources
         self.aws_kms_key: aws.kms.Key
         self.aws_rds_instance: aws.rds.Instance
+        self.aws_rds_instances: dict[str, aws.rds.Instance] = {}
         self.aws_tableflow_bucket: aws.s3.Bucket
         self.aws_tableflow_access_policy: aws.iam.Policy
         self.aws_tableflow_access_role: aws.iam.Role
@@ -48,34 +98,98 @@ class ResourcesManager:
         self.cflt_xstream_service_account_kafka_api_key: confluentcloud.ApiKey
         self.cflt_xstream_service_account_tableflow_api_key: confluentcloud.ApiKey
         self.cflt_xstream_connector: confluentcloud.Connector
+        self.cflt_xstream_connectors: list[confluentcloud.Connector] = []
         self.cflt_s3_provider_integration: confluentcloud.ProviderIntegration
+        self.cflt_unity_integration: pulumi.CustomResource
+        self.cflt_kafka_topics: list[confluentcloud.KafkaTopic] = []
         # DBX resources
-        dbxConfig = pulumi.Config("dbx")
-        self.dbx_host: str = dbxConfig.get("host") or ""
-        self.dbx_storage_credentials_external_id: str = (
-            dbxConfig.get("storageCredsExternalId") or ""
+        self.dbx_access_role_name: str = (
+            f"{self.config.resource_prefix}-dbx-access-role"
         )
-        self.dbx_access_role_name: str = f"{self.resource_prefix}-dbx-access-role"
         self.dbx_catalog: databricks.Catalog
         self.dbx_service_principal: databricks.ServicePrincipal
         self.dbx_service_principal_secret: databricks.ServicePrincipalSecret
         self.dbx_storage_credentials: databricks.StorageCredential
         self.dbx_external_location: databricks.ExternalLocation
 
+    def table_profile(self, table_name: str) -> sizing.TableProfile | None:
+        """Return the throughput profile of a table if one is configured."""
+        values = self.config.table_profiles.get(table_name)
+        if values is None:
+            return None
+        spec = self.table_catalog.get(table_name)
+        return sizing.profile_from_config(
+            table_name,
+            values,
+            self.table_schema,
+            spec.excluded_columns(self.table_schema[spec.name]) if spec else (),
+        )
+
+    def xstream_shards(
+        self, tables: list[str], source: sources.Source
+    ) -> list[xstream.Shard]:
+        """Split the captured tables of a source into shards weighted by their profile."""
+        return xstream.plan_capture(
+            tables,
+            {name: self.table_profile(name) for name in self.config.table_profiles},
+            source.xstream_shards,
+            source.xout_server_name,
+            xstream.shared_tables(
+                self.table_catalog.tables[0].schema,
+                self.config.snapshot.strategy,
+                self.config.heartbeat.table,
+            ),
+        )
+
+    def record_bytes(self, table_name: str) -> int:
+        """Largest expected record of a table, from its profile or the schema."""
+        profile = self.table_profile(table_name)
+        if profile is not None:
+            return profile.max_row_bytes or profile.avg_row_bytes
+        return oracle_schema.estimate_row_bytes(self.table_schema[table_name])
+
+    @functools.cached_property
+    def currentStack(self) -> pulumi.StackReference:
+        """Reference to the outputs of this stack, created on first use."""
+        return pulumi.StackReference(pulumi.get_stack())
+
+    def stage_2_probes(self) -> dict[str, probes.ProbeResult]:
+        """Run all existence checks gating stage 2 at once, cached per stack."""
+        if self._probe_results is None:
+            cache = None
+            if self.config.probe_cache_ttl > 0:
+                cache = probes.ProbeCache(
+                    probes.DEFAULT_CACHE_PATH,
+                    self.config.probe_cache_ttl,
+                    namespace=f"{pulumi.get_project()}/{pulumi.get_stack()}",
+                )
+            import pulumi_aws as aws
+
+            self._probe_results = probes.run_probes(
+                {
+                    name: probes.iam_role_probe(name, aws.iam.get_role)
+                    for name in (
+                        self.tableflow_access_role_name,
+                        self.dbx_access_role_name,
+                    )
+                },
+                cache,
+            )
+            for name, result in self._probe_results.items():
+                if result == probes.ProbeResult.NOT_FOUND:
+                    pulumi.log.info(f"AWS Role {name} does not exist yet.")
+        return self._probe_results
+
     def tableflow_access_role_exists(self) -> bool:
         """Check if the Tableflow Assume Role exists."""
-        return _aws_role_exists(self.tableflow_access_role_name)
+        return (
+            self.stage_2_probes()[self.tableflow_access_role_name]
+            == probes.ProbeResult.EXISTS
+        )
 
     def databricks_access_role_exists(self) -> bool:
-        """Check if the Tableflow Assume Role exists."""
-        return _aws_role_exists(self.dbx_access_role_name)
-
-
-def _aws_role_exists(resource_name: str) -> bool:
-    """Check if the role exists."""
-    try:
-        _ = aws.iam.get_role(name=resource_name)
-        return True
-    except Exception as _:
-        pulumi.log.info(f"AWS Role {resource_name} does not exist yet.")
-        return False
+        """Check if the Databricks Assume Role exists."""
+        return (
+            self.stage_2_probes()[self.dbx_access_role_name]
+            == probes.ProbeResult.EXISTS
+        )
@@ -0,0 +1,243 @@
+"""Base for dynamic providers of Confluent Cloud resources missing in Terraform.
+
+A resource type is a small subclass of RestResourceProvider: the collection
+path, `spec` (the request spec of the inputs) and, where the API needs them,
+the scope query parameters. The base class provides the lifecycle on top of
+the shared sessions of confluent_api.py:
+
+- `diff` compares inputs with the state and makes no API call,
+- `create` adopts an existing resource with the same display name, so a run
+  that failed after the POST is reconciled instead of duplicated,
+- `update` reads the resource (ETag revalidated) and only patches the spec
+  fields that differ, write-only fields are compared with the old inputs,
+- `read` refreshes the state, `delete` treats 404 as done.
+
+Every resource takes `api_key`, `api_secret` and `base_url` inputs; the
+secrets among the inputs are kept secret in the state. See unity_integration.py
+for an example.
+"""
+
+import abc
+import urllib.parse
+
+import pulumi
+import pulumi.dynamic
+
+import confluent_api
+
+CREDENTIAL_INPUTS = ("api_key", "api_secret", "base_url")
+
+
+class RestResourceProvider(pulumi.dynamic.ResourceProvider, abc.ABC):
+    # collection path, e.g. /tableflow/v1/catalog-integrations
+    path: str = ""
+    # inputs that cannot be patched and need a new resource
+    replace_inputs: tuple[str, ...] = ()
+    # inputs compared with the previous state instead of the API response
+    secret_inputs: tuple[str, ...] = ("api_secret",)
+    # spec fields the API never returns
+    write_only_fields: tuple[str, ...] = ()
+    # outputs computed by the provider, ignored by diff
+    outputs: tuple[str, ...] = ("resource_id",)
+
+    @abc.abstractmethod
+    def spec(self, props: dict) -> dict:
+        """Request spec of the inputs."""
+
+    def scope(self, props: dict) -> dict[str, str]:
+        """Query parameters every request of the resource needs."""
+        return {}
+
+    def patch_body(self, props: dict, fields: list[str]) -> dict:
+        spec = self.spec(props)
+        return {"spec": {field: spec[field] for field in fields}}
+
+    def state(self, props: dict, resource: dict) -> dict:
+        """Outputs of the inputs and the API response."""
+        return {**props, "resource_id": resource["id"]}
+
+    def session(self, props: dict) -> confluent_api.Session:
+        return confluent_api.session(
+            props["api_key"],
+            props["api_secret"],
+            props.get("base_url") or confluent_api.DEFAULT_BASE_URL,
+        )
+
+    def get(
+        self, session: confluent_api.Session, id_: str, props: dict, cached: bool = True
+    ) -> dict | None:
+        try:
+            return session.request(
+                "GET", f"{self.path}/{id_}", self.scope(props), cached=cached
+            )
+        except confluent_api.ApiError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    def find(self, session: confluent_api.Session, props: dict) -> dict | None:
+        """Resource in scope with the display name of the inputs."""
+        display_name = self.spec(props).get("display_name")
+        if display_name is None:
+            return None
+        params = self.scope(props)
+        while True:
+            page = session.request("GET", self.path, params) or {}
+            for resource in page.get("data") or []:
+                if (resource.get("spec") or {}).get("display_name") == display_name:
+                    return resource
+            next_url = (page.get("metadata") or {}).get("next")
+            token = urllib.parse.parse_qs(
+                urllib.parse.urlsplit(next_url or "").query
+            ).get("page_token")
+            if not token:
+                return None
+            params = {**self.scope(props), "page_token": token[0]}
+
+    def changed_fields(self, current: dict, props: dict, secret_changed: bool) -> list[str]:
+        """Top-level spec fields whose current value differs from the inputs."""
+        changed = []
+        for field, value in self.spec(props).items():
+            if secret_changed and self._has_write_only(value):
+                changed.append(field)
+            elif self._differs(current.get(field), value):
+                changed.append(field)
+        return changed
+
+    def diff(self, _id: str, olds: dict, news: dict) -> pulumi.dynamic.DiffResult:
+        changes = [
+            k
+            for k, v in news.items()
+            if k != "__provider" and k not in self.outputs and olds.get(k) != v
+        ]
+        return pulumi.dynamic.DiffResult(
+            changes=bool(changes),
+            replaces=[k for k in changes if k in self.replace_inputs],
+            delete_before_replace=True,
+        )
+
+    def create(self, props: dict) -> pulumi.dynamic.CreateResult:
+        session = self.session(props)
+        existing = self.find(session, props)
+        if existing is None:
+            resource = self._write(
+                session, "POST", self.path, {"spec": self.spec(props)}
+            )
+        else:
+            # adopt it, e.g. after a run that failed once the POST went through
+            fields = self.changed_fields(existing.get("spec") or {}, props, True)
+            resource = self._patch(session, existing, props, fields)
+        return pulumi.dynamic.CreateResult(resource["id"], self.state(props, resource))
+
+    def read(self, id_: str, props: dict) -> pulumi.dynamic.ReadResult:
+        resource = self.get(self.session(props), id_, props, cached=False)
+        if resource is None:
+            # gone, the next update creates it again
+            return pulumi.dynamic.ReadResult(None, props)
+        return pulumi.dynamic.ReadResult(id_, self.state(props, resource))
+
+    def update(self, id_: str, olds: dict, news: dict) -> pulumi.dynamic.UpdateResult:
+        session = self.session(news)
+        current = self.get(session, id_, news, cached=False)
+        if current is None:
+            raise confluent_api.ApiError("GET", f"{self.path}/{id_}", 404, "not found")
+        secret_changed = any(
+            olds.get(k) != news.get(k)
+            for k in self.secret_inputs
+            if k not in CREDENTIAL_INPUTS
+        )
+        fields = self.changed_fields(current.get("spec") or {}, news, secret_changed)
+        if fields:
+            current = self._patch(session, current, news, fields)
+        return pulumi.dynamic.UpdateResult(self.state(news, current))
+
+    def delete(self, id_: str, props: dict):
+        try:
+            self.session(props).request(
+                "DELETE", f"{self.path}/{id_}", self.scope(props)
+            )
+        except confluent_api.ApiError as e:
+            if e.status != 404:
+                raise
+
+    def _patch(
+        self,
+        session: confluent_api.Session,
+        current: dict,
+        props: dict,
+        fields: list[str],
+    ) -> dict:
+        return self._write(
+            session,
+            "PATCH",
+            f"{self.path}/{current['id']}",
+            self.patch_body(props, fields),
+        )
+
+    def _write(
+        self, session: confluent_api.Session, method: str, path: str, body: dict
+    ) -> dict:
+        """POST or PATCH a resource, the API answers with the written resource."""
+        resource = session.request(method, path, body=body)
+        if resource is None:
+            raise RuntimeError(f"{method} {path} returned no resource")
+        return resource
+
+    def _has_write_only(self, value) -> bool:
+        return isinstance(value, dict) and any(
+            k in self.write_only_fields or self._has_write_only(v)
+            for k, v in value.items()
+        )
+
+    def _differs(self, current, desired) -> bool:
+        """Compare a returned value, fields the API leaves out do not count."""
+        if current is None:
+            return False
+        if isinstance(desired, dict):
+            return not isinstance(current, dict) or any(
+                self._differs(current.get(k), v)
+                for k, v in desired.items()
+                if k not in self.write_only_fields
+            )
+        return current != desired
+
+
+class RestResource(pulumi.dynamic.Resource):
+    """Dynamic resource of a RestResourceProvider.
+
+    `props` are the resource inputs without the credentials.
+    """
+
+    resource_id: pulumi.Output[str]
+
+    def __init__(
+        self,
+        provider: RestResourceProvider,
+        name: str,
+        props: dict,
+        api_key: pulumi.Input[str],
+        api_secret: pulumi.Input[str],
+        base_url: str = confluent_api.DEFAULT_BASE_URL,
+        opts: pulumi.ResourceOptions | None = None,
+    ):
+        inputs = {
+            **{
+                k: pulumi.Output.secret(v) if k in provider.secret_inputs else v
+                for k, v in props.items()
+            },
+            "api_key": api_key,
+            "api_secret": pulumi.Output.secret(api_secret),
+            "base_url": base_url,
+            **{k: None for k in provider.outputs},
+        }
+        super().__init__(
+            provider,
+            name,
+            inputs,
+            pulumi.ResourceOptions.merge(
+                opts,
+                pulumi.ResourceOptions(
+                    additional_secret_outputs=list(provider.secret_inputs)
+                ),
+            ),
+        )
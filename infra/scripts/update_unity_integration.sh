@@ -1,7 +0,0 @@
-# Updates unity catalog integration using the Confluent Cloud API
-# Requires a Tableflow scoped API Key
-curl --request PATCH \
-  --url "https://api.confluent.cloud/tableflow/v1/catalog-integrations/$INTEGRATION_ID" \
-  --header "Authorization: Basic $(echo -n $TABLEFLOW_KEY:$TABLEFLOW_SECRET | base64 -w 0)" \
-  --header 'content-type: application/json' \
-  --data "$DATA"
@@ -0,0 +1,405 @@
+"""Benchmark record size and serialization cost of the CDC topics offline.
+
+Generates Debezium style change events for the tables in sql/schema.sql,
+applies the equivalent of the ExtractNewRecordState SMT configured in
+create_xstream_connector and serializes the result the way the connector
+would (Schema Registry wire format for AVRO, JSON_SR and PROTOBUF), then
+compresses record batches with the available codecs (zstd, lz4 and snappy
+need the optional packages of requirements-dev.txt):
+
+    python serde_bench.py
+    python serde_bench.py --records 200 --clob-bytes 0 --codec gzip --codec zstd
+
+Type mapping follows the connector defaults in connect_xstream_default.json:
+`decimal.handling.mode`, `binary.handling.mode` and `time.precision.mode`.
+Records carry the key of the catalog entry (message_keys.py), the SMT fields
+are read from resources_confluent.py, so the packages of requirements.txt
+have to be installed.
+"""
+
+import argparse
+import base64
+import decimal
+import gzip
+import json
+import random
+import struct
+import time
+from typing import Callable
+
+import catalog
+import datagen
+import message_keys
+import offline_config
+import oracle_schema
+import resources_confluent
+
+SCHEMA_ID = 100001
+BATCH_RECORDS = 100
+
+# NUMBER(p,0) below the precision Debezium emits as INT32 and as INT64
+_INT_PRECISION = 10
+_LONG_PRECISION = 19
+
+_WORDS = (
+    "patient dosage adjustment follow-up visit reported mild headache compliance "
+    "medication batch verified vital signs normal range adverse event documented"
+).split()
+
+
+def generate_row(
+    table: oracle_schema.Table, rng: random.Random, clob: str
+) -> dict[str, object]:
+    """Random column values shaped like the rows of generate_trial_data_bulk.
+
+    `clob` is the value of the LOB columns, one of the blocks of
+    datagen.build_block the rows share round robin like the generator.
+    """
+    row: dict[str, object] = {}
+    for column in table.columns:
+        if column.is_lob:
+            row[column.name] = clob
+        elif column.data_type == "NUMBER":
+            row[column.name] = rng.randrange(10 ** min(column.length or 10, 15))
+        elif column.data_type in ("VARCHAR2", "CHAR"):
+            length = max(1, (column.length or 20) // 2)
+            row[column.name] = " ".join(rng.choice(_WORDS) for _ in range(8))[:length]
+        elif column.data_type in ("DATE", "TIMESTAMP"):
+            # epoch micro seconds
+            row[column.name] = 1_700_000_000_000_000 + rng.randrange(10**12)
+        else:
+            row[column.name] = None
+    return row
+
+
+def envelope(table: oracle_schema.Table, row: dict, op: str, ts_us: int) -> dict:
+    """Debezium change event for the row."""
+    return {
+        "before": row if op == "d" else None,
+        "after": None if op == "d" else row,
+        "source": {
+            "connector": "Oracle XStream",
+            "name": "rds1",
+            "ts_ms": ts_us // 1000,
+            "ts_us": ts_us,
+            "db": "ORCL",
+            "schema": "ADMIN",
+            "table": table.name,
+        },
+        "op": op,
+        "ts_ms": ts_us // 1000,
+        "ts_us": ts_us,
+        "ts_ns": ts_us * 1000,
+    }
+
+
+def extract_new_record_state(
+    event: dict,
+    add_fields: str = resources_confluent.SMT_ADD_FIELDS,
+    prefix: str = resources_confluent.SMT_ADD_FIELDS_PREFIX,
+) -> dict:
+    """Flatten an event like ExtractNewRecordState with rewrite delete handling."""
+    deleted = event["op"] == "d"
+    record = dict(event["before"] if deleted else event["after"])
+    for spec in add_fields.split(","):
+        path, _, alias = spec.partition(":")
+        value: object = event
+        for part in path.split("."):
+            value = value[part]  # type: ignore[index]
+        record[prefix + (alias or path.replace(".", "_"))] = value
+    record["__deleted"] = "true" if deleted else "false"
+    return record
+
+
+def field_types(table: oracle_schema.Table, connector: dict[str, str]) -> dict[str, str]:
+    """Logical type per output field under the connector's handling modes."""
+    decimal_mode = connector.get("decimal.handling.mode", "precise")
+    types = {}
+    for column in table.columns:
+        if column.is_lob or column.data_type in ("VARCHAR2", "CHAR"):
+            types[column.name] = "string"
+        elif column.data_type == "NUMBER" and column.length and not column.scale:
+            # integers whatever decimal.handling.mode says, like Debezium
+            if column.length < _INT_PRECISION:
+                types[column.name] = "int"
+            elif column.length < _LONG_PRECISION:
+                types[column.name] = "long"
+            else:
+                types[column.name] = _decimal_type(decimal_mode)
+        elif column.data_type == "NUMBER":
+            types[column.name] = _decimal_type(decimal_mode)
+        elif column.data_type in ("DATE", "TIMESTAMP"):
+            types[column.name] = "long"
+        elif column.data_type in ("RAW", "BLOB"):
+            types[column.name] = (
+                "bytes" if connector.get("binary.handling.mode") == "bytes" else "string"
+            )
+        else:
+            types[column.name] = "string"
+    prefix = resources_confluent.SMT_ADD_FIELDS_PREFIX
+    types.update(
+        {
+            f"{prefix}operation_type": "string",
+            f"{prefix}operation_time": "long",
+            f"{prefix}sortable_sequence": "long",
+            "__deleted": "string",
+        }
+    )
+    return types
+
+
+def _decimal_type(decimal_mode: str) -> str:
+    return {"precise": "decimal", "double": "double"}.get(decimal_mode, "string")
+
+
+def encode_key(
+    fmt: str,
+    table: oracle_schema.Table,
+    record: dict,
+    columns: tuple[str, ...],
+    types: dict[str, str],
+) -> bytes:
+    """The record key in the format of the value.
+
+    AVRO keys are serialized like message_keys.py hashes them, key fields of
+    the primary key are not optional.
+    """
+    if fmt == "AVRO":
+        return message_keys.avro_key(
+            table, columns, tuple(record[c] for c in columns), SCHEMA_ID
+        )
+    return ENCODERS[fmt](record, types)
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _zigzag(value: int) -> bytes:
+    return _varint((value << 1) ^ (value >> 63))
+
+
+def _decimal_bytes(value: object) -> bytes:
+    unscaled = int(decimal.Decimal(str(value)))
+    return unscaled.to_bytes((unscaled.bit_length() + 8) // 8 or 1, "big", signed=True)
+
+
+def _wire_header() -> bytes:
+    return b"\x00" + struct.pack(">I", SCHEMA_ID)
+
+
+def encode_avro(record: dict, types: dict[str, str]) -> bytes:
+    """Avro binary with every field an optional union, as the connector emits."""
+    out = bytearray(_wire_header())
+    for name, kind in types.items():
+        value = record.get(name)
+        if value is None:
+            out += _zigzag(0)
+            continue
+        out += _zigzag(1)
+        if kind == "string":
+            data = str(value).encode()
+            out += _zigzag(len(data)) + data
+        elif kind in ("int", "long"):
+            out += _zigzag(int(value))  # type: ignore[arg-type]
+        elif kind == "double":
+            out += struct.pack("<d", float(value))  # type: ignore[arg-type]
+        else:
+            data = _decimal_bytes(value) if kind == "decimal" else bytes(value)  # type: ignore[arg-type]
+            out += _zigzag(len(data)) + data
+    return bytes(out)
+
+
+def encode_json_sr(record: dict, types: dict[str, str]) -> bytes:
+    """JSON with the Schema Registry header, decimals as base64 strings."""
+    values = {}
+    for name, kind in types.items():
+        value = record.get(name)
+        if kind == "decimal" and value is not None:
+            value = base64.b64encode(_decimal_bytes(value)).decode()
+        values[name] = value
+    return _wire_header() + json.dumps(values, separators=(",", ":")).encode()
+
+
+def encode_protobuf(record: dict, types: dict[str, str]) -> bytes:
+    """Protobuf with the Schema Registry header and message index 0."""
+    out = bytearray(_wire_header() + _varint(0))
+    for number, (name, kind) in enumerate(types.items(), start=1):
+        value = record.get(name)
+        if value is None:
+            continue
+        if kind in ("int", "long"):
+            out += _varint(number << 3) + _varint(int(value) & (2**64 - 1))  # type: ignore[arg-type]
+        elif kind == "double":
+            out += _varint(number << 3 | 1) + struct.pack("<d", float(value))  # type: ignore[arg-type]
+        else:
+            if kind == "decimal":
+                data = _decimal_bytes(value)
+            elif kind == "string":
+                data = str(value).encode()
+            else:
+                data = bytes(value)  # type: ignore[arg-type]
+            out += _varint(number << 3 | 2) + _varint(len(data)) + data
+    return bytes(out)
+
+
+ENCODERS: dict[str, Callable[[dict, dict[str, str]], bytes]] = {
+    "AVRO": encode_avro,
+    "JSON_SR": encode_json_sr,
+    "PROTOBUF": encode_protobuf,
+}
+
+
+# package providing each optional codec, see requirements-dev.txt
+CODEC_PACKAGES = {"zstd": "zstandard", "lz4": "lz4", "snappy": "python-snappy"}
+
+
+def available_codecs() -> dict[str, Callable[[bytes], bytes]]:
+    """Kafka compression codecs whose Python bindings are installed."""
+    codecs: dict[str, Callable[[bytes], bytes]] = {
+        "none": lambda data: data,
+        "gzip": lambda data: gzip.compress(data, compresslevel=6),
+    }
+    try:
+        import zstandard  # pyright: ignore[reportMissingImports]
+
+        codecs["zstd"] = zstandard.ZstdCompressor(level=3).compress
+    except ImportError:
+        pass
+    try:
+        import lz4.frame  # pyright: ignore[reportMissingImports]
+
+        codecs["lz4"] = lz4.frame.compress
+    except ImportError:
+        pass
+    try:
+        import snappy  # pyright: ignore[reportMissingImports]
+
+        codecs["snappy"] = snappy.compress
+    except ImportError:
+        pass
+    return codecs
+
+
+def run(
+    tables: dict[str, oracle_schema.Table],
+    connector: dict[str, str],
+    records: int,
+    clob_bytes: int,
+    formats: list[str],
+    codecs: list[str],
+    seed: int = 42,
+    table_catalog: catalog.TableCatalog | None = None,
+) -> list[dict]:
+    """Benchmark every table x format x codec, one result dict each.
+
+    Keys follow the `key` block of the table's catalog entry, the primary key
+    for tables not in `table_catalog`.
+    """
+    compressors = available_codecs()
+    for codec in codecs:
+        if codec in CODEC_PACKAGES and codec not in compressors:
+            raise ValueError(
+                f"codec {codec} needs the {CODEC_PACKAGES[codec]} package, "
+                "pip install -r requirements-dev.txt"
+            )
+        if codec not in compressors:
+            raise ValueError(
+                f"Unknown codec {codec}, use one of "
+                + ", ".join(["none", "gzip", *CODEC_PACKAGES])
+            )
+    results = []
+    for table in tables.values():
+        rng = random.Random(seed)
+        types = field_types(table, connector)
+        spec = table_catalog.get(table.name) if table_catalog else None
+        columns = message_keys.key_columns(spec, table) if spec else table.primary_key
+        key_fields = {name: types[name] for name in columns}
+        blocks = [datagen.build_block(rng, clob_bytes) for _ in range(datagen.BLOCK_COUNT)]
+        flattened = []
+        for i in range(records):
+            op = "c" if i % 10 else "u"
+            row = generate_row(table, rng, blocks[i % datagen.BLOCK_COUNT])
+            event = envelope(table, row, op, 1_700_000_000_000_000 + i)
+            flattened.append(extract_new_record_state(event))
+
+        for fmt in formats:
+            encoder = ENCODERS[fmt]
+            start = time.perf_counter()
+            keys = [encode_key(fmt, table, r, columns, key_fields) for r in flattened]
+            encoded = [encoder(r, types) for r in flattened]
+            encode_seconds = time.perf_counter() - start
+            key_bytes = sum(len(k) for k in keys)
+            raw_bytes = sum(len(e) for e in encoded)
+
+            for codec in codecs:
+                start = time.perf_counter()
+                compressed = 0
+                for i in range(0, len(encoded), BATCH_RECORDS):
+                    # a batch compresses the keys and values of its records
+                    batch = zip(keys[i : i + BATCH_RECORDS], encoded[i : i + BATCH_RECORDS])
+                    compressed += len(
+                        compressors[codec](b"".join(k + v for k, v in batch))
+                    )
+                seconds = encode_seconds + time.perf_counter() - start
+                results.append(
+                    {
+                        "table": table.name,
+                        "format": fmt,
+                        "codec": codec,
+                        "key_bytes_per_record": key_bytes / records,
+                        "bytes_per_record": raw_bytes / records,
+                        "wire_bytes_per_record": compressed / records,
+                        "records_per_sec": records / seconds if seconds else 0.0,
+                    }
+                )
+    return results
+
+
+if __name__ == "__main__":
+    connector_defaults = offline_config.load_connector_defaults()
+    parser = argparse.ArgumentParser(
+        description="Benchmark the size and serialization cost of CDC records per format."
+    )
+    parser.add_argument("--records", type=int, default=50)
+    parser.add_argument("--clob-bytes", type=int, default=oracle_schema.DEFAULT_CLOB_BYTES)
+    parser.add_argument(
+        "--format",
+        action="append",
+        choices=sorted(ENCODERS),
+        help=f"defaults to output.data.format ({connector_defaults['output.data.format']}) "
+        "and the alternatives",
+    )
+    parser.add_argument("--codec", action="append", help="defaults to all available")
+    args = parser.parse_args()
+
+    try:
+        results = run(
+            oracle_schema.load_schema(),
+            connector_defaults,
+            args.records,
+            args.clob_bytes,
+            args.format or sorted(ENCODERS),
+            args.codec or sorted(available_codecs()),
+            table_catalog=catalog.load_catalog(),
+        )
+    except ValueError as e:
+        raise SystemExit(str(e))
+    print(
+        f"{'table':<22} {'format':<9} {'codec':<7} {'key B':>6} {'B/rec':>10} "
+        f"{'wire B/rec':>11} {'rec/s':>10}"
+    )
+    for result in results:
+        print(
+            f"{result['table']:<22} {result['format']:<9} {result['codec']:<7} "
+            f"{result['key_bytes_per_record']:>6.0f} {result['bytes_per_record']:>10.0f} {result['wire_bytes_per_record']:>11.0f} "
+            f"{result['records_per_sec']:>10.0f}"
+        )
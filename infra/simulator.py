@@ -0,0 +1,354 @@
+"""Discrete-event simulation of the XStream -> Kafka -> Tableflow pipeline.
+
+Models what the program deploys: the per-second batches written by
+generate_trial_data, one outbound server per XStream shard capturing with
+`tasks.max` workers, the ExtractNewRecordState SMT, the topic partitions
+planned for each table and the Tableflow commit interval. Reports throughput,
+queue depth and p50/p99 end-to-end lag per time window.
+
+The workload is read from the same Pulumi config, table catalog and connector
+defaults as the program, so "what if" runs start from the real deployment.
+Tables without a profile in tableProfiles run at the trial data rate. A run
+whose load exceeds what a shard or partition serves fails after the report,
+its queues grow without bound:
+
+    python simulator.py --partitions 6
+    python simulator.py --stack dev --source rds2 --shards 3 --duration 1800
+"""
+
+import argparse
+import collections
+import dataclasses
+import heapq
+import itertools
+import math
+import sys
+
+import catalog
+import oracle_schema
+import sizing
+import sources
+import xstream
+
+# throughput assumptions, override per run where measurements exist
+CAPTURE_BYTES_PER_SEC = 20 * 1024 * 1024
+CAPTURE_RECORD_OVERHEAD_SEC = 0.0005
+SMT_RECORD_COST_SEC = 0.00005
+PARTITION_BYTES_PER_SEC = 10 * 1024 * 1024
+TABLEFLOW_COMMIT_INTERVAL_SEC = 300.0
+
+
+@dataclasses.dataclass(frozen=True)
+class TableLoad:
+    """Workload and layout of one captured table."""
+
+    name: str
+    rows_per_second: float
+    row_bytes: int
+    partitions: int
+    shard: int
+
+
+@dataclasses.dataclass
+class PipelineModel:
+    tables: list[TableLoad]
+    # outbound server of each shard, TableLoad.shard indexes it
+    server_names: list[str]
+    tasks_per_shard: int = 1
+    capture_bytes_per_sec: float = CAPTURE_BYTES_PER_SEC
+    capture_record_overhead_sec: float = CAPTURE_RECORD_OVERHEAD_SEC
+    smt_record_cost_sec: float = SMT_RECORD_COST_SEC
+    partition_bytes_per_sec: float = PARTITION_BYTES_PER_SEC
+    commit_interval_sec: float = TABLEFLOW_COMMIT_INTERVAL_SEC
+
+
+@dataclasses.dataclass(frozen=True)
+class Window:
+    """Records written to Kafka, queue depth at the window start and lag of
+    the records generated within the window."""
+
+    start: float
+    throughput: float
+    capture_queue: int
+    partition_queue: int
+    p50_lag: float
+    p99_lag: float
+
+
+def trial_profile(
+    spec: catalog.TableSpec, schema: dict[str, oracle_schema.Table]
+) -> sizing.TableProfile:
+    """Load of a table without a profile: the rate and LOB size of
+    generate_trial_data, or one row per second, without excluded columns."""
+    sample = sizing.SAMPLE_PROFILES.get(spec.name)
+    values = {"rowsPerSecond": 1}
+    if sample is not None:
+        values = {
+            "rowsPerSecond": sample.rows_per_second,
+            "clobBytes": sample.lob_bytes,
+        }
+    table = schema.get(spec.name)
+    return sizing.profile_from_config(
+        spec.name,
+        values,
+        schema,
+        spec.excluded_columns(table) if table is not None else (),
+    )
+
+
+def model_from_stack(
+    stack: sources.OfflineStack,
+    source: sources.Source,
+    connector_config: dict[str, str],
+    partitions: int | None = None,
+    shards: int | None = None,
+    tasks: int | None = None,
+) -> PipelineModel:
+    """Model of the capture of one source, overriding what-if values.
+
+    Tables and shards are planned like the program does (see xstream.py),
+    the table profiles are scaled by the loadFactor of the source.
+    """
+    schema = oracle_schema.load_schema()
+    loads: dict[str, sizing.TableProfile] = {}
+    for spec in stack.tables:
+        profile = source.scaled(
+            stack.profiles.get(spec.name) or trial_profile(spec, schema)
+        )
+        assert profile is not None
+        loads[spec.name] = profile
+
+    planned_shards = xstream.plan_capture(
+        stack.tables.qualified_names(),
+        loads,
+        shards or source.xstream_shards,
+        source.xout_server_name,
+        stack.shared_tables,
+    )
+    shard_of = {
+        table: shard.index for shard in planned_shards for table in shard.tables
+    }
+
+    table_loads = []
+    for spec in stack.tables:
+        profile = loads[spec.name]
+        table_loads.append(
+            TableLoad(
+                name=spec.name,
+                rows_per_second=profile.rows_per_second,
+                row_bytes=profile.avg_row_bytes,
+                partitions=partitions
+                or spec.topic.partitions
+                or sizing.plan_topic(profile).partitions,
+                shard=shard_of[spec.qualified_name],
+            )
+        )
+    return PipelineModel(
+        tables=table_loads,
+        server_names=[shard.server_name for shard in planned_shards],
+        tasks_per_shard=tasks or int(connector_config.get("tasks.max", "1")),
+    )
+
+
+def capture_seconds(model: PipelineModel, row_bytes: int) -> float:
+    """Time one capture worker spends on a record."""
+    return (
+        model.capture_record_overhead_sec
+        + row_bytes / model.capture_bytes_per_sec
+        + model.smt_record_cost_sec
+    )
+
+
+def overloads(model: PipelineModel) -> list[str]:
+    """Shards and partitions receiving records faster than they are served.
+
+    Their queues grow for as long as the load lasts, the lag reported for
+    such a run depends on its duration only.
+    """
+    problems = []
+    for index, server_name in enumerate(model.server_names):
+        busy = sum(
+            t.rows_per_second * capture_seconds(model, t.row_bytes)
+            for t in model.tables
+            if t.shard == index
+        )
+        utilization = busy / model.tasks_per_shard
+        if utilization >= 1:
+            problems.append(
+                f"outbound server {server_name} needs {utilization:.0%} of its "
+                f"{model.tasks_per_shard} capture workers"
+            )
+    for t in model.tables:
+        partition_load = t.rows_per_second * t.row_bytes / t.partitions
+        utilization = partition_load / model.partition_bytes_per_sec
+        if utilization >= 1:
+            problems.append(
+                f"{t.name} needs {utilization:.0%} of each of its "
+                f"{t.partitions} partitions"
+            )
+    return problems
+
+
+def simulate(
+    model: PipelineModel, duration_sec: float, window_sec: float = 60.0
+) -> list[Window]:
+    """Run the simulation and aggregate the results per window."""
+    seq = itertools.count()
+    events: list = []
+
+    def schedule(time: float, kind: str, payload):
+        heapq.heappush(events, (time, next(seq), kind, payload))
+
+    # capture: one FIFO per shard served by tasks_per_shard workers
+    shard_count = len(model.server_names)
+    capture_queues = [collections.deque() for _ in range(shard_count)]
+    capture_busy = [0] * shard_count
+    # produce: partitions are single servers, track when each becomes free
+    partition_free: dict[tuple[str, int], float] = {}
+    partition_backlog: dict[tuple[str, int], int] = {}
+    next_key = {t.name: 0 for t in model.tables}
+    carry = {t.name: 0.0 for t in model.tables}
+    lags: list[tuple[float, float]] = []
+    written: list[float] = []
+    samples: list[tuple[float, int, int]] = []
+
+    # the generator commits one batch per table every second
+    for second in range(int(duration_sec)):
+        schedule(float(second), "batch", None)
+    for i in range(int(duration_sec / window_sec) + 1):
+        schedule(i * window_sec, "sample", None)
+
+    def start_capture(shard: int, now: float):
+        while capture_busy[shard] < model.tasks_per_shard and capture_queues[shard]:
+            record = capture_queues[shard].popleft()
+            table, _, row_bytes, _ = record
+            capture_busy[shard] += 1
+            service = capture_seconds(model, row_bytes)
+            schedule(now + service, "captured", (shard, record))
+
+    by_name = {t.name: t for t in model.tables}
+    while events:
+        now, _, kind, payload = heapq.heappop(events)
+        if kind == "batch":
+            for t in model.tables:
+                carry[t.name] += t.rows_per_second
+                rows = int(carry[t.name])
+                carry[t.name] -= rows
+                for _ in range(rows):
+                    key = next_key[t.name]
+                    next_key[t.name] += 1
+                    capture_queues[t.shard].append((t.name, key, t.row_bytes, now))
+                start_capture(t.shard, now)
+        elif kind == "captured":
+            shard, (table, key, row_bytes, created) = payload
+            capture_busy[shard] -= 1
+            partition = (table, key % by_name[table].partitions)
+            begin = max(now, partition_free.get(partition, 0.0))
+            done = begin + row_bytes / model.partition_bytes_per_sec
+            partition_free[partition] = done
+            partition_backlog[partition] = partition_backlog.get(partition, 0) + 1
+            schedule(done, "written", (partition, created))
+            start_capture(shard, now)
+        elif kind == "written":
+            partition, created = payload
+            partition_backlog[partition] -= 1
+            written.append(now)
+            interval = model.commit_interval_sec
+            commit = math.ceil(now / interval) * interval
+            lags.append((created, commit - created))
+        elif kind == "sample":
+            samples.append(
+                (
+                    now,
+                    sum(len(q) for q in capture_queues),
+                    sum(partition_backlog.values()),
+                )
+            )
+
+    return _windows(lags, written, samples, duration_sec, window_sec)
+
+
+def _windows(
+    lags: list[tuple[float, float]],
+    written: list[float],
+    samples: list[tuple[float, int, int]],
+    duration_sec: float,
+    window_sec: float,
+) -> list[Window]:
+    buckets: dict[int, list[float]] = {}
+    for created, lag in lags:
+        buckets.setdefault(int(created // window_sec), []).append(lag)
+    delivered: dict[int, int] = {}
+    for time in written:
+        index = int(time // window_sec)
+        delivered[index] = delivered.get(index, 0) + 1
+    depth = {int(t // window_sec): (c, p) for t, c, p in samples}
+
+    windows = []
+    for index in range(math.ceil(duration_sec / window_sec)):
+        values = sorted(buckets.get(index, []))
+        capture_queue, partition_queue = depth.get(index, (0, 0))
+        windows.append(
+            Window(
+                start=index * window_sec,
+                throughput=delivered.get(index, 0) / window_sec,
+                capture_queue=capture_queue,
+                partition_queue=partition_queue,
+                p50_lag=_percentile(values, 0.50),
+                p99_lag=_percentile(values, 0.99),
+            )
+        )
+    return windows
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Simulate the CDC pipeline of a stack and report lag per window."
+    )
+    parser.add_argument("--stack", help="merge Pulumi.<stack>.yaml config")
+    parser.add_argument("--source", help="name of the source, defaults to the first")
+    parser.add_argument("--duration", type=float, default=900.0)
+    parser.add_argument("--window", type=float, default=60.0)
+    parser.add_argument("--partitions", type=int, help="partitions for every topic")
+    parser.add_argument("--shards", type=int, help="XStream shards")
+    parser.add_argument("--tasks", type=int, help="capture workers per shard")
+    parser.add_argument("--commit-interval", type=float, default=None)
+    args = parser.parse_args()
+
+    import offline_config
+
+    try:
+        stack = sources.offline_stack(args.stack)
+        pipeline = model_from_stack(
+            stack,
+            sources.find(stack.sources, args.source),
+            offline_config.load_connector_defaults(),
+            partitions=args.partitions,
+            shards=args.shards,
+            tasks=args.tasks,
+        )
+    except ValueError as e:
+        raise SystemExit(str(e))
+    if args.commit_interval:
+        pipeline.commit_interval_sec = args.commit_interval
+
+    print(
+        f"{'start':>7} {'rec/s':>8} {'capq':>7} {'partq':>7} "
+        f"{'p50 s':>8} {'p99 s':>8}"
+    )
+    for w in simulate(pipeline, args.duration, args.window):
+        print(
+            f"{w.start:7.0f} {w.throughput:8.1f} {w.capture_queue:7d} "
+            f"{w.partition_queue:7d} {w.p50_lag:8.1f} {w.p99_lag:8.1f}"
+        )
+    problems = overloads(pipeline)
+    for problem in problems:
+        print(f"warning: {problem}", file=sys.stderr)
+    if problems:
+        raise SystemExit("The load exceeds the pipeline capacity, queues keep growing")
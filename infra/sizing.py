@@ -0,0 +1,180 @@
+"""Topic sizing planner for the CDC topics created by create_tableflow_topic.
+
+Takes a per-table throughput profile and works out the partition count and the
+topic configs (segment.bytes, segment.ms, max.message.bytes, compaction).
+Kept free of Pulumi imports so plans can be checked offline, e.g.:
+
+    python sizing.py
+"""
+
+import dataclasses
+import math
+
+import oracle_schema
+
+# planning targets per partition, conservative for Confluent Cloud Standard
+PARTITION_TARGET_BYTES_PER_SEC = 2 * 1024 * 1024
+PARTITION_TARGET_RECORDS_PER_SEC = 1000
+MAX_PARTITIONS_PER_TOPIC = 60
+
+# Confluent Cloud limits for editable topic configs
+MIN_SEGMENT_BYTES = 52428800
+MAX_SEGMENT_BYTES = 1073741824
+MIN_SEGMENT_MS = 600000
+DEFAULT_MAX_MESSAGE_BYTES = 2097164
+MAX_MESSAGE_BYTES_LIMIT = 8388608
+
+# roll segments at least this often so compaction can clean old CLOB versions
+DEFAULT_SEGMENT_ROLL_SECONDS = 3600
+# head room on top of the largest expected row for envelope and schema overhead
+MESSAGE_SIZE_HEADROOM = 1.25
+
+
+@dataclasses.dataclass(frozen=True)
+class TableProfile:
+    """Expected change rate for a captured table."""
+
+    table_name: str
+    rows_per_second: float
+    avg_row_bytes: int
+    max_row_bytes: int | None = None
+    # part of avg_row_bytes held in LOB columns
+    lob_bytes: int = 0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.rows_per_second * self.avg_row_bytes
+
+
+@dataclasses.dataclass(frozen=True)
+class TopicPlan:
+    """Partition count and topic configs for a CDC topic."""
+
+    partitions: int
+    config: dict[str, str]
+
+
+# shape produced by generate_trial_data in sql/proc_create.sql
+SAMPLE_PROFILES = {
+    name: TableProfile(name, 15, 500 * 1024, 600 * 1024, lob_bytes=499 * 1024)
+    for name in ("PHARMA_EVENT", "PHARMA_DOSE_REGIMENS", "PHARMA_NOTES_ATTACH")
+}
+
+# plan used for tables without a profile, matches the original topic setup
+DEFAULT_PLAN = TopicPlan(partitions=1, config={"cleanup.policy": "compact"})
+
+
+def profile_from_config(
+    table_name: str,
+    values: dict,
+    schema: dict[str, oracle_schema.Table] | None = None,
+    excluded_columns: tuple[str, ...] = (),
+) -> TableProfile:
+    """Build a profile from a `tableProfiles` config entry.
+
+    Either `avgRowBytes` is given directly or it is estimated from the table
+    definition in sql/schema.sql using `clobBytes` as average CLOB size,
+    without the columns the connector drops (see catalog.ColumnSettings).
+    The LOB share of a row is `lobBytes`, or `clobBytes` per LOB column.
+    """
+    rows_per_second = float(values.get("rowsPerSecond", 0))
+    if rows_per_second < 0:
+        raise ValueError(f"{table_name}: rowsPerSecond must not be negative")
+
+    if schema is None and (
+        values.get("avgRowBytes") is None or "clobBytes" in values
+    ):
+        schema = oracle_schema.load_schema()
+    table = schema.get(table_name) if schema is not None else None
+    if table is not None and excluded_columns:
+        table = oracle_schema.Table(
+            name=table.name,
+            columns=tuple(c for c in table.columns if c.name not in excluded_columns),
+        )
+    clob_bytes = int(values.get("clobBytes", oracle_schema.DEFAULT_CLOB_BYTES))
+
+    avg_row_bytes = values.get("avgRowBytes")
+    if avg_row_bytes is None:
+        if table is None:
+            raise ValueError(
+                f"{table_name}: avgRowBytes not set and table not found in schema"
+            )
+        avg_row_bytes = oracle_schema.estimate_row_bytes(table, clob_bytes)
+    avg_row_bytes = int(avg_row_bytes)
+    if avg_row_bytes <= 0:
+        raise ValueError(f"{table_name}: avgRowBytes must be positive")
+
+    lob_bytes = int(values.get("lobBytes", 0))
+    if "lobBytes" not in values and table is not None:
+        lob_bytes = clob_bytes * sum(1 for c in table.columns if c.is_lob)
+    lob_bytes = min(lob_bytes, avg_row_bytes)
+
+    max_row_bytes = values.get("maxRowBytes")
+    return TableProfile(
+        table_name=table_name,
+        rows_per_second=rows_per_second,
+        avg_row_bytes=avg_row_bytes,
+        max_row_bytes=int(max_row_bytes) if max_row_bytes is not None else None,
+        lob_bytes=lob_bytes,
+    )
+
+
+def plan_partitions(
+    profile: TableProfile, max_partitions: int = MAX_PARTITIONS_PER_TOPIC
+) -> int:
+    """Partitions needed to keep each partition below the planning targets."""
+    by_bytes = profile.bytes_per_second / PARTITION_TARGET_BYTES_PER_SEC
+    by_records = profile.rows_per_second / PARTITION_TARGET_RECORDS_PER_SEC
+    partitions = max(1, math.ceil(max(by_bytes, by_records)))
+    if partitions > max_partitions:
+        raise ValueError(
+            f"{profile.table_name}: needs {partitions} partitions, "
+            f"more than the limit of {max_partitions}"
+        )
+    return partitions
+
+
+def plan_max_message_bytes(profile: TableProfile) -> int:
+    """Largest record the topic has to accept, with head room."""
+    largest = profile.max_row_bytes or profile.avg_row_bytes
+    required = math.ceil(largest * MESSAGE_SIZE_HEADROOM)
+    if required > MAX_MESSAGE_BYTES_LIMIT:
+        raise ValueError(
+            f"{profile.table_name}: rows of {largest} bytes exceed the "
+            f"max.message.bytes limit of {MAX_MESSAGE_BYTES_LIMIT}"
+        )
+    return max(DEFAULT_MAX_MESSAGE_BYTES, required)
+
+
+def plan_topic(
+    profile: TableProfile | None,
+    max_partitions: int = MAX_PARTITIONS_PER_TOPIC,
+    roll_seconds: int = DEFAULT_SEGMENT_ROLL_SECONDS,
+) -> TopicPlan:
+    """Work out partitions and topic configs for a table profile."""
+    if profile is None:
+        return DEFAULT_PLAN
+
+    partitions = plan_partitions(profile, max_partitions)
+    per_partition_bytes = profile.bytes_per_second / partitions
+    segment_bytes = min(
+        MAX_SEGMENT_BYTES,
+        max(MIN_SEGMENT_BYTES, math.ceil(per_partition_bytes * roll_seconds)),
+    )
+    segment_ms = max(MIN_SEGMENT_MS, roll_seconds * 1000)
+
+    return TopicPlan(
+        partitions=partitions,
+        config={
+            "cleanup.policy": "compact",
+            "segment.bytes": str(segment_bytes),
+            "segment.ms": str(segment_ms),
+            "max.message.bytes": str(plan_max_message_bytes(profile)),
+        },
+    )
+
+
+if __name__ == "__main__":
+    for name, sample in SAMPLE_PROFILES.items():
+        plan = plan_topic(sample)
+        print(f"{name}: partitions={plan.partitions} config={plan.config}")
@@ -0,0 +1,229 @@
+"""Initial snapshot strategies for the XStream connector and their duration.
+
+`snapshotStrategy` in Pulumi.yaml selects how existing rows are loaded:
+
+- `initial`: the connector default, one thread reads table after table and
+  any database error aborts the snapshot.
+- `parallel`: tables are read by `snapshotThreads` threads with a larger fetch
+  size, errors are retried.
+- `incremental`: only the schema is snapshotted and streaming starts at once;
+  rows are backfilled in chunks next to streaming when an `execute-snapshot`
+  signal is written to the signal table (see `render_signal_sql`).
+
+Batch and queue sizes come from the connector preset (connector_presets.py).
+
+The duration of a snapshot can be estimated offline from row counts:
+
+    python snapshot.py --table PHARMA_EVENT=2000000 --table PHARMA_NOTES_ATTACH=500000
+    python snapshot.py --strategy parallel --threads 4 --signal-sql
+"""
+
+import argparse
+import dataclasses
+
+import oracle_schema
+
+STRATEGIES = ("initial", "parallel", "incremental")
+DEFAULT_STRATEGY = "initial"
+SIGNAL_TABLE = "CDC_SIGNAL"
+
+# throughput model of one snapshot thread
+FETCH_ROUND_TRIP_SECONDS = 0.002
+THREAD_BYTES_PER_SEC = 20 * 1024 * 1024
+# LOB values are fetched with a round trip of their own
+LOB_FETCH_SECONDS = 0.001
+# the connector writes to Kafka at most this fast, whatever the thread count
+CONNECTOR_BYTES_PER_SEC = 40 * 1024 * 1024
+
+
+@dataclasses.dataclass(frozen=True)
+class SnapshotSettings:
+    strategy: str = DEFAULT_STRATEGY
+    threads: int = 1
+    fetch_size: int = 2000
+    error_retries: int = 0
+    incremental_chunk_size: int = 1024
+
+    def config(self, signal_collection: str) -> dict[str, str]:
+        """Connector config entries, see signal_collection."""
+        if self.strategy == "initial":
+            return {}
+        values = {
+            "snapshot.fetch.size": str(self.fetch_size),
+            "snapshot.database.errors.max.retries": str(self.error_retries),
+        }
+        if self.strategy == "parallel":
+            values["snapshot.max.threads"] = str(self.threads)
+        else:
+            values["snapshot.mode"] = "no_data"
+            values["signal.data.collection"] = signal_collection
+            values["incremental.snapshot.chunk.size"] = str(self.incremental_chunk_size)
+        return values
+
+
+def settings(strategy: str | None, threads: int | None = None) -> SnapshotSettings:
+    """Settings of a strategy, `threads` only applies to parallel snapshots."""
+    strategy = strategy or DEFAULT_STRATEGY
+    if strategy not in STRATEGIES:
+        raise ValueError(
+            f"Unknown snapshot strategy {strategy}, use one of {STRATEGIES}"
+        )
+    if strategy == "initial":
+        return SnapshotSettings()
+    if threads is not None and threads < 1:
+        raise ValueError("snapshotThreads must be at least 1")
+    if strategy == "parallel":
+        return SnapshotSettings(
+            strategy=strategy,
+            threads=threads or 4,
+            fetch_size=10000,
+            error_retries=3,
+        )
+    return SnapshotSettings(strategy=strategy, error_retries=3)
+
+
+def table_seconds(
+    rows: int, table: oracle_schema.Table, clob_bytes: int, fetch_size: int
+) -> float:
+    """Seconds one thread needs to read a table."""
+    row_bytes = oracle_schema.estimate_row_bytes(table, clob_bytes)
+    lob_columns = sum(1 for c in table.columns if c.is_lob)
+    round_trips = rows / fetch_size * FETCH_ROUND_TRIP_SECONDS
+    return (
+        round_trips
+        + rows * lob_columns * LOB_FETCH_SECONDS
+        + rows * row_bytes / THREAD_BYTES_PER_SEC
+    )
+
+
+def estimate_seconds(
+    table_rows: dict[str, int],
+    schema: dict[str, oracle_schema.Table],
+    snapshot: SnapshotSettings,
+    clob_bytes: int = oracle_schema.DEFAULT_CLOB_BYTES,
+) -> float:
+    """Snapshot duration; for incremental the time until the backfill is done.
+
+    Tables are handed to the least busy thread, largest first. Incremental
+    snapshots read one chunk at a time on the streaming thread.
+    """
+    durations = sorted(
+        (
+            table_seconds(
+                rows,
+                schema[name],
+                clob_bytes,
+                snapshot.incremental_chunk_size
+                if snapshot.strategy == "incremental"
+                else snapshot.fetch_size,
+            )
+            for name, rows in table_rows.items()
+        ),
+        reverse=True,
+    )
+    threads = [0.0] * (snapshot.threads if snapshot.strategy == "parallel" else 1)
+    for seconds in durations:
+        threads[threads.index(min(threads))] += seconds
+
+    total_bytes = sum(
+        rows * oracle_schema.estimate_row_bytes(schema[name], clob_bytes)
+        for name, rows in table_rows.items()
+    )
+    return max(max(threads), total_bytes / CONNECTOR_BYTES_PER_SEC)
+
+
+def signal_collection(db_name: str, schema_name: str) -> str:
+    """signal.data.collection of the connector."""
+    return f"{db_name}.{schema_name}.{SIGNAL_TABLE}"
+
+
+def render_signal_sql(
+    db_name: str, schema_name: str, server_names: list[str], tables: list[str]
+) -> str:
+    """Signal table, its capture and the signal backfilling <schema>.<table>s."""
+    signal = f"{schema_name}.{SIGNAL_TABLE}"
+    lines = [
+        "-- signal table for incremental snapshots, create as the admin user",
+        f"CREATE TABLE {signal} (",
+        "    id VARCHAR2(42) PRIMARY KEY,",
+        "    type VARCHAR2(32) NOT NULL,",
+        "    data VARCHAR2(2048)",
+        ");",
+        "",
+        "-- !!! change user to cfltadmin here, add the signal table to the outbound servers",
+    ]
+    for server_name in server_names:
+        lines += [
+            "BEGIN",
+            "  DBMS_XSTREAM_ADM.ALTER_OUTBOUND(",
+            f"     server_name => '{server_name}',",
+            f"     table_names => '{signal}',",
+            "     add         => TRUE);",
+            "END;",
+            "/",
+        ]
+    collections = ",".join(f'"{db_name}.{t}"' for t in tables)
+    lines += [
+        "",
+        "-- start the backfill once the connectors are running",
+        f"INSERT INTO {signal} (id, type, data) VALUES (",
+        "    SYS_GUID(), 'execute-snapshot',",
+        f"    '{{\"data-collections\": [{collections}], \"type\": \"incremental\"}}');",
+        "COMMIT;",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Estimate the initial snapshot duration or print the signal SQL."
+    )
+    parser.add_argument("--strategy", choices=STRATEGIES)
+    parser.add_argument("--threads", type=int)
+    parser.add_argument("--clob-bytes", type=int, default=oracle_schema.DEFAULT_CLOB_BYTES)
+    parser.add_argument(
+        "--table",
+        action="append",
+        metavar="TABLE=ROWS",
+        help="rows per table, defaults to one million for every table in the schema",
+    )
+    parser.add_argument("--signal-sql", action="store_true", help="print the signal SQL")
+    parser.add_argument("--db-name", help="defaults to the source's dbName")
+    parser.add_argument("--stack", help="stack whose outbound servers are altered")
+    parser.add_argument("--source", help="name of the source, defaults to the first")
+    args = parser.parse_args()
+
+    schema = oracle_schema.load_schema()
+    table_rows = {name: 1_000_000 for name in schema}
+    if args.table:
+        table_rows = {}
+        for entry in args.table:
+            name, _, rows = entry.partition("=")
+            table_rows[name.upper()] = int(rows)
+
+    for strategy in [args.strategy] if args.strategy else STRATEGIES:
+        snapshot = settings(strategy, args.threads)
+        seconds = estimate_seconds(table_rows, schema, snapshot, args.clob_bytes)
+        blocking = "streaming waits" if strategy != "incremental" else "next to streaming"
+        print(
+            f"{strategy:<12} threads={snapshot.threads} {seconds / 3600:6.2f}h "
+            f"({blocking})"
+        )
+    if args.signal_sql:
+        import sources
+        import xstream
+
+        try:
+            source = sources.find(sources.offline_stack(args.stack).sources, args.source)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        print()
+        print(
+            render_signal_sql(
+                args.db_name or source.db_name,
+                "ADMIN",
+                xstream.server_names(source.xout_server_name, source.xstream_shards),
+                [f"ADMIN.{name}" for name in table_rows],
+            ),
+            end="",
+        )
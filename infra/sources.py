@@ -0,0 +1,326 @@
+"""Oracle sources fanned into the one Confluent cluster and their load on it.
+
+`sources` in Pulumi.yaml lists the RDS Oracle instances of the stack. Each
+gets its own RDS instance, outbound server(s), connector shard(s) and topic
+prefix, while Tableflow, the Unity integration and the catalog grants are
+shared. Entries may override the `rds:*` defaults:
+
+    sources:
+      value:
+        - name: rds1                # first source keeps the single-source names
+        - name: rds2
+          topicPrefix: rds2         # topicPrefix for the first source, else the name
+          xoutServerName: xout      # rds:xoutServerName
+          xstreamShards: 2          # rds:xstreamShards
+          profile: load-test        # rds:profile
+          dbName: ORCL              # rds:dbName
+          loadFactor: 3             # tableProfiles rates times 3 for this source
+
+Without `sources` the stack has a single source built from `topicPrefix` and
+the `rds:*` keys, named after the topic prefix.
+
+All topics land on one cluster, cluster_tiers.py plans its tier from the
+partitions, throughput and connector tasks of the sources before anything is
+deployed:
+
+    python sources.py --stack dev
+"""
+
+import argparse
+import dataclasses
+import os
+import re
+from typing import Mapping
+
+import catalog
+import oracle_schema
+import rds_profiles
+import sizing
+import snapshot
+import xstream
+
+MB = 1000 * 1000
+# source names end up in resource names and Pulumi exports
+NAME_PATTERN = r"[a-z][a-z0-9-]{0,19}"
+TOPIC_PREFIX_PATTERN = r"[A-Za-z0-9._-]+"
+# Oracle SIDs have at most 8 characters
+DB_NAME_PATTERN = r"[A-Za-z][A-Za-z0-9]{0,7}"
+SOURCE_KEYS = (
+    "name",
+    "topicPrefix",
+    "xoutServerName",
+    "xstreamShards",
+    "profile",
+    "dbName",
+    "loadFactor",
+)
+# Tableflow reads every CDC record once
+DEFAULT_READERS = 1
+
+
+@dataclasses.dataclass(frozen=True)
+class Source:
+    """One RDS Oracle instance and the capture resources of its tables."""
+
+    name: str
+    # prefix of the Pulumi resource names, the stack prefix for the first source
+    resource_prefix: str
+    topic_prefix: str
+    xout_server_name: str
+    xstream_shards: int
+    rds_profile: rds_profiles.RdsProfile
+    db_name: str
+    # multiplies the tableProfiles rates for this source
+    load_factor: float = 1.0
+    # the first source keeps the resource names of a single-source stack
+    primary: bool = True
+
+    def scaled(self, profile: sizing.TableProfile | None) -> sizing.TableProfile | None:
+        """A table profile at the load of this source."""
+        if profile is None or self.load_factor == 1.0:
+            return profile
+        return dataclasses.replace(
+            profile, rows_per_second=profile.rows_per_second * self.load_factor
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class SourceUsage:
+    """Partitions and throughput a source adds to the cluster."""
+
+    source: str
+    partitions: int
+    ingress_bytes_per_sec: float
+    egress_bytes_per_sec: float
+    # one per outbound server
+    connector_tasks: int
+
+
+def from_config(
+    entries: list | None,
+    resource_prefix: str,
+    topic_prefix: str,
+    xout_server_name: str,
+    xstream_shards: int,
+    rds_profile: str | None,
+    rds_overrides: dict[str, object],
+    db_name: str,
+) -> list[Source]:
+    """Sources of the `sources` entries, the rds:* keys are their defaults.
+
+    Raises ValueError listing every invalid entry.
+    """
+    if not entries:
+        entries = [{"name": re.sub(r"[^a-z0-9-]", "-", topic_prefix.lower())}]
+    if not isinstance(entries, list):
+        raise ValueError("sources must be a list")
+
+    errors = []
+    sources = []
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            errors.append(f"sources[{index}] must be an object")
+            continue
+        name = str(entry.get("name") or "")
+        label = f"source {name or index}"
+        unknown = sorted(set(entry) - set(SOURCE_KEYS))
+        if unknown:
+            errors.append(f"{label}: unknown keys {', '.join(unknown)}")
+        if not re.fullmatch(NAME_PATTERN, name):
+            errors.append(f"{label}: name must match {NAME_PATTERN}")
+        try:
+            profile = rds_profiles.resolve(
+                entry.get("profile") or rds_profile, rds_overrides
+            )
+            shards = int(entry.get("xstreamShards") or xstream_shards)
+            load_factor = float(entry.get("loadFactor") or 1.0)
+        except ValueError as e:
+            errors.append(f"{label}: {e}")
+            continue
+        if shards < 1:
+            errors.append(f"{label}: xstreamShards must be at least 1")
+        source = Source(
+            name=name,
+            resource_prefix=(
+                resource_prefix if not sources else f"{resource_prefix}-{name}"
+            ),
+            topic_prefix=str(
+                entry.get("topicPrefix") or (name if sources else topic_prefix)
+            ),
+            xout_server_name=str(entry.get("xoutServerName") or xout_server_name),
+            xstream_shards=shards,
+            rds_profile=profile,
+            db_name=str(entry.get("dbName") or db_name),
+            load_factor=load_factor,
+            primary=not sources,
+        )
+        if not re.fullmatch(TOPIC_PREFIX_PATTERN, source.topic_prefix):
+            errors.append(f"{label}: topicPrefix must match {TOPIC_PREFIX_PATTERN}")
+        if not re.fullmatch(DB_NAME_PATTERN, source.db_name):
+            errors.append(f"{label}: dbName must match {DB_NAME_PATTERN}")
+        try:
+            xstream.shard_server_name(source.xout_server_name, shards - 1, shards)
+        except ValueError as e:
+            errors.append(f"{label}: {e}")
+        if load_factor <= 0:
+            errors.append(f"{label}: loadFactor must be positive")
+        sources.append(source)
+
+    for attr, what in (("name", "name"), ("topic_prefix", "topic prefix")):
+        seen = set()
+        for source in sources:
+            value = getattr(source, attr)
+            if value in seen:
+                errors.append(f"sources: {what} {value} is used twice")
+            seen.add(value)
+    if errors:
+        raise ValueError("; ".join(errors))
+    return sources
+
+
+def source_usage(
+    source: Source,
+    tables: catalog.TableCatalog,
+    profiles: Mapping[str, sizing.TableProfile | None],
+    heartbeat_topic: bool = False,
+    readers: int = DEFAULT_READERS,
+) -> SourceUsage:
+    """Topic partitions and change throughput of one source.
+
+    Tables without a profile count with the partitions of their plan and no
+    throughput.
+    """
+    partitions = 1 if heartbeat_topic else 0
+    ingress = 0.0
+    for spec in tables:
+        profile = source.scaled(profiles.get(spec.name))
+        partitions += spec.topic.partitions or sizing.plan_topic(profile).partitions
+        if profile is not None:
+            ingress += profile.bytes_per_second
+    return SourceUsage(
+        source.name, partitions, ingress, ingress * readers, source.xstream_shards
+    )
+
+
+def profiles_from_config(
+    table_profiles: dict[str, dict],
+    tables: catalog.TableCatalog,
+    schema: dict[str, oracle_schema.Table],
+) -> dict[str, sizing.TableProfile]:
+    """Profiles of the `tableProfiles` entries, like ResourcesManager.table_profile."""
+    profiles = {}
+    for name, values in table_profiles.items():
+        spec = tables.get(name)
+        profiles[name] = sizing.profile_from_config(
+            name,
+            values,
+            schema,
+            spec.excluded_columns(schema[spec.name]) if spec else (),
+        )
+    return profiles
+
+
+@dataclasses.dataclass(frozen=True)
+class OfflineStack:
+    """Config, catalog, sources and profiles of a stack, as ResourcesManager sees them."""
+
+    config: dict
+    tables: catalog.TableCatalog
+    sources: list[Source]
+    profiles: dict[str, sizing.TableProfile]
+    # signal and heartbeat tables every connector captures, see xstream.py
+    shared_tables: tuple[str, ...]
+
+
+def offline_stack(stack: str | None) -> OfflineStack:
+    """Read a stack without Pulumi, for the offline planners."""
+    import offline_config
+
+    config = offline_config.load_config(stack)
+    schema = oracle_schema.load_schema()
+    tables = catalog.load_catalog(
+        os.path.join(
+            offline_config.INFRA_DIR,
+            config.get("tableCatalog") or catalog.DEFAULT_CATALOG_PATH,
+        )
+    )
+    sources = from_config(
+        config.get("sources"),
+        config.get("resourcePrefix") or "demo",
+        config.get("topicPrefix") or "rds1",
+        config.get("rds:xoutServerName") or "",
+        int(config.get("rds:xstreamShards") or 1),
+        config.get("rds:profile"),
+        {key: config.get(key) for key in rds_profiles.OVERRIDES},
+        config.get("rds:dbName") or "",
+    )
+    return OfflineStack(
+        config=config,
+        tables=tables,
+        sources=sources,
+        profiles=profiles_from_config(config.get("tableProfiles") or {}, tables, schema),
+        shared_tables=xstream.shared_tables(
+            tables.tables[0].schema,
+            config.get("snapshotStrategy") or snapshot.DEFAULT_STRATEGY,
+            str(config.get("heartbeatTable")).lower() == "true",
+        ),
+    )
+
+
+def find(sources: list[Source], name: str | None) -> Source:
+    """The source of that name, the first source without a name."""
+    if name is None:
+        return sources[0]
+    for source in sources:
+        if source.name == name:
+            return source
+    raise ValueError(
+        f"Unknown source {name}, use one of {', '.join(s.name for s in sources)}"
+    )
+
+
+def usages_from_config(
+    stack: str | None, readers: int = DEFAULT_READERS
+) -> tuple[dict, list[Source], list[SourceUsage]]:
+    """Offline config, sources and their usage, as ResourcesManager sees them."""
+    offline = offline_stack(stack)
+    heartbeat_topic = bool(int(offline.config.get("heartbeatIntervalMs") or 0))
+    usages = [
+        source_usage(source, offline.tables, offline.profiles, heartbeat_topic, readers)
+        for source in offline.sources
+    ]
+    return offline.config, offline.sources, usages
+
+
+if __name__ == "__main__":
+    import cluster_tiers
+
+    parser = argparse.ArgumentParser(
+        description="Print the load every Oracle source puts on the cluster."
+    )
+    parser.add_argument("--stack")
+    parser.add_argument(
+        "--readers", type=int, default=DEFAULT_READERS, help="consumers per topic"
+    )
+    args = parser.parse_args()
+
+    config, sources, usages = usages_from_config(args.stack, args.readers)
+    for source, usage in zip(sources, usages):
+        print(
+            f"{source.name:<20} {source.topic_prefix:<12} {source.rds_profile.name:<10} "
+            f"{usage.connector_tasks} connector(s)  {usage.partitions:>5} partitions  "
+            f"{usage.ingress_bytes_per_sec / MB:8.1f} MB/s in  "
+            f"{usage.egress_bytes_per_sec / MB:8.1f} MB/s out"
+        )
+    try:
+        plan, warnings = cluster_tiers.plan(
+            cluster_tiers.Workload.total(usages),
+            config.get("clusterTier"),
+            config.get("clusterMinTier") or cluster_tiers.STANDARD.name,
+            config.get("clusterAvailability") or "SINGLE_ZONE",
+        )
+    except ValueError as e:
+        raise SystemExit(str(e))
+    for warning in warnings:
+        print(f"warning: {warning}")
+    print(f"{len(usages)} sources on a {plan.description} cluster")
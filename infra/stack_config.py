@@ -0,0 +1,497 @@
+"""Typed and validated stack configuration.
+
+ResourcesManager reads every key of the root, `rds` and `dbx` namespaces once
+and passes the raw values to `load`, which converts and checks all of them in
+one go and reports every problem at once, before any resource is declared:
+numeric ranges, names Oracle and AWS accept, the RDS instance class and
+storage combination (rds_profiles.py), presets, snapshot and heartbeat
+settings, and that `rds:cfltUserPassword` is set, not the placeholder of
+Pulumi.yaml and stored as a secret. The result is immutable, the create_*
+steps read it through ResourcesManager.
+
+Raw values are the strings `pulumi.Config` returns or the parsed YAML of
+offline_config.py, so the same checks run without the Pulumi engine:
+
+    python stack_config.py --stack dev
+"""
+
+import argparse
+import json
+import re
+import types
+import typing
+
+import cluster_tiers
+import connector_presets
+import heartbeat
+import offline_config
+import rds_profiles
+import snapshot
+import sources
+
+PLACEHOLDER_PASSWORDS = ("", "tobedefined", "changeme")
+# Oracle identifiers and passwords are limited to 30 bytes
+MAX_ORACLE_NAME_LENGTH = 30
+MIN_PASSWORD_LENGTH = 8
+# the prefix ends up in S3 bucket and IAM role names
+MAX_PREFIX_LENGTH = 32
+TABLE_PROFILE_KEYS = (
+    "rowsPerSecond",
+    "avgRowBytes",
+    "maxRowBytes",
+    "clobBytes",
+    "lobBytes",
+    "updatePct",
+    "deletePct",
+    "updateColumns",
+    "keyCardinality",
+)
+
+
+class ConfigError(ValueError):
+    """One or more config values are invalid."""
+
+    def __init__(self, errors: list[str]):
+        super().__init__(
+            "Invalid stack config:\n" + "\n".join(f"  - {e}" for e in errors)
+        )
+        self.errors = errors
+
+
+class Secret:
+    """A config value that is never printed."""
+
+    __slots__ = ("_value",)
+
+    def __init__(self, value: str):
+        object.__setattr__(self, "_value", value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Secret is immutable")
+
+    def __repr__(self) -> str:
+        return "Secret('********')"
+
+    __str__ = __repr__
+
+    def reveal(self) -> str:
+        return self._value
+
+
+class _Frozen:
+    """Slots set once by the constructor, read-only afterwards."""
+
+    __slots__ = ()
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            object.__setattr__(self, name, values[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{n}={getattr(self, n)!r}" for n in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class RdsConfig(_Frozen):
+    __slots__ = (
+        "profile",
+        "db_name",
+        "db_username",
+        "cflt_user_name",
+        "cflt_user_password",
+        "xout_server_name",
+        "xstream_shards",
+    )
+    profile: rds_profiles.RdsProfile
+    db_name: str
+    db_username: str
+    cflt_user_name: str
+    cflt_user_password: Secret
+    xout_server_name: str
+    xstream_shards: int
+
+
+class DbxConfig(_Frozen):
+    __slots__ = ("host", "storage_creds_external_id")
+    host: str
+    storage_creds_external_id: str
+
+
+class StackConfig(_Frozen):
+    __slots__ = (
+        "resource_prefix",
+        "protect_resources",
+        "default_tags",
+        "region",
+        "vpc_id",
+        "probe_cache_ttl",
+        "print_step_graph",
+        "profile_evaluation",
+        "table_catalog",
+        "topic_prefix",
+        "snapshot",
+        "heartbeat",
+        "connector_preset",
+        "connector_presets",
+        "connector_memory_budget",
+        "table_profiles",
+        "cluster_tier",
+        "cluster_min_tier",
+        "cluster_availability",
+        "rds",
+        "dbx",
+        "sources",
+        "warnings",
+    )
+    resource_prefix: str
+    protect_resources: bool
+    default_tags: types.MappingProxyType
+    region: str
+    vpc_id: str
+    probe_cache_ttl: int
+    print_step_graph: bool
+    # log the import, step and invoke times, see profiler.py
+    profile_evaluation: bool
+    table_catalog: str
+    topic_prefix: str
+    snapshot: snapshot.SnapshotSettings
+    heartbeat: heartbeat.HeartbeatSettings
+    connector_preset: str | None
+    connector_presets: types.MappingProxyType
+    connector_memory_budget: int
+    table_profiles: types.MappingProxyType
+    # pinned tier or auto, see cluster_tiers.py
+    cluster_tier: str
+    cluster_min_tier: str
+    cluster_availability: str
+    rds: RdsConfig
+    dbx: DbxConfig
+    # the rds:* keys are the defaults of the sources
+    sources: tuple[sources.Source, ...]
+    # problems that do not stop a deployment, e.g. a plain text password
+    warnings: tuple[str, ...]
+
+
+# every key load reads, root keys without namespace
+KEYS = (
+    "resourcePrefix",
+    "protectResources",
+    "defaultTags",
+    "region",
+    "vpcId",
+    "probeCacheTtl",
+    "printStepGraph",
+    "profileEvaluation",
+    "tableCatalog",
+    "topicPrefix",
+    "snapshotStrategy",
+    "snapshotThreads",
+    "heartbeatIntervalMs",
+    "heartbeatTable",
+    "connectorPreset",
+    "connectorPresets",
+    "connectorMemoryBudgetBytes",
+    "tableProfiles",
+    "sources",
+    "clusterTier",
+    "clusterMinTier",
+    "clusterAvailability",
+    "rds:profile",
+    *rds_profiles.OVERRIDES,
+    "rds:dbName",
+    "rds:dbUsername",
+    "rds:cfltUserName",
+    "rds:cfltUserPassword",
+    "rds:xoutServerName",
+    "rds:xstreamShards",
+    "dbx:host",
+    "dbx:storageCredsExternalId",
+)
+SECRET_KEYS = ("rds:cfltUserPassword",)
+
+
+class _Reader:
+    """Converts raw values and collects the errors instead of raising."""
+
+    def __init__(self, raw: dict):
+        self.raw = raw
+        self.errors: list[str] = []
+
+    def value(self, key: str):
+        value = self.raw.get(key)
+        if isinstance(value, dict) and set(value) == {"secure"}:
+            self.errors.append(f"{key} is encrypted, load it through Pulumi")
+            return None
+        return None if value == "" else value
+
+    @typing.overload
+    def text(self, key: str, default: str, pattern: str | None = None) -> str: ...
+
+    @typing.overload
+    def text(
+        self, key: str, default: None = None, pattern: str | None = None
+    ) -> str | None: ...
+
+    def text(self, key: str, default: str | None = None, pattern: str | None = None):
+        value = self.value(key)
+        if value is None:
+            return default
+        value = str(value)
+        if pattern is not None and not re.fullmatch(pattern, value):
+            self.errors.append(f"{key} {value!r} must match {pattern}")
+        return value
+
+    def choice(self, key: str, default: str, choices: tuple[str, ...]) -> str:
+        value = self.text(key, default)
+        if value not in choices:
+            self.errors.append(f"{key} {value!r} must be one of {', '.join(choices)}")
+        return value
+
+    def integer(self, key: str, default: int | None, minimum: int | None = 0):
+        value = self.value(key)
+        if value is None:
+            return default
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            self.errors.append(f"{key} {value!r} is not an integer")
+            return default
+        try:
+            number = int(value)
+        except ValueError:
+            self.errors.append(f"{key} {value!r} is not an integer")
+            return default
+        if minimum is not None and number < minimum:
+            self.errors.append(f"{key} {number} must be at least {minimum}")
+        return number
+
+    def flag(self, key: str, default: bool = False) -> bool:
+        value = self.value(key)
+        if value is None:
+            return default
+        if isinstance(value, bool):
+            return value
+        if str(value).lower() in ("true", "false"):
+            return str(value).lower() == "true"
+        self.errors.append(f"{key} {value!r} is not true or false")
+        return default
+
+    def mapping(self, key: str) -> dict:
+        value = self.value(key)
+        if value is None:
+            return {}
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except json.JSONDecodeError as e:
+                self.errors.append(f"{key} is not valid JSON: {e}")
+                return {}
+        if not isinstance(value, dict):
+            self.errors.append(f"{key} must be an object")
+            return {}
+        return value
+
+    def items(self, key: str) -> list | None:
+        value = self.value(key)
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except json.JSONDecodeError as e:
+                self.errors.append(f"{key} is not valid JSON: {e}")
+                return None
+        if value is not None and not isinstance(value, list):
+            self.errors.append(f"{key} must be a list")
+            return None
+        return value
+
+    def check(self, build, *args):
+        """Result of a validating constructor, None after a ValueError."""
+        try:
+            return build(*args)
+        except ValueError as e:
+            self.errors.append(str(e))
+            return None
+
+
+def load(raw: dict, secret_keys: set[str] | None = None) -> StackConfig:
+    """Validate the raw values of KEYS, raise ConfigError with every problem.
+
+    `secret_keys` are the keys stored encrypted, for a plain text password
+    the config carries a warning; None skips that check.
+    """
+    r = _Reader(raw)
+    warnings = []
+
+    resource_prefix = r.text(
+        "resourcePrefix", "demo", rf"[a-z0-9][a-z0-9-]{{0,{MAX_PREFIX_LENGTH - 1}}}"
+    )
+    default_tags = r.mapping("defaultTags")
+    for name, value in default_tags.items():
+        if not isinstance(value, str):
+            r.errors.append(f"defaultTags {name} must be a string")
+
+    preset = r.text("connectorPreset")
+    presets = r.mapping("connectorPresets")
+    for name in {preset, *presets.values()} - {None}:
+        r.check(connector_presets.preset_config, name)
+
+    table_profiles = r.mapping("tableProfiles")
+    for table, values in table_profiles.items():
+        r.errors.extend(_table_profile_errors(table, values))
+
+    rds = RdsConfig(
+        profile=r.check(
+            rds_profiles.resolve,
+            r.text("rds:profile"),
+            {key: r.value(key) for key in rds_profiles.OVERRIDES},
+        ),
+        db_name=r.text("rds:dbName", "", sources.DB_NAME_PATTERN),
+        db_username=r.text("rds:dbUsername", "", _oracle_name()),
+        cflt_user_name=r.text("rds:cfltUserName", "", _oracle_name()),
+        cflt_user_password=Secret(_password(r, secret_keys, warnings)),
+        # xstream.py appends _<n> per shard and checks the final length
+        xout_server_name=r.text("rds:xoutServerName", "", _oracle_name()),
+        xstream_shards=r.integer("rds:xstreamShards", 1, minimum=1),
+    )
+    for key in ("rds:dbName", "rds:dbUsername", "rds:cfltUserName", "rds:xoutServerName"):
+        if r.value(key) is None:
+            r.errors.append(f"{key} is required")
+
+    topic_prefix = r.text("topicPrefix", "rds1", sources.TOPIC_PREFIX_PATTERN)
+    stack_sources = ()
+    if rds.profile is not None and rds.xstream_shards >= 1:
+        stack_sources = r.check(
+            sources.from_config,
+            r.items("sources"),
+            resource_prefix,
+            topic_prefix,
+            rds.xout_server_name,
+            rds.xstream_shards,
+            r.text("rds:profile"),
+            {key: r.value(key) for key in rds_profiles.OVERRIDES},
+            rds.db_name,
+        )
+
+    dbx = DbxConfig(
+        host=r.text("dbx:host", "", r"https://[^/\s]+/?"),
+        storage_creds_external_id=r.text("dbx:storageCredsExternalId", ""),
+    )
+
+    config = StackConfig(
+        resource_prefix=resource_prefix,
+        protect_resources=r.flag("protectResources"),
+        default_tags=types.MappingProxyType(default_tags),
+        region=r.text("region", "eu-central-1", r"[a-z]{2}(-[a-z]+)+-\d"),
+        vpc_id=r.text("vpcId", "", r"(vpc-[0-9a-f]{8,17})?"),
+        probe_cache_ttl=r.integer("probeCacheTtl", 600),
+        print_step_graph=r.flag("printStepGraph"),
+        profile_evaluation=r.flag("profileEvaluation"),
+        table_catalog=r.text("tableCatalog"),
+        topic_prefix=topic_prefix,
+        snapshot=r.check(
+            snapshot.settings,
+            r.text("snapshotStrategy"),
+            r.integer("snapshotThreads", None, minimum=None),
+        ),
+        heartbeat=r.check(
+            heartbeat.settings,
+            r.integer("heartbeatIntervalMs", None, minimum=None),
+            r.flag("heartbeatTable"),
+        ),
+        connector_preset=preset,
+        connector_presets=types.MappingProxyType(presets),
+        connector_memory_budget=r.integer(
+            "connectorMemoryBudgetBytes",
+            connector_presets.DEFAULT_MEMORY_BUDGET_BYTES,
+            minimum=1,
+        ),
+        table_profiles=types.MappingProxyType(table_profiles),
+        cluster_tier=r.choice("clusterTier", "auto", ("auto", *cluster_tiers.TIER_NAMES)),
+        cluster_min_tier=r.choice(
+            "clusterMinTier", cluster_tiers.STANDARD.name, cluster_tiers.TIER_NAMES
+        ),
+        cluster_availability=r.choice(
+            "clusterAvailability", "SINGLE_ZONE", cluster_tiers.AVAILABILITIES
+        ),
+        rds=rds,
+        dbx=dbx,
+        sources=tuple(stack_sources or ()),
+        warnings=tuple(warnings),
+    )
+    if r.errors:
+        raise ConfigError(r.errors)
+    return config
+
+
+def _oracle_name() -> str:
+    return rf"[A-Za-z][A-Za-z0-9_$#]{{0,{MAX_ORACLE_NAME_LENGTH - 1}}}"
+
+
+def _password(r: _Reader, secret_keys: set[str] | None, warnings: list[str]) -> str:
+    key = "rds:cfltUserPassword"
+    raw = r.raw.get(key)
+    if isinstance(raw, dict) and set(raw) == {"secure"}:
+        # encrypted in the stack file, only Pulumi can check the value
+        return ""
+    password = r.text(key, "")
+    if password.lower() in PLACEHOLDER_PASSWORDS:
+        r.errors.append(
+            f"{key} is not set, use `pulumi config set --secret {key} <password>`"
+        )
+    elif not MIN_PASSWORD_LENGTH <= len(password.encode()) <= MAX_ORACLE_NAME_LENGTH:
+        r.errors.append(
+            f"{key} must be {MIN_PASSWORD_LENGTH}-{MAX_ORACLE_NAME_LENGTH} bytes long"
+        )
+    elif '"' in password:
+        r.errors.append(f"{key} must not contain double quotes")
+    if password and secret_keys is not None and key not in secret_keys:
+        warnings.append(
+            f"{key} is stored in plain text, use `pulumi config set --secret {key}`"
+        )
+    return password
+
+
+def _table_profile_errors(table: str, values) -> list[str]:
+    if not isinstance(values, dict):
+        return [f"tableProfiles {table} must be an object"]
+    errors = [
+        f"tableProfiles {table}: unknown key {key}"
+        for key in values
+        if key not in TABLE_PROFILE_KEYS
+    ]
+    for key, value in values.items():
+        if key == "updateColumns" or key not in TABLE_PROFILE_KEYS:
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            errors.append(f"tableProfiles {table}: {key} must be a number >= 0")
+        elif key in ("updatePct", "deletePct") and value > 100:
+            errors.append(f"tableProfiles {table}: {key} must be at most 100")
+    return errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate the config of a stack.")
+    parser.add_argument("--stack")
+    args = parser.parse_args()
+
+    raw = offline_config.load_config(args.stack)
+    secret_keys = {
+        key
+        for key, value in raw.items()
+        if isinstance(value, dict) and set(value) == {"secure"}
+    }
+    try:
+        config = load(raw, secret_keys if args.stack else None)
+    except ConfigError as e:
+        raise SystemExit(str(e))
+    for key in sorted(set(raw) - set(KEYS)):
+        if key.split(":")[0] in ("rds", "dbx") or ":" not in key:
+            print(f"warning: unknown key {key}")
+    for warning in config.warnings:
+        print(f"warning: {warning}")
+    print(f"{args.stack or 'project'} config is valid")
+    print(config)
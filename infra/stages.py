@@ -0,0 +1,148 @@
+"""Dependency graph of the create_* steps run by __main__.
+
+Each step declares the ResourcesManager attributes it reads (`needs`), sets
+(`provides`) and the resources it has to wait for without consuming any of
+their outputs (`waits_for`). Pulumi already orders resources by the outputs
+they consume, so only `waits_for` has to become an explicit `depends_on`.
+The graph is validated for missing producers and cycles before anything runs.
+"""
+
+import dataclasses
+from typing import Callable
+
+
+class GraphError(Exception):
+    """The step graph is inconsistent."""
+
+
+@dataclasses.dataclass(frozen=True)
+class Step:
+    name: str
+    run: Callable[[], None]
+    needs: tuple[str, ...] = ()
+    provides: tuple[str, ...] = ()
+    waits_for: tuple[str, ...] = ()
+    # rough creation time of the step's resources in seconds
+    duration: float = 10.0
+
+
+class StepGraph:
+    def __init__(self, steps: list[Step], available: tuple[str, ...] = ()):
+        self.steps: dict[str, Step] = {}
+        for step in steps:
+            if step.name in self.steps:
+                raise GraphError(f"Step {step.name} declared twice")
+            self.steps[step.name] = step
+        # attributes set before the graph runs
+        self.available = set(available)
+
+        self.producers: dict[str, str] = {}
+        for step in steps:
+            for attr in step.provides:
+                if attr in self.producers:
+                    raise GraphError(
+                        f"{attr} provided by both {self.producers[attr]} and {step.name}"
+                    )
+                self.producers[attr] = step.name
+
+    def dependencies(self, name: str) -> list[str]:
+        """Steps that have to run before the given step."""
+        step = self.steps[name]
+        deps = []
+        for attr in step.needs + step.waits_for:
+            producer = self.producers.get(attr)
+            if producer is not None and producer not in deps:
+                deps.append(producer)
+        return deps
+
+    def validate(self):
+        """Raise GraphError on missing producers or cycles."""
+        for step in self.steps.values():
+            for attr in step.needs + step.waits_for:
+                if attr not in self.producers and attr not in self.available:
+                    raise GraphError(f"{step.name} needs {attr} but no step provides it")
+        self.order()
+
+    def order(self) -> list[Step]:
+        """Steps in dependency order, stable with respect to declaration order."""
+        done: set[str] = set()
+        visiting: list[str] = []
+        ordered: list[Step] = []
+
+        def visit(name: str):
+            if name in done:
+                return
+            if name in visiting:
+                cycle = visiting[visiting.index(name) :] + [name]
+                raise GraphError(f"Cycle between steps: {' -> '.join(cycle)}")
+            visiting.append(name)
+            for dep in self.dependencies(name):
+                visit(dep)
+            visiting.pop()
+            done.add(name)
+            ordered.append(self.steps[name])
+
+        for name in self.steps:
+            visit(name)
+        return ordered
+
+    def levels(self) -> list[list[str]]:
+        """Group steps into waves that do not depend on each other."""
+        level: dict[str, int] = {}
+        for step in self.order():
+            deps = self.dependencies(step.name)
+            level[step.name] = 1 + max((level[d] for d in deps), default=-1)
+        waves: list[list[str]] = [[] for _ in range(max(level.values(), default=-1) + 1)]
+        for name, index in level.items():
+            waves[index].append(name)
+        return waves
+
+    def critical_path(self) -> tuple[list[str], float]:
+        """Longest chain of dependent steps weighted by duration."""
+        finish: dict[str, float] = {}
+        previous: dict[str, str | None] = {}
+        for step in self.order():
+            deps = self.dependencies(step.name)
+            slowest = max(deps, key=lambda d: finish[d], default=None)
+            previous[step.name] = slowest
+            finish[step.name] = step.duration + (finish[slowest] if slowest else 0)
+        if not finish:
+            return [], 0.0
+        name: str | None = max(finish, key=lambda n: finish[n])
+        total = finish[name]
+        path = []
+        while name is not None:
+            path.append(name)
+            name = previous[name]
+        return list(reversed(path)), total
+
+    def describe(self) -> str:
+        """Human readable graph with waves and critical path."""
+        lines = []
+        for index, wave in enumerate(self.levels()):
+            lines.append(f"wave {index}:")
+            for name in wave:
+                deps = self.dependencies(name)
+                after = f" (after {', '.join(deps)})" if deps else ""
+                lines.append(f"  {name}{after}")
+        path, total = self.critical_path()
+        lines.append(f"critical path ({total:.0f}s): {' -> '.join(path)}")
+        return "\n".join(lines)
+
+    def run(
+        self,
+        before_step: Callable[[Step], None] | None = None,
+        run_step: Callable[[Step], None] | None = None,
+    ):
+        """Validate the graph and run the steps in dependency order.
+
+        `run_step` runs a step in place of `step.run()`, e.g. to time it.
+        """
+        self.validate()
+        for step in self.order():
+            if before_step is not None:
+                before_step(step)
+            if run_step is not None:
+                run_step(step)
+            else:
+                step.run()
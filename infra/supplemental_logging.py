@@ -0,0 +1,166 @@
+r"""Table-level supplemental log groups for the captured tables.
+
+Instead of database-wide ALL column logging, only the captured tables get a
+log group with the primary key and the columns the connector emits: the
+columns left by the catalog column projection and the connector's
+`column.include.list` / `column.exclude.list`. Prints the SQL and the redo an
+update saves compared to ALL:
+
+    python supplemental_logging.py
+    python supplemental_logging.py --stack dev
+    python supplemental_logging.py --exclude 'ADMIN\.PHARMA_EVENT\.DESCRIPTION'
+"""
+
+import argparse
+import os
+import re
+
+import catalog
+import offline_config
+import oracle_schema
+import redo
+
+# log group names share the 30 character limit of XStream server names
+MAX_GROUP_NAME_LENGTH = 30
+
+
+def connector_columns(
+    spec: catalog.TableSpec,
+    table: oracle_schema.Table,
+    connector_config: dict[str, str],
+) -> tuple[str, ...]:
+    """Columns of the table the connector emits, in table order.
+
+    The catalog projection is applied first, then the connector's include /
+    exclude lists, regular expressions matched against <schema>.<table>.<column>
+    like Debezium does.
+    """
+    include = _patterns(connector_config.get("column.include.list"))
+    exclude = _patterns(connector_config.get("column.exclude.list"))
+    excluded = spec.excluded_columns(table)
+    columns = []
+    for name in table.column_names:
+        if name in excluded:
+            continue
+        qualified = f"{spec.qualified_name}.{name}"
+        if include and not any(p.fullmatch(qualified) for p in include):
+            continue
+        if any(p.fullmatch(qualified) for p in exclude):
+            continue
+        columns.append(name)
+    return tuple(columns)
+
+
+def log_group_columns(
+    table: oracle_schema.Table, included: tuple[str, ...]
+) -> tuple[str, ...]:
+    """Primary key and included columns, LOBs cannot be supplementally logged."""
+    return tuple(
+        c.name
+        for c in table.columns
+        if c.primary_key or (c.name in included and not c.is_lob)
+    )
+
+
+def table_log_groups(
+    tables: catalog.TableCatalog,
+    schema: dict[str, oracle_schema.Table],
+    connector_config: dict[str, str],
+) -> dict[str, tuple[str, ...]]:
+    """Logged columns of every captured table, by <schema>.<table>."""
+    groups = {}
+    for spec in tables:
+        table = schema[spec.name]
+        groups[spec.qualified_name] = log_group_columns(
+            table, connector_columns(spec, table, connector_config)
+        )
+    return groups
+
+
+def load_tables(config: dict) -> catalog.TableCatalog:
+    """Table catalog of a stack config."""
+    return catalog.load_catalog(
+        os.path.join(
+            offline_config.INFRA_DIR,
+            config.get("tableCatalog") or catalog.DEFAULT_CATALOG_PATH,
+        )
+    )
+
+
+def log_group_name(table_name: str) -> str:
+    return f"CDC_{table_name}"[:MAX_GROUP_NAME_LENGTH]
+
+
+def render_sql(groups: dict[str, tuple[str, ...]]) -> str:
+    """SQL replacing database-wide ALL logging with one log group per table.
+
+    `groups` maps <schema>.<table> to the logged columns.
+    """
+    blocks = [
+        "-- generated by infra/supplemental_logging.py\n"
+        "-- minimal supplemental logging is required for capture\n"
+        "begin\n"
+        "    rdsadmin.rdsadmin_util.alter_supplemental_logging(\n"
+        "        p_action => 'ADD');\n"
+        "end;\n"
+        "/",
+        "-- when upgrading from database-wide ALL column logging, drop it\n"
+        "-- begin\n"
+        "--     rdsadmin.rdsadmin_util.alter_supplemental_logging(\n"
+        "--         p_action => 'DROP',\n"
+        "--         p_type   => 'ALL');\n"
+        "-- end;\n"
+        "-- /",
+    ]
+    for qualified_name, columns in groups.items():
+        name = log_group_name(qualified_name.split(".")[-1])
+        blocks.append(
+            f"ALTER TABLE {qualified_name}\n"
+            f"  ADD SUPPLEMENTAL LOG GROUP {name} ({', '.join(columns)}) ALWAYS;"
+        )
+    return "\n\n".join(blocks) + "\n"
+
+
+def _patterns(value: str | None) -> list[re.Pattern]:
+    if not value:
+        return []
+    return [re.compile(p.strip(), re.IGNORECASE) for p in value.split(",") if p.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Print the supplemental log groups of the captured tables."
+    )
+    parser.add_argument("--stack")
+    parser.add_argument("--include", help="column.include.list to try")
+    parser.add_argument("--exclude", help="column.exclude.list to try")
+    args = parser.parse_args()
+
+    config = offline_config.load_config(args.stack)
+    connector_config = offline_config.load_connector_defaults()
+    if args.include:
+        connector_config["column.include.list"] = args.include
+    if args.exclude:
+        connector_config["column.exclude.list"] = args.exclude
+    schema = oracle_schema.load_schema()
+    tables = load_tables(config)
+    workloads = redo.workloads_from_config(config, schema)
+
+    groups = table_log_groups(tables, schema, connector_config)
+    for spec in tables:
+        table = schema[spec.name]
+        logged = groups[spec.qualified_name]
+        workload = workloads.get(spec.name)
+        if workload is None:
+            continue
+        clob_bytes = workload.profile.lob_bytes
+        updated = workload.update_columns or redo.default_update_columns(table)
+        saved = redo.redo_per_update(
+            table, updated, redo.supplemental_columns(table, "ALL"), clob_bytes
+        ) - redo.redo_per_update(table, updated, logged, clob_bytes)
+        updates = workload.profile.rows_per_second * workload.update_pct / 100
+        print(
+            f"-- {spec.qualified_name}: {saved} bytes less redo per update, "
+            f"{saved * updates * 3600 / 2**20:.1f} MiB per hour"
+        )
+    print(render_sql(groups), end="")
@@ -0,0 +1,155 @@
+"""S3 write and file count estimate for the Tableflow topics.
+
+Tableflow materializes every topic once per table format. Per commit it writes
+one parquet file per partition with new data and the table metadata, small
+files are compacted later and the files they replace are kept until the
+snapshot retention (`retentionMs` in the catalog) expires them. Commit interval
+and compaction target are managed by Tableflow and not configurable, the
+defaults below are assumptions and can be overridden for what-if runs:
+
+    python tableflow.py
+    python tableflow.py --commit-interval 300 --formats DELTA
+"""
+
+import argparse
+import dataclasses
+import math
+
+import catalog
+import lob
+import sizing
+
+DEFAULT_COMMIT_INTERVAL_SECONDS = 15 * 60
+DEFAULT_TARGET_FILE_BYTES = 128 * 1024 * 1024
+# files at or above this size are uploaded in parts, one PUT per part plus two
+MULTIPART_PART_BYTES = 16 * 1024 * 1024
+
+# metadata objects written per commit
+METADATA_PUTS_PER_COMMIT = {
+    # metadata.json, manifest list and manifest
+    "ICEBERG": 3,
+    # _delta_log commit json
+    "DELTA": 1,
+}
+# Delta writes a parquet checkpoint of the log every 10 commits
+DELTA_CHECKPOINT_INTERVAL = 10
+
+
+@dataclasses.dataclass(frozen=True)
+class TableflowCost:
+    """Hourly S3 activity of one Tableflow topic, all formats together."""
+
+    formats: tuple[str, ...]
+    data_files_per_hour: float
+    compacted_files_per_hour: float
+    s3_puts_per_hour: float
+    s3_bytes_per_hour: float
+    # replaced data files still referenced by unexpired snapshots
+    retained_small_files: float
+
+
+def _puts_per_file(file_bytes: float) -> int:
+    if file_bytes < MULTIPART_PART_BYTES:
+        return 1
+    return math.ceil(file_bytes / MULTIPART_PART_BYTES) + 2
+
+
+def estimate(
+    profile: sizing.TableProfile,
+    settings: catalog.TableflowSettings,
+    partitions: int = 1,
+    commit_interval_seconds: int = DEFAULT_COMMIT_INTERVAL_SECONDS,
+    target_file_bytes: int = DEFAULT_TARGET_FILE_BYTES,
+) -> TableflowCost:
+    """S3 PUTs, bytes and files per hour for a table profile."""
+    commits = 3600 / commit_interval_seconds
+    records_per_commit = profile.rows_per_second * commit_interval_seconds
+    # partitions without records in a commit interval write no file
+    active_partitions = min(partitions, math.ceil(records_per_commit))
+    bytes_per_commit = (
+        profile.bytes_per_second * commit_interval_seconds * lob.PARQUET_SIZE_RATIO
+    )
+    file_bytes = bytes_per_commit / active_partitions if active_partitions else 0.0
+    files_per_partition = max(1, math.ceil(file_bytes / target_file_bytes))
+    files_per_commit = active_partitions * files_per_partition
+    data_files = commits * files_per_commit
+
+    # commits smaller than the target are rewritten into target size files
+    hourly_bytes = commits * bytes_per_commit
+    small = file_bytes < target_file_bytes
+    compacted_files = (
+        max(active_partitions, math.ceil(hourly_bytes / target_file_bytes))
+        if small and active_partitions
+        else 0
+    )
+    compacted_bytes = hourly_bytes if small else 0.0
+
+    data_puts = files_per_commit * _puts_per_file(file_bytes / files_per_partition)
+    compaction_puts = compacted_files * _puts_per_file(
+        compacted_bytes / compacted_files if compacted_files else 0.0
+    )
+    retention_hours = (
+        settings.retention_ms or catalog.DEFAULT_TABLEFLOW_RETENTION_MS
+    ) / 3_600_000
+
+    puts = 0.0
+    for table_format in settings.formats:
+        metadata = METADATA_PUTS_PER_COMMIT[table_format]
+        if table_format == "DELTA":
+            metadata += 1 / DELTA_CHECKPOINT_INTERVAL
+        # compaction is a commit of its own
+        compaction_commits = 1 if compacted_files else 0
+        puts += commits * (data_puts + metadata)
+        puts += compaction_puts + compaction_commits * metadata
+
+    formats = len(settings.formats)
+    return TableflowCost(
+        formats=settings.formats,
+        data_files_per_hour=data_files * formats,
+        compacted_files_per_hour=compacted_files * formats,
+        s3_puts_per_hour=puts,
+        s3_bytes_per_hour=(hourly_bytes + compacted_bytes) * formats,
+        retained_small_files=(
+            data_files * formats * retention_hours if small else 0.0
+        ),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Estimate the S3 writes and files of the Tableflow topics."
+    )
+    parser.add_argument(
+        "--commit-interval", type=int, default=DEFAULT_COMMIT_INTERVAL_SECONDS
+    )
+    parser.add_argument("--target-file-bytes", type=int, default=DEFAULT_TARGET_FILE_BYTES)
+    parser.add_argument(
+        "--formats",
+        action="append",
+        choices=catalog.TABLE_FORMATS,
+        help="override the catalog formats",
+    )
+    args = parser.parse_args()
+
+    for spec in catalog.load_catalog():
+        settings = spec.tableflow
+        if args.formats:
+            settings = dataclasses.replace(settings, formats=tuple(args.formats))
+        sample = sizing.SAMPLE_PROFILES.get(spec.name)
+        if sample is None:
+            continue
+        cost = estimate(
+            sample,
+            settings,
+            sizing.plan_topic(sample).partitions,
+            args.commit_interval,
+            args.target_file_bytes,
+        )
+        print(
+            f"{spec.name:<22} {'+'.join(cost.formats):<13} "
+            f"files/h={cost.data_files_per_hour:7.0f} "
+            f"compacted/h={cost.compacted_files_per_hour:5.0f} "
+            f"puts/h={cost.s3_puts_per_hour:8.0f} "
+            f"written={cost.s3_bytes_per_hour / 2**30:6.2f}GiB/h "
+            f"retained={cost.retained_small_files:7.0f}"
+        )
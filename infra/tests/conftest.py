@@ -0,0 +1,130 @@
+"""Fixtures of the infra tests: the modules on sys.path, Pulumi mocks and a stub API.
+
+The infra modules import each other by bare name like Pulumi runs them from
+the infra directory. Tests of resource modules need the packages of
+requirements.txt and are skipped without them:
+
+    cd infra && python -m pytest tests
+"""
+
+import http.server
+import json
+import os
+import sys
+import threading
+import typing
+from typing import Callable
+
+import pytest
+
+if typing.TYPE_CHECKING:
+    # pulumi is optional, see the pulumi_mocks fixture
+    from pulumi.runtime import MockCallArgs, MockResourceArgs
+
+INFRA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, INFRA_DIR)
+
+
+@pytest.fixture
+def pulumi_mocks():
+    """Pulumi runtime mocks recording every registered resource.
+
+    Resources echo their inputs as outputs. Run the code registering them in
+    a function decorated with pulumi.runtime.test, which waits for them.
+    """
+    runtime = pytest.importorskip("pulumi").runtime
+
+    class RecordingMocks(runtime.Mocks):
+        def __init__(self):
+            self.resources: list[MockResourceArgs] = []
+
+        def new_resource(self, args: "MockResourceArgs"):
+            self.resources.append(args)
+            return f"{args.name}-id", dict(args.inputs)
+
+        def call(self, args: "MockCallArgs"):
+            return {}, []
+
+        def of_type(self, typ: str) -> "list[MockResourceArgs]":
+            return [r for r in self.resources if r.typ == typ]
+
+    mocks = RecordingMocks()
+    runtime.set_mocks(mocks, project="demo-infra", stack="test", preview=False)
+    return mocks
+
+
+# status, headers and JSON body of a stub response
+StubResponse = tuple[int, dict[str, str], object]
+
+
+class StubApi:
+    """Local HTTP/1.1 server answering every request with `respond`.
+
+    `respond(method, path, body)` gets the decoded JSON body, `requests`
+    records (method, path, body) in the order they arrived. Without
+    `keep_alive` the server closes each connection after the response without
+    announcing it, like an idle timeout, and sets `closed` once it did.
+    """
+
+    def __init__(self, respond: Callable[[str, str, object], StubResponse]):
+        self.respond = respond
+        self.requests: list[tuple[str, str, object]] = []
+        self.keep_alive = True
+        self.closed = threading.Event()
+        stub = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def handle_request(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                stub.requests.append((self.command, self.path, body))
+                status, headers, payload = stub.respond(self.command, self.path, body)
+                data = json.dumps(payload).encode() if payload is not None else b""
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                if not stub.keep_alive:
+                    self.close_connection = True
+
+            do_GET = do_POST = do_PATCH = do_DELETE = handle_request
+
+            def log_message(self, format, *args):
+                pass
+
+        class Server(http.server.ThreadingHTTPServer):
+            def shutdown_request(self, request):
+                super().shutdown_request(request)
+                stub.closed.set()
+
+        self.server = Server(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_api():
+    """Start a StubApi with `stub_api(respond)`, stopped after the test."""
+    started: list[StubApi] = []
+
+    def start(respond: Callable[[str, str, object], StubResponse]) -> StubApi:
+        stub = StubApi(respond)
+        started.append(stub)
+        return stub
+
+    yield start
+    for stub in started:
+        stub.close()
@@ -0,0 +1,33 @@
+"""Table catalog lookups by qualified and bare name."""
+
+import pytest
+
+import catalog
+
+
+def test_tables_are_found_by_schema_and_table():
+    tables = catalog.parse_catalog(
+        {"defaults": {"schema": "ADMIN"}, "tables": ["PHARMA_EVENT"]}
+    )
+
+    assert tables.require("admin.pharma_event") is tables.require("PHARMA_EVENT")
+    assert tables.get("OTHER.PHARMA_EVENT") is None
+    assert tables.get("PHARMA_AUDIT") is None
+    with pytest.raises(KeyError, match="not in the table catalog"):
+        tables.require("OTHER.PHARMA_EVENT")
+
+
+def test_a_bare_name_in_several_schemas_is_ambiguous():
+    tables = catalog.parse_catalog(
+        {
+            "tables": [
+                {"name": "PHARMA_EVENT", "schema": "ADMIN"},
+                {"name": "PHARMA_EVENT", "schema": "ARCHIVE", "topic": {"partitions": 2}},
+            ]
+        }
+    )
+
+    assert tables.require("ARCHIVE.PHARMA_EVENT").topic.partitions == 2
+    assert tables.require("ADMIN.PHARMA_EVENT").topic.partitions is None
+    with pytest.raises(ValueError, match="ADMIN.PHARMA_EVENT, ARCHIVE.PHARMA_EVENT"):
+        tables.get("PHARMA_EVENT")
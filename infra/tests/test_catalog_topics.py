@@ -0,0 +1,115 @@
+"""The table catalog expanded into topics by create_tableflow_topics, under Pulumi mocks."""
+
+import types
+
+import pytest
+
+pulumi = pytest.importorskip("pulumi")
+pytest.importorskip("pulumi_confluentcloud")
+
+import catalog  # noqa: E402
+import resources_confluent  # noqa: E402
+import sources  # noqa: E402
+
+KAFKA_TOPIC = "confluentcloud:index/kafkaTopic:KafkaTopic"
+TABLEFLOW_TOPIC = "confluentcloud:index/tableflowTopic:TableflowTopic"
+
+
+def _rsm(profiles: dict | None = None) -> types.SimpleNamespace:
+    """The ResourcesManager attributes create_tableflow_topics reads."""
+    out = pulumi.Output.from_input
+    api_key = types.SimpleNamespace(id=out("key"), secret=out("secret"))
+    return types.SimpleNamespace(
+        config=types.SimpleNamespace(resource_prefix="test", protect_resources=False),
+        cflt_environment=types.SimpleNamespace(id=out("env-1")),
+        cflt_kafka_cluster=types.SimpleNamespace(
+            id=out("lkc-1"), rest_endpoint=out("https://lkc-1")
+        ),
+        cflt_xstream_service_account_kafka_api_key=api_key,
+        cflt_xstream_service_account_tableflow_api_key=api_key,
+        aws_tableflow_bucket=types.SimpleNamespace(bucket=out("bucket")),
+        cflt_s3_provider_integration=types.SimpleNamespace(id=out("cspi-1")),
+        cflt_kafka_topics=[],
+        table_profile=lambda name: (profiles or {}).get(name),
+    )
+
+
+def _source() -> sources.Source:
+    return sources.from_config(None, "test", "rds1", "xout", 1, None, {}, "ORCL")[0]
+
+
+def _create_topics(rsm, tables: catalog.TableCatalog):
+    @pulumi.runtime.test
+    def create():
+        resources_confluent.create_tableflow_topics(rsm, tables, _source())
+
+    create()
+
+
+def test_every_table_gets_a_topic_and_a_tableflow_topic(pulumi_mocks):
+    tables = catalog.parse_catalog(
+        {
+            "defaults": {"schema": "ADMIN"},
+            "tables": [
+                "PHARMA_EVENT",
+                {
+                    "name": "PHARMA_NOTES_ATTACH",
+                    "topic": {"partitions": 6},
+                    "tableflow": {"formats": ["delta"], "retentionMs": 86400000},
+                },
+            ],
+        }
+    )
+    rsm = _rsm()
+    _create_topics(rsm, tables)
+
+    topics = {r.inputs["topicName"]: r for r in pulumi_mocks.of_type(KAFKA_TOPIC)}
+    assert sorted(topics) == ["rds1.ADMIN.PHARMA_EVENT", "rds1.ADMIN.PHARMA_NOTES_ATTACH"]
+    assert topics["rds1.ADMIN.PHARMA_NOTES_ATTACH"].inputs["partitionsCount"] == 6
+    assert len(rsm.cflt_kafka_topics) == 2
+
+    tableflow = {
+        r.inputs["displayName"]: r.inputs for r in pulumi_mocks.of_type(TABLEFLOW_TOPIC)
+    }
+    assert tableflow["rds1.ADMIN.PHARMA_EVENT"]["tableFormats"] == ["ICEBERG", "DELTA"]
+    assert tableflow["rds1.ADMIN.PHARMA_NOTES_ATTACH"]["tableFormats"] == ["DELTA"]
+    assert tableflow["rds1.ADMIN.PHARMA_NOTES_ATTACH"]["retentionMs"] == "86400000"
+
+
+def test_duplicate_entries_create_one_topic(pulumi_mocks):
+    tables = catalog.parse_catalog(
+        {"tables": ["PHARMA_EVENT", {"name": "PHARMA_EVENT"}, "PHARMA_EVENT"]}
+    )
+    assert tables.qualified_names() == ["ADMIN.PHARMA_EVENT"]
+    _create_topics(_rsm(), tables)
+
+    assert len(pulumi_mocks.of_type(KAFKA_TOPIC)) == 1
+    assert len(pulumi_mocks.of_type(TABLEFLOW_TOPIC)) == 1
+
+
+def test_duplicate_entries_with_different_settings_are_rejected():
+    with pytest.raises(ValueError, match="declared twice"):
+        catalog.parse_catalog(
+            {"tables": ["PHARMA_EVENT", {"name": "PHARMA_EVENT", "topic": {"partitions": 3}}]}
+        )
+
+
+def test_topic_plan_runs_once_per_distinct_setting(pulumi_mocks):
+    tables = catalog.parse_catalog(
+        {
+            "tables": [
+                "PHARMA_DOSE_REGIMENS",
+                "PHARMA_EVENT",
+                "PHARMA_NOTES_ATTACH",
+                {"name": "PHARMA_AUDIT", "topic": {"partitions": 12}},
+            ]
+        }
+    )
+    # equal settings share one instance, the memoisation key
+    assert tables.tables[0].topic is tables.tables[1].topic
+    resources_confluent._topic_plan.cache_clear()
+    _create_topics(_rsm(), tables)
+
+    info = resources_confluent._topic_plan.cache_info()
+    assert (info.misses, info.hits) == (2, 2)
+    assert len(pulumi_mocks.of_type(KAFKA_TOPIC)) == 4
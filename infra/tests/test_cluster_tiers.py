@@ -0,0 +1,177 @@
+"""The cluster tier planner and the KafkaCluster arguments of its plans."""
+
+import pytest
+
+import cluster_tiers
+from cluster_tiers import BASIC, DEDICATED, ENTERPRISE, STANDARD, Workload
+
+KAFKA_CLUSTER = "confluentcloud:index/kafkaCluster:KafkaCluster"
+
+
+def _workload(partitions=40, ingress_mb=1.0, connector_tasks=2) -> Workload:
+    return Workload(
+        partitions=partitions,
+        ingress_bytes_per_sec=ingress_mb * cluster_tiers.MB,
+        egress_bytes_per_sec=3 * ingress_mb * cluster_tiers.MB,
+        connector_tasks=connector_tasks,
+    )
+
+
+SMALL = _workload()
+
+
+def _plan(tier: cluster_tiers.Tier) -> cluster_tiers.ClusterPlan:
+    chosen = cluster_tiers.fit(SMALL, tier, "SINGLE_ZONE", cluster_tiers.TARGET_UTILIZATION)
+    assert chosen is not None
+    return chosen
+
+
+# the KafkaCluster inputs of the cluster_args per tier
+CLUSTER_INPUTS = {
+    "basic": {"availability": "SINGLE_ZONE", "basic": {}},
+    "standard": {"availability": "SINGLE_ZONE", "standard": {}},
+    "enterprise": {"availability": "MULTI_ZONE", "enterprises": [{}]},
+    "dedicated": {"availability": "SINGLE_ZONE", "dedicated": {"cku": 1}},
+}
+
+
+def test_cluster_args_per_tier():
+    confluentcloud = pytest.importorskip("pulumi_confluentcloud")
+
+    assert _plan(BASIC).cluster_args() == {
+        "availability": "SINGLE_ZONE",
+        "basic": confluentcloud.KafkaClusterBasicArgs(),
+    }
+    assert _plan(ENTERPRISE).cluster_args() == {
+        "availability": "MULTI_ZONE",
+        "enterprises": [confluentcloud.KafkaClusterEnterpriseArgs()],
+    }
+    assert _plan(DEDICATED).cluster_args() == {
+        "availability": "SINGLE_ZONE",
+        "dedicated": confluentcloud.KafkaClusterDedicatedArgs(cku=1),
+    }
+
+
+@pytest.mark.parametrize("tier", cluster_tiers.TIERS, ids=cluster_tiers.TIER_NAMES)
+def test_kafka_cluster_accepts_the_cluster_args(pulumi_mocks, tier):
+    pulumi = pytest.importorskip("pulumi")
+    confluentcloud = pytest.importorskip("pulumi_confluentcloud")
+    chosen = _plan(tier)
+
+    @pulumi.runtime.test
+    def create():
+        confluentcloud.KafkaCluster(
+            "cluster",
+            cloud="AWS",
+            region="us-east-1",
+            environment={"id": "env-1"},
+            **chosen.cluster_args(),
+        )
+
+    create()
+
+    (cluster,) = pulumi_mocks.of_type(KAFKA_CLUSTER)
+    # the input names equal the argument names, none has two words
+    for name, value in CLUSTER_INPUTS[tier.name].items():
+        assert cluster.inputs[name] == value
+
+
+def test_units_needed_rounds_up_to_the_target():
+    # 50 MB/s per CKU at 80%: 40 MB/s is exactly one CKU
+    assert cluster_tiers.units_needed(_workload(ingress_mb=40), DEDICATED, 0.8) == 1
+    assert cluster_tiers.units_needed(_workload(ingress_mb=40.001), DEDICATED, 0.8) == 2
+    assert cluster_tiers.units_needed(_workload(ingress_mb=100), DEDICATED, 0.8) == 3
+    assert cluster_tiers.units_needed(_workload(ingress_mb=0), DEDICATED, 0.8) == 1
+
+
+def test_fit_multi_zone_dedicated_needs_two_ckus():
+    single = cluster_tiers.fit(SMALL, DEDICATED, "SINGLE_ZONE", 0.8)
+    multi = cluster_tiers.fit(SMALL, DEDICATED, "MULTI_ZONE", 0.8)
+    assert single is not None and multi is not None
+    assert (single.units, multi.units) == (1, 2)
+
+
+def test_fit_availability():
+    assert cluster_tiers.fit(SMALL, BASIC, "MULTI_ZONE", 0.8) is None
+    # a multi-zone only tier serves a single-zone deployment
+    chosen = cluster_tiers.fit(SMALL, ENTERPRISE, "SINGLE_ZONE", 0.8)
+    assert chosen is not None
+    assert chosen.availability == "MULTI_ZONE"
+
+
+def test_fit_rejects_more_units_than_the_tier_offers():
+    # 10 eCKUs at 60 MB/s hold 480 MB/s at 80%
+    largest = cluster_tiers.fit(_workload(ingress_mb=480), ENTERPRISE, "MULTI_ZONE", 0.8)
+    assert largest is not None
+    assert largest.units == 10
+    too_large = _workload(ingress_mb=481)
+    assert cluster_tiers.fit(too_large, ENTERPRISE, "MULTI_ZONE", 0.8) is None
+
+
+@pytest.mark.parametrize(
+    "workload, description",
+    [
+        (_workload(), "standard SINGLE_ZONE"),
+        # 80% of the 4096 partitions of a standard cluster
+        (_workload(partitions=3276), "standard SINGLE_ZONE"),
+        (_workload(partitions=3277), "enterprise 2 eCKU MULTI_ZONE"),
+        # 80% of the 1000 connections, 20 per connector task
+        (_workload(connector_tasks=40), "standard SINGLE_ZONE"),
+        (_workload(connector_tasks=41), "enterprise 1 eCKU MULTI_ZONE"),
+        (_workload(ingress_mb=480), "enterprise 10 eCKU MULTI_ZONE"),
+        (_workload(ingress_mb=481), "dedicated 13 CKU SINGLE_ZONE"),
+    ],
+)
+def test_plan_picks_the_cheapest_tier(workload, description):
+    chosen, warnings = cluster_tiers.plan(workload)
+    assert (chosen.description, warnings) == (description, [])
+
+
+def test_plan_multi_zone_skips_basic_and_single_ckus():
+    assert cluster_tiers.plan(SMALL, minimum="basic")[0].tier is BASIC
+    chosen, _ = cluster_tiers.plan(SMALL, minimum="basic", availability="MULTI_ZONE")
+    assert chosen.description == "standard MULTI_ZONE"
+    chosen, _ = cluster_tiers.plan(SMALL, minimum="dedicated", availability="MULTI_ZONE")
+    assert chosen.description == "dedicated 2 CKU MULTI_ZONE"
+
+
+def test_plan_never_goes_below_the_min_tier():
+    assert cluster_tiers.plan(SMALL, minimum="enterprise")[0].tier is ENTERPRISE
+    assert cluster_tiers.plan(SMALL, "auto", minimum="dedicated")[0].tier is DEDICATED
+    with pytest.raises(ValueError, match="Unknown cluster tier"):
+        cluster_tiers.plan(SMALL, minimum="premium")
+
+
+def test_plan_pinned_tier_within_target():
+    chosen, warnings = cluster_tiers.plan(SMALL, pinned="dedicated")
+    assert (chosen.description, warnings) == ("dedicated 1 CKU SINGLE_ZONE", [])
+
+
+def test_plan_pinned_tier_above_target_warns():
+    chosen, warnings = cluster_tiers.plan(_workload(partitions=3500), pinned="standard")
+    assert chosen.tier is STANDARD
+    (warning,) = warnings
+    assert "85% of the partitions" in warning
+    assert "recommends enterprise 2 eCKU MULTI_ZONE" in warning
+
+
+def test_plan_pinned_tier_over_its_limits_is_rejected():
+    with pytest.raises(
+        ValueError, match="exceeds a standard SINGLE_ZONE cluster, use clusterTier enterprise$"
+    ):
+        cluster_tiers.plan(_workload(partitions=5000), pinned="standard")
+
+
+def test_plan_beyond_every_tier():
+    # 152 CKUs at 80% hold 6080 MB/s
+    workload = _workload(ingress_mb=7000)
+    with pytest.raises(ValueError, match="does not fit any cluster tier"):
+        cluster_tiers.plan(workload)
+    chosen, (warning,) = cluster_tiers.plan(workload, pinned="dedicated")
+    assert chosen.units == 140
+    assert "recommends several clusters" in warning
+
+
+def test_plan_rejects_unknown_availability():
+    with pytest.raises(ValueError, match="Unknown availability"):
+        cluster_tiers.plan(SMALL, availability="THREE_ZONE")
@@ -0,0 +1,83 @@
+"""Retries and pooled connections of confluent_api.Session against a local stub."""
+
+import pytest
+
+import confluent_api
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    waits: list[float] = []
+    monkeypatch.setattr(confluent_api.time, "sleep", waits.append)
+    return waits
+
+
+def _session(stub, retries=confluent_api.DEFAULT_RETRIES) -> confluent_api.Session:
+    session = confluent_api.Session("key", "secret", stub.base_url, retries=retries)
+    # the pool is shared per host, start without idle connections of other tests
+    session.pool.close()
+    return session
+
+
+def test_requests_reuse_the_keep_alive_connection(stub_api):
+    stub = stub_api(lambda method, path, body: (200, {}, {"path": path}))
+    session = _session(stub)
+
+    assert session.request("GET", "/a") == {"path": "/a"}
+    assert session.request("GET", "/b") == {"path": "/b"}
+
+    assert not stub.closed.is_set()
+    assert [path for _, path, _ in stub.requests] == ["/a", "/b"]
+
+
+def test_post_on_a_connection_the_server_closed_is_sent_again(stub_api, sleeps):
+    stub = stub_api(lambda method, path, body: (201, {}, {"id": "lkc-1", **body}))
+    session = _session(stub)
+    stub.keep_alive = False
+    assert session.request("POST", "/clusters", body={"n": 1}) == {"id": "lkc-1", "n": 1}
+    # the idle connection in the pool is closed by now
+    assert stub.closed.wait(5)
+
+    assert session.request("POST", "/clusters", body={"n": 2}) == {"id": "lkc-1", "n": 2}
+
+    assert [body for _, _, body in stub.requests] == [{"n": 1}, {"n": 2}]
+    # a new connection, no backoff
+    assert sleeps == []
+
+
+def test_get_retries_server_errors(stub_api, sleeps):
+    statuses = [503, 502]
+
+    def respond(method, path, body):
+        if statuses:
+            return statuses.pop(0), {}, {"error": "unavailable"}
+        return 200, {}, {"ok": True}
+
+    stub = stub_api(respond)
+
+    assert _session(stub).request("GET", "/a") == {"ok": True}
+    assert len(stub.requests) == 3
+    assert len(sleeps) == 2
+
+
+def test_post_is_not_retried_on_server_errors(stub_api, sleeps):
+    stub = stub_api(lambda method, path, body: (503, {}, {"error": "unavailable"}))
+
+    with pytest.raises(confluent_api.ApiError, match="failed with 503"):
+        _session(stub).request("POST", "/clusters", body={})
+    assert len(stub.requests) == 1
+    assert sleeps == []
+
+
+def test_errors_after_the_last_retry_are_raised(stub_api, sleeps):
+    stub = stub_api(lambda method, path, body: (500, {}, {"error": "broken"}))
+
+    with pytest.raises(confluent_api.ApiError, match="failed with 500") as raised:
+        _session(stub, retries=1).request("GET", "/a")
+    assert raised.value.body == {"error": "broken"}
+    assert len(stub.requests) == 2
+
+
+def test_base_url_without_host():
+    with pytest.raises(ValueError, match="No host"):
+        confluent_api.Session("key", "secret", "api.confluent.cloud")
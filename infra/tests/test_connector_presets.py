@@ -0,0 +1,42 @@
+"""Connector batching presets and their memory check."""
+
+import pytest
+
+import connector_presets
+import offline_config
+
+
+def test_default_preset_keeps_the_connector_config():
+    assert connector_presets.preset_config(None) == {}
+    assert connector_presets.preset_config(connector_presets.DEFAULT_PRESET) == {}
+    with pytest.raises(ValueError, match="Unknown connector preset fast"):
+        connector_presets.preset_config("fast")
+
+
+def test_presets_only_set_the_documented_queue_settings():
+    documented = {
+        "max.batch.size",
+        "max.queue.size",
+        "max.queue.size.in.bytes",
+        "poll.interval.ms",
+    }
+    for name in connector_presets.PRESETS:
+        assert set(connector_presets.preset_config(name)) <= documented
+
+
+def test_stack_default_is_the_no_op_preset():
+    config = offline_config.load_config()
+    assert config["connectorPreset"] == connector_presets.DEFAULT_PRESET
+
+
+def test_check_rejects_a_queue_above_the_budget():
+    balanced = connector_presets.preset_config("balanced")
+    # 256 MiB queue limit plus 512 records of 500 KB in the batch
+    assert connector_presets.queue_memory_bytes(balanced, 500_000) == (
+        256 * 2**20 + 512 * 500_000
+    )
+    connector_presets.check("c", balanced, 500_000)
+    with pytest.raises(ValueError, match="more than the budget of 256 MiB"):
+        connector_presets.check("c", balanced, 500_000, budget_bytes=256 * 2**20)
+    with pytest.raises(ValueError, match="must be larger than max.batch.size"):
+        connector_presets.check("c", {"max.batch.size": "10", "max.queue.size": "10"}, 1)
@@ -0,0 +1,26 @@
+"""Heartbeat connector settings and the heartbeat table SQL."""
+
+import pytest
+
+import heartbeat
+
+
+def test_heartbeat_table_needs_an_interval():
+    assert heartbeat.settings(None).config("ADMIN") == {"heartbeat.interval.ms": "0"}
+    with pytest.raises(ValueError, match="heartbeatTable needs heartbeatIntervalMs"):
+        heartbeat.settings(0, table=True)
+    config = heartbeat.settings(60000, table=True).config("ADMIN")
+    assert config["heartbeat.action.query"] == (
+        "UPDATE ADMIN.CDC_HEARTBEAT SET ts = SYSTIMESTAMP WHERE id = 1"
+    )
+
+
+def test_table_sql_grants_the_connector_user_and_alters_every_server():
+    sql = heartbeat.render_table_sql("ADMIN", "cdc_reader", ["cdc_out_1", "cdc_out_2"])
+
+    assert "GRANT UPDATE ON ADMIN.CDC_HEARTBEAT TO cdc_reader;" in sql
+    assert "cfltuser" not in sql
+    assert [line.strip() for line in sql.splitlines() if "server_name" in line] == [
+        "server_name => 'cdc_out_1',",
+        "server_name => 'cdc_out_2',",
+    ]
@@ -0,0 +1,107 @@
+"""LOB settings of a connector, their cost and the offload SQL."""
+
+import pytest
+
+import catalog
+import lob
+import oracle_schema
+import sizing
+
+SCHEMA = oracle_schema.load_schema()
+
+
+def _tables(*entries) -> list[catalog.TableSpec]:
+    return list(catalog.parse_catalog({"defaults": {"schema": "ADMIN"}, "tables": entries}))
+
+
+def test_inline_tables_fail_on_oversized_values():
+    settings = lob.connector_settings(_tables("PHARMA_EVENT"))
+    assert settings.config() == {
+        "lob.oversize.threshold": "-1",
+        "lob.oversize.handling.mode": "fail",
+    }
+
+
+def test_the_lowest_threshold_wins_and_inline_tables_are_reported():
+    settings = lob.connector_settings(
+        _tables(
+            {"name": "PHARMA_EVENT", "lob": {"strategy": "skip", "thresholdBytes": 4096}},
+            {"name": "PHARMA_NOTES_ATTACH", "lob": {"strategy": "skip"}},
+            "PHARMA_DOSE_REGIMENS",
+        )
+    )
+    assert settings.config() == {
+        "lob.oversize.threshold": "4096",
+        "lob.oversize.handling.mode": "skip",
+        "skip.value.placeholder": lob.SKIP_PLACEHOLDER,
+    }
+    (warning,) = settings.warnings
+    assert warning.startswith("ADMIN.PHARMA_DOSE_REGIMENS is inline")
+
+
+def test_offload_leaves_the_pointer_to_the_caller():
+    settings = lob.connector_settings(
+        _tables({"name": "PHARMA_EVENT", "lob": {"strategy": "offload"}})
+    )
+    assert settings.offload
+    assert "skip.value.placeholder" not in settings.config()
+    assert lob.offload_pointer("bucket") == "s3://bucket/lob-offload/"
+    assert lob.offload_key("rds1.ADMIN.T", "1", "C") == "lob-offload/rds1.ADMIN.T/1.C.lob"
+
+
+def test_skip_and_offload_tables_need_different_connectors():
+    tables = _tables(
+        {"name": "PHARMA_EVENT", "lob": {"strategy": "offload"}},
+        {"name": "PHARMA_NOTES_ATTACH", "lob": {"strategy": "skip"}},
+    )
+    with pytest.raises(ValueError, match="different connectors"):
+        lob.connector_settings(tables)
+
+
+def test_offload_uploads_the_values_above_the_margin():
+    # 500 KiB +-50%, all values are above 128 KiB
+    profile = sizing.SAMPLE_PROFILES["PHARMA_EVENT"]
+    skip = lob.estimate(profile, "skip", threshold_bytes=256 * 1024)
+    offload = lob.estimate(profile, "offload", threshold_bytes=256 * 1024)
+
+    assert skip.s3_offload_bytes_per_sec == 0
+    assert offload.broker_bytes_per_sec == skip.broker_bytes_per_sec
+    assert offload.s3_offload_bytes_per_sec == profile.rows_per_second * profile.lob_bytes
+
+
+def test_offload_sql_queues_uploads_and_schedules_the_tables():
+    tables = _tables(
+        {"name": "PHARMA_EVENT", "lob": {"strategy": "offload", "thresholdBytes": 8192}},
+        "PHARMA_NOTES_ATTACH",
+    )
+
+    sql = lob.render_offload_sql(lob.offload_tables(tables), SCHEMA, "rds1", "bucket")
+
+    assert "p_directory_name => 'LOB_OFFLOAD_PHARMA_EVENT'" in sql
+    assert "c_threshold CONSTANT INTEGER := 4096;" in sql
+    assert "WHEN 'PHARMA_EVENT' THEN 'lob-offload/rds1.ADMIN.PHARMA_EVENT/'" in sql
+    assert "AFTER INSERT OR UPDATE OF LONG_DESCRIPTION ON ADMIN.PHARMA_EVENT" in sql
+    assert "TO_CHAR(:new.EVENT_ID)" in sql
+    assert "PHARMA_NOTES_ATTACH" not in sql
+    assert "job_action      => 'ADMIN.CDC_LOB_OFFLOAD_PKG.RUN'" in sql
+
+
+def test_offload_sql_needs_a_single_column_key_and_a_captured_lob():
+    with pytest.raises(ValueError, match="no offload tables"):
+        lob.render_offload_sql([], SCHEMA, "rds1", "bucket")
+    (spec,) = _tables({"name": "T", "lob": {"strategy": "offload"}})
+    composite = oracle_schema.parse_schema(
+        "CREATE TABLE T (A NUMBER PRIMARY KEY, B NUMBER PRIMARY KEY, C CLOB);"
+    )
+    with pytest.raises(ValueError, match="single column primary key"):
+        lob.render_offload_sql([spec], composite, "rds1", "bucket")
+
+    (spec,) = _tables(
+        {
+            "name": "PHARMA_EVENT",
+            "lob": {"strategy": "offload"},
+            "columns": {"exclude": ["LONG_DESCRIPTION"]},
+        }
+    )
+    with pytest.raises(ValueError, match="no captured LOB column"):
+        lob.render_offload_sql([spec], SCHEMA, "rds1", "bucket")
@@ -0,0 +1,144 @@
+"""The stage 2 existence probes and their TTL file cache."""
+
+import json
+import threading
+
+import pytest
+
+import probes
+from probes import ProbeResult
+
+
+class StaticRoleLookup:
+    """Local stand-in for `aws.iam.get_role` backed by a set of role names."""
+
+    def __init__(self, existing: set[str], error: Exception | None = None):
+        self.existing = existing
+        self.error = error
+        self.calls: list[str] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, name: str):
+        with self._lock:
+            self.calls.append(name)
+        if self.error is not None:
+            raise self.error
+        if name not in self.existing:
+            raise Exception(f"NoSuchEntity: The role with name {name} cannot be found.")
+        return {"name": name}
+
+
+ROLES = ("tableflow-role", "dbx-role")
+
+
+def _probes(lookup: StaticRoleLookup) -> dict:
+    return {name: probes.iam_role_probe(name, lookup) for name in ROLES}
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(probes.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache_path(tmp_path) -> str:
+    return str(tmp_path / probes.DEFAULT_CACHE_PATH)
+
+
+def test_run_probes_reports_existing_and_missing_roles():
+    lookup = StaticRoleLookup({"tableflow-role"})
+
+    results = probes.run_probes(_probes(lookup))
+
+    assert results == {
+        "tableflow-role": ProbeResult.EXISTS,
+        "dbx-role": ProbeResult.NOT_FOUND,
+    }
+    assert sorted(lookup.calls) == sorted(ROLES)
+
+
+def test_run_probes_raises_transient_errors():
+    lookup = StaticRoleLookup(set(), error=Exception("Throttling: Rate exceeded"))
+
+    with pytest.raises(probes.ProbeError) as raised:
+        probes.run_probes(_probes(lookup))
+
+    message = str(raised.value)
+    assert "probe tableflow-role failed: Throttling: Rate exceeded" in message
+    assert "probe dbx-role failed" in message
+
+
+def test_cache_answers_existing_roles_until_the_ttl(cache_path, clock):
+    lookup = StaticRoleLookup({"tableflow-role"})
+    probes.run_probes(_probes(lookup), probes.ProbeCache(cache_path, 600))
+    assert len(lookup.calls) == 2
+
+    # a new cache reads the file, like the next preview
+    clock.now += 600
+    results = probes.run_probes(_probes(lookup), probes.ProbeCache(cache_path, 600))
+    assert results["tableflow-role"] == ProbeResult.EXISTS
+    # a missing role is probed again, stage 1 may have created it since
+    assert lookup.calls[2:] == ["dbx-role"]
+
+    clock.now += 1
+    probes.run_probes(_probes(lookup), probes.ProbeCache(cache_path, 600))
+    assert sorted(lookup.calls[3:]) == sorted(ROLES)
+
+
+def test_cache_stores_only_existing_roles_per_namespace(cache_path, clock):
+    lookup = StaticRoleLookup({"tableflow-role"})
+    probes.run_probes(_probes(lookup), probes.ProbeCache(cache_path, 600, "demo/dev"))
+
+    with open(cache_path) as f:
+        assert json.load(f) == {
+            "demo/dev/tableflow-role": {"result": "exists", "checked_at": 1000.0}
+        }
+    # another stack does not see the roles of dev
+    assert probes.ProbeCache(cache_path, 600, "demo/prod").get("tableflow-role") is None
+
+
+def test_cache_drops_a_role_that_was_deleted(cache_path, clock):
+    existing = StaticRoleLookup(set(ROLES))
+    probes.run_probes(_probes(existing), probes.ProbeCache(cache_path, 600))
+
+    # the TTL expired and the role is gone
+    clock.now += 601
+    deleted = StaticRoleLookup({"dbx-role"})
+    results = probes.run_probes(_probes(deleted), probes.ProbeCache(cache_path, 600))
+
+    assert results["tableflow-role"] == ProbeResult.NOT_FOUND
+    with open(cache_path) as f:
+        assert list(json.load(f)) == ["dbx-role"]
+
+
+def test_cache_keeps_entries_of_failed_probes(cache_path, clock):
+    existing = StaticRoleLookup(set(ROLES))
+    probes.run_probes(_probes(existing), probes.ProbeCache(cache_path, 600))
+    clock.now += 601
+
+    failing = StaticRoleLookup(set(), error=Exception("Throttling: Rate exceeded"))
+    with pytest.raises(probes.ProbeError):
+        probes.run_probes(_probes(failing), probes.ProbeCache(cache_path, 600))
+
+    with open(cache_path) as f:
+        assert sorted(json.load(f)) == sorted(ROLES)
+
+
+def test_unreadable_cache_file_is_ignored(cache_path):
+    with open(cache_path, "w") as f:
+        f.write("{not json")
+
+    cache = probes.ProbeCache(cache_path, 600)
+    assert cache.get("tableflow-role") is None
+    cache.put({"tableflow-role": ProbeResult.EXISTS})
+    assert cache.get("tableflow-role") == ProbeResult.EXISTS
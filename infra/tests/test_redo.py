@@ -0,0 +1,57 @@
+"""Redo rates, archive log retention and storage of the redo planner."""
+
+import pytest
+
+import oracle_schema
+import redo
+
+MIB = 2**20
+
+
+def test_catch_up_and_retention_after_an_outage():
+    # 4h of 8 MiB/s backlog mined at 32 MiB/s while 8 MiB/s keep coming in
+    plan = redo.plan(8 * MIB, 0, outage_hours=4, capture_bytes_per_sec=32 * MIB)
+
+    assert plan.catch_up_hours == pytest.approx(4 / 3)
+    assert plan.retention_hours == 6
+    assert plan.archive_bytes == 8 * MIB * 3600 * 6
+    # 168.75 GiB plus 30% head room
+    assert plan.storage_gib == 220
+    # 15 minutes of redo per log, capped at 4 GiB
+    assert plan.redo_log_size_mb == redo.MAX_REDO_LOG_MB
+
+
+def test_storage_holds_the_archive_logs_and_the_inserted_rows():
+    # the logs of the outage are kept even without redo
+    idle = redo.plan(0, 0, outage_hours=4)
+    assert (idle.catch_up_hours, idle.retention_hours, idle.storage_gib) == (0, 4, 0)
+    assert idle.redo_log_size_mb == redo.MIN_REDO_LOG_MB
+
+    # 1 MiB/s of inserts for the default hour and for a day
+    assert redo.plan(0, MIB).storage_gib == 5
+    assert redo.plan(0, MIB, load_hours=24).storage_gib == 110
+
+
+def test_plans_the_connector_cannot_catch_up_with_are_rejected():
+    with pytest.raises(ValueError, match="it never catches up"):
+        redo.plan(32 * MIB, 0, capture_bytes_per_sec=32 * MIB)
+    # 160h outage plus 10h catch-up
+    with pytest.raises(ValueError, match="kept 170 hours, RDS allows at most 168"):
+        redo.plan(MIB, 0, outage_hours=160, capture_bytes_per_sec=17 * MIB)
+
+
+def test_updates_log_the_supplemental_columns():
+    table = oracle_schema.load_schema()["PHARMA_NOTES_ATTACH"]
+    workload = redo.TableWorkload(
+        redo.sizing.TableProfile(table.name, 10, 1000), update_pct=100
+    )
+    logged = redo.supplemental_columns(table, "ALL")
+
+    minimal = redo.redo_bytes_per_second(table, workload, ())
+    full = redo.redo_bytes_per_second(table, workload, logged)
+
+    (updated,) = redo.default_update_columns(table)
+    extra = sum(
+        redo.column_bytes(table.column(c), 0) for c in logged if c != updated
+    )
+    assert full - minimal == 10 * extra
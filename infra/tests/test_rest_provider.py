@@ -0,0 +1,188 @@
+"""The RestResourceProvider lifecycle against a local stub of a Confluent API."""
+
+import urllib.parse
+from typing import Any
+
+import pytest
+
+pytest.importorskip("pulumi")
+
+import confluent_api  # noqa: E402
+import rest_provider  # noqa: E402
+
+PATH = "/things/v1/things"
+
+
+class ThingProvider(rest_provider.RestResourceProvider):
+    path = PATH
+    secret_inputs = ("token", "api_secret")
+    write_only_fields = ("token",)
+
+    def spec(self, props: dict) -> dict:
+        return {
+            "display_name": props["display_name"],
+            "config": {"size": props["size"], "token": props["token"]},
+        }
+
+
+class Things:
+    """In-memory collection answering like the Confluent APIs.
+
+    `throttled[method]` requests of a method are answered with 429 first.
+    """
+
+    def __init__(self):
+        self.resources: dict[str, dict] = {}
+        self.throttled: dict[str, int] = {}
+        self.retry_after = "0"
+        # the conftest.StubApi serving the collection
+        self.stub: Any = None
+
+    @property
+    def props(self) -> dict:
+        return {
+            "display_name": "thing",
+            "size": 1,
+            "token": "t1",
+            "api_key": "key",
+            "api_secret": "secret",
+            "base_url": self.stub.base_url,
+        }
+
+    def add(self, spec: dict) -> dict:
+        resource = {"id": f"thing-{len(self.resources) + 1}", "spec": spec}
+        self.resources[resource["id"]] = resource
+        return resource
+
+    def respond(self, method: str, path: str, body):
+        if self.throttled.get(method):
+            self.throttled[method] -= 1
+            return 429, {"Retry-After": self.retry_after}, {"error": "slow down"}
+        resource_path = urllib.parse.urlsplit(path).path
+        if resource_path == PATH and method == "GET":
+            return 200, {}, {"data": list(self.resources.values()), "metadata": {}}
+        if resource_path == PATH and method == "POST":
+            return 201, {}, self._public(self.add(body["spec"]))
+        resource = self.resources.get(resource_path.rsplit("/", 1)[1])
+        if resource is None:
+            return 404, {}, {"error": "not found"}
+        if method == "PATCH":
+            resource["spec"] = {**resource["spec"], **body["spec"]}
+        elif method == "DELETE":
+            del self.resources[resource["id"]]
+            return 204, {}, None
+        return 200, {}, self._public(resource)
+
+    def _public(self, resource: dict) -> dict:
+        # the API never returns the write-only token
+        config = {k: v for k, v in resource["spec"]["config"].items() if k != "token"}
+        return {**resource, "spec": {**resource["spec"], "config": config}}
+
+
+@pytest.fixture
+def things(stub_api):
+    collection = Things()
+    collection.stub = stub_api(collection.respond)
+    return collection
+
+
+def _writes(things) -> list[tuple]:
+    return [(m, p, b) for m, p, b in things.stub.requests if m != "GET"]
+
+
+def test_spec_is_abstract():
+    with pytest.raises(TypeError, match="abstract method spec"):
+        rest_provider.RestResourceProvider()  # type: ignore[abstract]
+
+
+def test_create_posts_the_spec(things):
+    result = ThingProvider().create(things.props)
+
+    assert result.id == "thing-1"
+    assert result.outs == {**things.props, "resource_id": "thing-1"}
+    assert _writes(things) == [
+        (
+            "POST",
+            PATH,
+            {"spec": {"display_name": "thing", "config": {"size": 1, "token": "t1"}}},
+        )
+    ]
+
+
+def test_create_adopts_a_resource_with_the_same_name(things):
+    existing = things.add({"display_name": "thing", "config": {"size": 2}})
+
+    result = ThingProvider().create(things.props)
+
+    assert result.id == existing["id"]
+    # the token cannot be compared, it is always sent when adopting
+    assert _writes(things) == [
+        (
+            "PATCH",
+            f"{PATH}/thing-1",
+            {"spec": {"config": {"size": 1, "token": "t1"}}},
+        )
+    ]
+
+
+def test_read_refreshes_and_reports_a_deleted_resource(things):
+    provider = ThingProvider()
+    created = provider.create(things.props)
+
+    assert provider.read(created.id, things.props).id == created.id
+    del things.resources[created.id]
+    assert provider.read(created.id, things.props).id is None
+
+
+def test_update_patches_only_changed_fields(things):
+    provider = ThingProvider()
+    created = provider.create(things.props)
+
+    provider.update(created.id, things.props, dict(things.props))
+    assert [m for m, _, _ in _writes(things)] == ["POST"]
+
+    renamed = {**things.props, "display_name": "renamed"}
+    result = provider.update(created.id, things.props, renamed)
+    assert _writes(things)[-1] == (
+        "PATCH",
+        f"{PATH}/thing-1",
+        {"spec": {"display_name": "renamed"}},
+    )
+    assert result.outs == {**renamed, "resource_id": "thing-1"}
+
+    # a new token is sent although the API does not return it
+    rotated = {**renamed, "token": "t2"}
+    provider.update(created.id, renamed, rotated)
+    assert _writes(things)[-1][2] == {"spec": {"config": {"size": 1, "token": "t2"}}}
+
+
+def test_delete_treats_a_missing_resource_as_deleted(things):
+    provider = ThingProvider()
+    created = provider.create(things.props)
+
+    provider.delete(created.id, things.props)
+    provider.delete(created.id, things.props)
+
+    assert things.resources == {}
+    assert [m for m, _, _ in _writes(things)] == ["POST", "DELETE", "DELETE"]
+
+
+def test_rate_limited_requests_wait_for_retry_after(things, monkeypatch):
+    waits = []
+    monkeypatch.setattr(confluent_api.time, "sleep", waits.append)
+    things.throttled["POST"] = 2
+    things.retry_after = "1.5"
+
+    result = ThingProvider().create(things.props)
+
+    assert result.id == "thing-1"
+    assert waits == [1.5, 1.5]
+    assert [m for m, _, _ in _writes(things)] == ["POST"] * 3
+
+
+def test_rate_limit_longer_than_the_maximum_fails(things):
+    things.throttled["POST"] = 1
+    things.retry_after = str(confluent_api.MAX_RATE_LIMIT_WAIT_SECONDS + 1)
+
+    with pytest.raises(confluent_api.ApiError, match="rate limited"):
+        ThingProvider().create(things.props)
@@ -0,0 +1,106 @@
+"""The simulator model of a source and its capacity check."""
+
+import catalog
+import oracle_schema
+import simulator
+import sizing
+import sources
+
+TABLES = catalog.parse_catalog(
+    {
+        "defaults": {"schema": "ADMIN"},
+        "tables": [
+            "PHARMA_EVENT",
+            {
+                "name": "PHARMA_DOSE_REGIMENS",
+                "columns": {"exclude": ["LONG_DESCRIPTION"]},
+            },
+            "PHARMA_NOTES_ATTACH",
+        ],
+    }
+)
+
+
+def _stack(entries=None, profiles=None) -> sources.OfflineStack:
+    stack_sources = sources.from_config(
+        entries, "test", "rds1", "cdc_out", 2, None, {}, "ORCL"
+    )
+    return sources.OfflineStack(
+        config={},
+        tables=TABLES,
+        sources=stack_sources,
+        profiles=profiles or {},
+        shared_tables=(),
+    )
+
+
+def test_shards_take_the_server_names_of_the_source():
+    stack = _stack([{"name": "a"}, {"name": "b", "xoutServerName": "b_out"}])
+
+    first = simulator.model_from_stack(stack, stack.sources[0], {})
+    second = simulator.model_from_stack(stack, stack.sources[1], {}, shards=3)
+
+    assert first.server_names == ["cdc_out_1", "cdc_out_2"]
+    assert second.server_names == ["b_out_1", "b_out_2", "b_out_3"]
+    assert sorted(t.shard for t in second.tables) == [0, 1, 2]
+
+
+def test_profiles_are_scaled_by_the_load_factor():
+    profile = sizing.TableProfile("PHARMA_EVENT", 10, 2000)
+    stack = _stack(
+        [{"name": "a"}, {"name": "b", "loadFactor": 2.5}], {"PHARMA_EVENT": profile}
+    )
+
+    first, second = (
+        simulator.model_from_stack(stack, source, {}) for source in stack.sources
+    )
+
+    assert first.tables[0].rows_per_second == 10
+    assert second.tables[0].rows_per_second == 25
+    assert second.tables[0].row_bytes == 2000
+
+
+def test_tables_without_a_profile_run_at_the_trial_rate_without_excluded_columns():
+    schema = oracle_schema.load_schema()
+    spec = TABLES.require("PHARMA_DOSE_REGIMENS")
+    sample = sizing.SAMPLE_PROFILES["PHARMA_DOSE_REGIMENS"]
+
+    projected = simulator.trial_profile(spec, schema)
+
+    assert projected.rows_per_second == sample.rows_per_second
+    # the CLOB makes up most of the sample rows
+    assert projected.lob_bytes == 0
+    assert projected.avg_row_bytes < 1024
+    event = simulator.trial_profile(TABLES.require("PHARMA_EVENT"), schema)
+    assert event.lob_bytes == sample.lob_bytes
+
+
+def test_overloads_report_shards_and_partitions_above_their_capacity():
+    model = simulator.PipelineModel(
+        tables=[
+            simulator.TableLoad("A", 100, 1000, partitions=1, shard=0),
+            simulator.TableLoad("B", 100, 1000, partitions=1, shard=1),
+        ],
+        server_names=["xout_1", "xout_2"],
+    )
+    assert simulator.overloads(model) == []
+
+    model.tables[1] = simulator.TableLoad("B", 2000, 1000, partitions=1, shard=1)
+    model.partition_bytes_per_sec = 1_000_000
+    (shard, partition) = simulator.overloads(model)
+    assert shard.startswith("outbound server xout_2 needs 120%")
+    assert partition == "B needs 200% of each of its 1 partitions"
+
+    model.tasks_per_shard = 2
+    assert len(simulator.overloads(model)) == 1
+
+
+def test_an_overloaded_shard_queues_without_bound():
+    model = simulator.PipelineModel(
+        tables=[simulator.TableLoad("A", 2200, 1000, partitions=4, shard=0)],
+        server_names=["xout"],
+    )
+    windows = simulator.simulate(model, duration_sec=120, window_sec=30)
+
+    depths = [w.capture_queue for w in windows]
+    assert depths == sorted(depths) and depths[-1] > depths[1] > 0
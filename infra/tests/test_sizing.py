@@ -0,0 +1,88 @@
+"""Partition count and topic configs planned from table profiles."""
+
+import pytest
+
+import oracle_schema
+import sizing
+from sizing import TableProfile
+
+
+def test_tables_without_a_profile_keep_the_original_topic():
+    assert sizing.plan_topic(None) == sizing.TopicPlan(1, {"cleanup.policy": "compact"})
+
+
+def test_sample_profile():
+    # 15 rows/s of 500 KiB, 7.3 MiB/s over partitions of 2 MiB/s
+    plan = sizing.plan_topic(sizing.SAMPLE_PROFILES["PHARMA_EVENT"])
+    assert plan.partitions == 4
+    assert plan.config == {
+        "cleanup.policy": "compact",
+        "segment.bytes": str(sizing.MAX_SEGMENT_BYTES),
+        "segment.ms": "3600000",
+        "max.message.bytes": str(sizing.DEFAULT_MAX_MESSAGE_BYTES),
+    }
+
+
+@pytest.mark.parametrize(
+    "rows_per_second, avg_row_bytes, partitions",
+    [
+        (1, 1000, 1),
+        # exactly the byte target of one partition
+        (1, sizing.PARTITION_TARGET_BYTES_PER_SEC, 1),
+        (1, sizing.PARTITION_TARGET_BYTES_PER_SEC + 1, 2),
+        # small rows are bound by the record target
+        (1000, 100, 1),
+        (2500, 100, 3),
+        (100, 200_000, 10),
+    ],
+)
+def test_partitions_by_bytes_and_records(rows_per_second, avg_row_bytes, partitions):
+    profile = TableProfile("T", rows_per_second, avg_row_bytes)
+    assert sizing.plan_partitions(profile) == partitions
+
+
+def test_partitions_above_the_limit_are_rejected():
+    with pytest.raises(ValueError, match="needs 10 partitions, more than the limit of 8"):
+        sizing.plan_partitions(TableProfile("T", 100, 200_000), max_partitions=8)
+
+
+def test_segments_roll_by_time_within_the_size_limits():
+    # 250 kB/s over 3 partitions fill 300 MB per partition in an hour
+    plan = sizing.plan_topic(TableProfile("T", 2500, 100))
+    assert plan.config["segment.bytes"] == "300000000"
+    assert plan.config["segment.ms"] == "3600000"
+
+    slow = sizing.plan_topic(TableProfile("T", 1, 1000), roll_seconds=60)
+    assert slow.config["segment.bytes"] == str(sizing.MIN_SEGMENT_BYTES)
+    assert slow.config["segment.ms"] == str(sizing.MIN_SEGMENT_MS)
+
+
+def test_max_message_bytes_has_head_room_for_the_largest_row():
+    assert sizing.plan_max_message_bytes(TableProfile("T", 1, 1000)) == (
+        sizing.DEFAULT_MAX_MESSAGE_BYTES
+    )
+    large = TableProfile("T", 1, 1000, max_row_bytes=4_000_000)
+    assert sizing.plan_max_message_bytes(large) == 5_000_000
+    with pytest.raises(ValueError, match="exceed the max.message.bytes limit"):
+        sizing.plan_max_message_bytes(TableProfile("T", 1, 1000, max_row_bytes=7_000_000))
+
+
+def test_profile_from_config_estimates_rows_from_the_schema():
+    schema = oracle_schema.load_schema()
+    values = {"rowsPerSecond": 15, "clobBytes": 512000}
+    profile = sizing.profile_from_config("PHARMA_EVENT", values, schema)
+    assert (profile.avg_row_bytes, profile.lob_bytes) == (512340, 512000)
+
+    # without the CLOB the connector drops
+    projected = sizing.profile_from_config(
+        "PHARMA_EVENT", values, schema, excluded_columns=("LONG_DESCRIPTION",)
+    )
+    assert (projected.avg_row_bytes, projected.lob_bytes) == (340, 0)
+
+
+def test_profile_from_config_validates_the_values():
+    assert sizing.profile_from_config("T", {"avgRowBytes": 800}, {}).avg_row_bytes == 800
+    with pytest.raises(ValueError, match="rowsPerSecond must not be negative"):
+        sizing.profile_from_config("T", {"rowsPerSecond": -1, "avgRowBytes": 800}, {})
+    with pytest.raises(ValueError, match="table not found in schema"):
+        sizing.profile_from_config("T", {"rowsPerSecond": 1}, {})
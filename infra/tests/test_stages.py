@@ -0,0 +1,90 @@
+"""Validation, ordering, waves and critical path of the step graph."""
+
+import pytest
+
+import stages
+from stages import GraphError, Step
+
+
+def _step(name, needs=(), provides=(), waits_for=(), duration=10.0, ran=None) -> Step:
+    return Step(
+        name,
+        run=lambda: ran.append(name) if ran is not None else None,
+        needs=needs,
+        provides=provides,
+        waits_for=waits_for,
+        duration=duration,
+    )
+
+
+def _graph(ran=None) -> stages.StepGraph:
+    # env -> cluster -> topics, env -> account, integration waits for the account
+    return stages.StepGraph(
+        [
+            _step("topics", needs=("cluster", "account"), duration=5, ran=ran),
+            _step("cluster", needs=("env",), provides=("cluster",), duration=600, ran=ran),
+            _step("integration", waits_for=("account",), duration=30, ran=ran),
+            _step("env", needs=("role",), provides=("env",), duration=5, ran=ran),
+            _step("account", needs=("env",), provides=("account",), duration=5, ran=ran),
+        ],
+        available=("role",),
+    )
+
+
+def test_order_runs_dependencies_first_in_declaration_order():
+    ran = []
+    graph = _graph(ran)
+
+    graph.run()
+
+    assert ran == ["env", "cluster", "account", "topics", "integration"]
+    assert [s.name for s in graph.order()] == ran
+    assert graph.dependencies("topics") == ["cluster", "account"]
+
+
+def test_levels_group_independent_steps():
+    assert _graph().levels() == [
+        ["env"],
+        ["cluster", "account"],
+        ["topics", "integration"],
+    ]
+
+
+def test_critical_path_follows_the_slowest_chain():
+    path, total = _graph().critical_path()
+    assert (path, total) == (["env", "cluster", "topics"], 610)
+    assert stages.StepGraph([]).critical_path() == ([], 0.0)
+
+
+def test_describe_lists_waves_and_the_critical_path():
+    lines = _graph().describe().splitlines()
+    assert lines[:3] == ["wave 0:", "  env", "wave 1:"]
+    assert "  topics (after cluster, account)" in lines
+    assert lines[-1] == "critical path (610s): env -> cluster -> topics"
+
+
+def test_validate_reports_missing_producers():
+    graph = stages.StepGraph([_step("topics", needs=("cluster",))])
+    with pytest.raises(GraphError, match="topics needs cluster but no step provides it"):
+        graph.validate()
+    # attributes set before the graph runs need no producer
+    stages.StepGraph([_step("topics", needs=("cluster",))], ("cluster",)).validate()
+
+
+def test_validate_detects_cycles():
+    graph = stages.StepGraph(
+        [
+            _step("a", needs=("c",), provides=("a",)),
+            _step("b", needs=("a",), provides=("b",)),
+            _step("c", waits_for=("b",), provides=("c",)),
+        ]
+    )
+    with pytest.raises(GraphError, match="Cycle between steps: a -> c -> b -> a"):
+        graph.validate()
+
+
+def test_duplicate_steps_and_producers_are_rejected():
+    with pytest.raises(GraphError, match="Step a declared twice"):
+        stages.StepGraph([_step("a"), _step("a")])
+    with pytest.raises(GraphError, match="x provided by both a and b"):
+        stages.StepGraph([_step("a", provides=("x",)), _step("b", provides=("x",))])
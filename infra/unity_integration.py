@@ -0,0 +1,91 @@
+"""Tableflow Unity catalog integration as a Pulumi dynamic provider.
+
+The Terraform provider has no catalog integration resource yet, so the
+integration is managed through the Tableflow REST API (see rest_provider.py
+for the create / adopt / read-diff-patch lifecycle).
+"""
+
+import pulumi
+
+import confluent_api
+import rest_provider
+
+
+class UnityIntegrationProvider(rest_provider.RestResourceProvider):
+    path = "/tableflow/v1/catalog-integrations"
+    # moving the integration to another cluster needs a new one
+    replace_inputs = ("environment_id", "kafka_cluster_id")
+    secret_inputs = ("client_secret", "api_secret")
+    write_only_fields = ("client_secret",)
+    outputs = ("resource_id", "phase")
+
+    def spec(self, props: dict) -> dict:
+        return {
+            "display_name": props["display_name"],
+            "suspended": False,
+            "config": {
+                "kind": "Unity",
+                "workspace_endpoint": props["workspace_endpoint"],
+                "catalog_name": props["catalog_name"],
+                "client_id": props["client_id"],
+                "client_secret": props["client_secret"],
+            },
+            "environment": {"id": props["environment_id"]},
+            "kafka_cluster": {"id": props["kafka_cluster_id"]},
+        }
+
+    def scope(self, props: dict) -> dict[str, str]:
+        return {
+            "environment": props["environment_id"],
+            "spec.kafka_cluster": props["kafka_cluster_id"],
+        }
+
+    def patch_body(self, props: dict, fields: list[str]) -> dict:
+        # the API locates the integration through its environment and cluster
+        scoped = [f for f in fields if f not in ("environment", "kafka_cluster")]
+        return super().patch_body(props, [*scoped, "environment", "kafka_cluster"])
+
+    def state(self, props: dict, resource: dict) -> dict:
+        return {
+            **super().state(props, resource),
+            "phase": (resource.get("status") or {}).get("phase"),
+        }
+
+
+class UnityIntegration(rest_provider.RestResource):
+    """Tableflow catalog integration publishing the tables to Unity."""
+
+    phase: pulumi.Output[str]
+
+    def __init__(
+        self,
+        name: str,
+        display_name: pulumi.Input[str],
+        workspace_endpoint: pulumi.Input[str],
+        catalog_name: pulumi.Input[str],
+        client_id: pulumi.Input[str],
+        client_secret: pulumi.Input[str],
+        environment_id: pulumi.Input[str],
+        kafka_cluster_id: pulumi.Input[str],
+        tableflow_key: pulumi.Input[str],
+        tableflow_secret: pulumi.Input[str],
+        base_url: str = confluent_api.DEFAULT_BASE_URL,
+        opts: pulumi.ResourceOptions | None = None,
+    ):
+        super().__init__(
+            UnityIntegrationProvider(),
+            name,
+            {
+                "display_name": display_name,
+                "workspace_endpoint": workspace_endpoint,
+                "catalog_name": catalog_name,
+                "client_id": client_id,
+                "client_secret": client_secret,
+                "environment_id": environment_id,
+                "kafka_cluster_id": kafka_cluster_id,
+            },
+            api_key=tableflow_key,
+            api_secret=tableflow_secret,
+            base_url=base_url,
+            opts=opts,
+        )
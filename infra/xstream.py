@@ -0,0 +1,230 @@
+"""XStream capture layout: table-to-shard planning and outbound server SQL.
+
+Each shard is captured by its own XStream outbound server and connector so
+capture of the tables is no longer serialised through a single task. Tables
+are weighted by their `tableProfiles` throughput, the signal and heartbeat
+tables are captured by every shard when enabled. The SQL for the database side
+is generated offline from the same config and catalog as the connectors:
+
+    python xstream.py --stack dev > ../sql/xstream_outbound.sql
+    python xstream.py --stack dev --source rds2 --drop
+"""
+
+import argparse
+import dataclasses
+from typing import Mapping
+
+import heartbeat
+import sizing
+import snapshot
+
+# Oracle limits XStream server names to 30 characters
+MAX_SERVER_NAME_LENGTH = 30
+
+
+@dataclasses.dataclass(frozen=True)
+class Shard:
+    """Tables captured by one outbound server and connector."""
+
+    index: int
+    server_name: str
+    tables: tuple[str, ...]
+    weight: float
+    # signal and heartbeat tables, captured by every shard
+    shared_tables: tuple[str, ...] = ()
+
+    @property
+    def captured_tables(self) -> tuple[str, ...]:
+        return self.tables + self.shared_tables
+
+    @property
+    def include_list(self) -> str:
+        """Connector table.include.list for the tables of this shard."""
+        return ",".join(self.captured_tables)
+
+
+def shard_server_name(base_name: str, index: int, shard_count: int) -> str:
+    """Outbound server name of a shard, the base name when not sharded."""
+    name = base_name if shard_count == 1 else f"{base_name}_{index + 1}"
+    if len(name) > MAX_SERVER_NAME_LENGTH:
+        raise ValueError(
+            f"XStream server name {name} exceeds {MAX_SERVER_NAME_LENGTH} characters"
+        )
+    return name
+
+
+def server_names(base_name: str, shard_count: int) -> list[str]:
+    """Outbound server names of all shards."""
+    return [shard_server_name(base_name, i, shard_count) for i in range(shard_count)]
+
+
+def table_weights(
+    tables: list[str], profiles: Mapping[str, sizing.TableProfile | None]
+) -> dict[str, float]:
+    """Weight of each <schema>.<table>, its profiled throughput or 1 without a profile."""
+    weights: dict[str, float] = {}
+    for table in tables:
+        profile = profiles.get(table.split(".")[-1])
+        weights[table] = profile.bytes_per_second if profile else 1.0
+    return weights
+
+
+def shared_tables(
+    schema_name: str, snapshot_strategy: str, heartbeat_table: bool
+) -> tuple[str, ...]:
+    """Tables every connector captures next to its shard: signal and heartbeat."""
+    tables = []
+    if snapshot_strategy == "incremental":
+        tables.append(f"{schema_name}.{snapshot.SIGNAL_TABLE}")
+    if heartbeat_table:
+        tables.append(f"{schema_name}.{heartbeat.HEARTBEAT_TABLE}")
+    return tuple(tables)
+
+
+def plan_capture(
+    tables: list[str],
+    profiles: Mapping[str, sizing.TableProfile | None],
+    shard_count: int,
+    base_server_name: str,
+    shared: tuple[str, ...] = (),
+) -> list[Shard]:
+    """Shards of the captured tables of a source, as the connectors read them."""
+    return plan_shards(
+        table_weights(tables, profiles), shard_count, base_server_name, shared
+    )
+
+
+def plan_shards(
+    table_weights: dict[str, float],
+    shard_count: int,
+    base_server_name: str,
+    shared: tuple[str, ...] = (),
+) -> list[Shard]:
+    """Spread tables over shards, balancing the summed weight per shard.
+
+    Tables are assigned heaviest first to the currently lightest shard, which
+    keeps the heaviest shard within 4/3 of the optimum.
+    """
+    if shard_count < 1:
+        raise ValueError("Shard count must be at least 1")
+    if shard_count > len(table_weights):
+        raise ValueError(
+            f"Cannot split {len(table_weights)} tables into {shard_count} shards"
+        )
+
+    assigned: list[list[str]] = [[] for _ in range(shard_count)]
+    weights = [0.0] * shard_count
+    for table, weight in sorted(
+        table_weights.items(), key=lambda item: (-item[1], item[0])
+    ):
+        lightest = weights.index(min(weights))
+        assigned[lightest].append(table)
+        weights[lightest] += weight
+
+    return [
+        Shard(
+            index=i,
+            server_name=shard_server_name(base_server_name, i, shard_count),
+            tables=tuple(sorted(tables)),
+            weight=weights[i],
+            shared_tables=shared,
+        )
+        for i, tables in enumerate(assigned)
+    ]
+
+
+def render_outbound_sql(shards: list[Shard], connect_user: str) -> str:
+    """SQL creating one outbound server per shard, see sql/xstream_setup.sql."""
+    blocks = [
+        "-- !!! change user to cfltadmin here\n"
+        "-- generated by infra/xstream.py, one outbound server per shard"
+    ]
+    shared = shards[0].shared_tables if shards else ()
+    if shared:
+        blocks[0] += (
+            f"\n-- every server also captures {', '.join(shared)}, create them first\n"
+            "-- (snapshot.py --signal-sql, sql/heartbeat_setup.sql) and skip their\n"
+            "-- ALTER_OUTBOUND blocks"
+        )
+    for shard in shards:
+        lines = [
+            f"-- shard {shard.index + 1}: {', '.join(shard.tables)}",
+            "DECLARE",
+            "  tables  DBMS_UTILITY.UNCL_ARRAY;",
+            "  schemas DBMS_UTILITY.UNCL_ARRAY;",
+            "BEGIN",
+        ]
+        for i, table in enumerate(shard.captured_tables, start=1):
+            lines.append(f"  tables({i})  := '{table}';")
+        lines += [
+            f"  tables({len(shard.captured_tables) + 1})  := NULL;",
+            "  schemas(1) := NULL;",
+            "  DBMS_XSTREAM_ADM.CREATE_OUTBOUND(",
+            f"     server_name           =>  '{shard.server_name}',",
+            "     table_names           =>  tables,",
+            "     schema_names          =>  schemas);",
+            "END;",
+            "/",
+        ]
+        blocks.append("\n".join(lines))
+
+    blocks.append(
+        "-- !!! change to the admin user here\n"
+        f"-- set the xout connect user to {connect_user}"
+    )
+    for shard in shards:
+        blocks.append(
+            "\n".join(
+                [
+                    "BEGIN",
+                    "  DBMS_XSTREAM_ADM.ALTER_OUTBOUND(",
+                    f"     server_name  => '{shard.server_name}',",
+                    f"     connect_user => '{connect_user}');",
+                    "END;",
+                    "/",
+                ]
+            )
+        )
+    return "\n\n".join(blocks) + "\n"
+
+
+def render_drop_sql(shards: list[Shard]) -> str:
+    """SQL dropping the outbound servers of all shards, see sql/xstream_drop.sql."""
+    lines = ["-- use to drop the xstream servers using the admin user", "BEGIN"]
+    for shard in shards:
+        lines.append(f"  DBMS_XSTREAM_ADM.DROP_OUTBOUND('{shard.server_name}');")
+    lines += ["END;", "/"]
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    import sources
+
+    parser = argparse.ArgumentParser(
+        description="Print the outbound server SQL of the planned XStream shards."
+    )
+    parser.add_argument("--stack")
+    parser.add_argument("--source", help="name of the source, defaults to the first")
+    parser.add_argument("--shards", type=int, help="defaults to xstreamShards")
+    parser.add_argument("--server-name", help="defaults to xoutServerName")
+    parser.add_argument("--connect-user", help="defaults to rds:cfltUserName")
+    parser.add_argument("--drop", action="store_true", help="render drop SQL")
+    args = parser.parse_args()
+
+    stack = sources.offline_stack(args.stack)
+    try:
+        source = sources.find(stack.sources, args.source)
+        planned = plan_capture(
+            stack.tables.qualified_names(),
+            stack.profiles,
+            args.shards or source.xstream_shards,
+            args.server_name or source.xout_server_name,
+            stack.shared_tables,
+        )
+    except ValueError as e:
+        raise SystemExit(str(e))
+    if args.drop:
+        print(render_drop_sql(planned), end="")
+    else:
+        connect_user = args.connect_user or stack.config.get("rds:cfltUserName")
+        print(render_outbound_sql(planned, connect_user or "cfltuser"), end="")
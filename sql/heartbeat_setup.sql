@@ -0,0 +1,21 @@
+-- generated by infra/heartbeat.py (python heartbeat.py --sql)
+-- heartbeat table updated by heartbeat.action.query, create as the admin user
+-- connector user cfltuser, outbound servers xout
+CREATE TABLE ADMIN.CDC_HEARTBEAT (
+    id NUMBER(1) PRIMARY KEY,
+    ts TIMESTAMP NOT NULL
+);
+INSERT INTO ADMIN.CDC_HEARTBEAT (id, ts) VALUES (1, SYSTIMESTAMP);
+COMMIT;
+ALTER TABLE ADMIN.CDC_HEARTBEAT
+  ADD SUPPLEMENTAL LOG GROUP CDC_HEARTBEAT_LOG (ID, TS) ALWAYS;
+GRANT UPDATE ON ADMIN.CDC_HEARTBEAT TO cfltuser;
+
+-- !!! change user to cfltadmin here, add the heartbeat table to the outbound servers
+BEGIN
+  DBMS_XSTREAM_ADM.ALTER_OUTBOUND(
+     server_name => 'xout',
+     table_names => 'ADMIN.CDC_HEARTBEAT',
+     add         => TRUE);
+END;
+/
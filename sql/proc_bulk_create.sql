@@ -0,0 +1,205 @@
+-- Set-based variant of proc_create.sql / proc_create_update.sql for load tests
+-- CLOB blocks are built once per run and rows are inserted with FORALL bulk binds.
+-- Rates are per table and per second; p_bytes_per_second (if > 0) sizes the CLOBs
+-- so that rows/s * CLOB size matches the requested byte rate.
+CREATE OR REPLACE PROCEDURE generate_trial_data_bulk (
+  p_duration_seconds  IN NUMBER DEFAULT 10,
+  p_rows_per_second   IN PLS_INTEGER DEFAULT 15,
+  p_bytes_per_second  IN NUMBER DEFAULT 0,
+  p_update_pct        IN NUMBER DEFAULT 0,  -- share of new events updated again
+  p_delete_pct        IN NUMBER DEFAULT 0   -- share of new notes deleted again
+) AS
+  TYPE varchar_list IS TABLE OF VARCHAR2(500) INDEX BY PLS_INTEGER;
+  TYPE number_list IS TABLE OF NUMBER INDEX BY PLS_INTEGER;
+  TYPE clob_list IS TABLE OF CLOB INDEX BY PLS_INTEGER;
+  TYPE date_list IS TABLE OF DATE INDEX BY PLS_INTEGER;
+  TYPE ts_list IS TABLE OF TIMESTAMP INDEX BY PLS_INTEGER;
+
+  c_block_count CONSTANT PLS_INTEGER := 8; -- distinct CLOB values reused per run
+  v_clob_bytes  PLS_INTEGER := 500 * 1024;
+  v_blocks      clob_list;
+  v_sentences   varchar_list;
+  v_event_types varchar_list;
+  v_frequencies varchar_list;
+  v_statuses    varchar_list;
+  v_att_types   varchar_list;
+
+  -- bind arrays, one slot per row of the current second
+  v_event_ids    number_list;
+  v_regimen_ids  number_list;
+  v_note_ids     number_list;
+  v_patient_ids  number_list;
+  v_trial_ids    number_list;
+  v_numbers_a    number_list;
+  v_numbers_b    number_list;
+  v_texts_a      varchar_list;
+  v_texts_b      varchar_list;
+  v_texts_c      varchar_list;
+  v_dates_a      date_list;
+  v_dates_b      date_list;
+  v_timestamps   ts_list;
+  v_clobs        clob_list;
+  v_change_ids   number_list;
+
+  v_started TIMESTAMP;
+  v_elapsed NUMBER;
+
+  -- CLOB of p_bytes bytes, doubled with DBMS_LOB.APPEND instead of || in a loop
+  FUNCTION build_block(p_bytes IN PLS_INTEGER) RETURN CLOB IS
+    v_seed  VARCHAR2(32767);
+    v_block CLOB;
+    v_copy  CLOB;
+  BEGIN
+    WHILE LENGTH(v_seed) IS NULL OR LENGTH(v_seed) < 4000 LOOP
+      v_seed := v_seed || v_sentences(TRUNC(DBMS_RANDOM.VALUE(1, 11))) || ' ';
+    END LOOP;
+    DBMS_LOB.CREATETEMPORARY(v_block, TRUE);
+    DBMS_LOB.WRITEAPPEND(v_block, LENGTH(v_seed), v_seed);
+    WHILE DBMS_LOB.GETLENGTH(v_block) < p_bytes LOOP
+      v_copy := v_block;
+      DBMS_LOB.APPEND(v_block, v_copy);
+    END LOOP;
+    DBMS_LOB.TRIM(v_block, p_bytes);
+    RETURN v_block;
+  END;
+BEGIN
+  v_sentences(1) := 'Patient reported mild headache after taking the medication.';
+  v_sentences(2) := 'Dosage adjustment made based on recent lab results.';
+  v_sentences(3) := 'Patient compliance has been excellent throughout the trial.';
+  v_sentences(4) := 'Adverse event documented and reported to regulatory authorities.';
+  v_sentences(5) := 'Follow-up appointment scheduled for next week.';
+  v_sentences(6) := 'Medication batch number verified and recorded.';
+  v_sentences(7) := 'Patient education provided regarding proper administration.';
+  v_sentences(8) := 'Vital signs within normal range during visit.';
+  v_sentences(9) := 'Query regarding side effects addressed satisfactorily.';
+  v_sentences(10) := 'Progress notes updated in patient record.';
+
+  v_event_types(1) := 'baseline';
+  v_event_types(2) := 'follow-up';
+  v_event_types(3) := 'adverse_event';
+  v_event_types(4) := 'dose_administered';
+  v_event_types(5) := 'lab_visit';
+
+  v_frequencies(1) := 'once daily';
+  v_frequencies(2) := 'twice daily';
+  v_frequencies(3) := 'every 8 hours';
+  v_frequencies(4) := 'every 12 hours';
+  v_frequencies(5) := 'as needed';
+
+  v_statuses(1) := 'scheduled';
+  v_statuses(2) := 'missed';
+  v_statuses(3) := 'completed';
+  v_statuses(4) := 'active';
+  v_statuses(5) := 'completed';
+
+  v_att_types(1) := 'pdf';
+  v_att_types(2) := 'image';
+  v_att_types(3) := 'document';
+  v_att_types(4) := 'spreadsheet';
+  v_att_types(5) := 'presentation';
+
+  IF p_bytes_per_second > 0 THEN
+    v_clob_bytes := GREATEST(1, TRUNC(p_bytes_per_second / p_rows_per_second));
+  END IF;
+
+  -- build the CLOB blocks once, rows reuse them round robin
+  FOR b IN 1..c_block_count LOOP
+    v_blocks(b) := build_block(v_clob_bytes);
+  END LOOP;
+
+  FOR sec IN 1..p_duration_seconds LOOP
+    v_started := SYSTIMESTAMP;
+
+    -- events
+    FOR i IN 1..p_rows_per_second LOOP
+      v_patient_ids(i) := TRUNC(DBMS_RANDOM.VALUE(1000, 9999));
+      v_trial_ids(i) := TRUNC(DBMS_RANDOM.VALUE(100, 999));
+      v_texts_a(i) := v_event_types(TRUNC(DBMS_RANDOM.VALUE(1, 6)));
+      v_texts_b(i) := v_statuses(TRUNC(DBMS_RANDOM.VALUE(1, 3)));
+      v_timestamps(i) := SYSTIMESTAMP - INTERVAL '30' DAY + INTERVAL '1' SECOND * TRUNC(DBMS_RANDOM.VALUE(0, 2592000));
+      v_numbers_a(i) := TRUNC(DBMS_RANDOM.VALUE(10, 99));
+      v_numbers_b(i) := TRUNC(DBMS_RANDOM.VALUE(100, 999));
+      v_clobs(i) := v_blocks(MOD(sec * p_rows_per_second + i, c_block_count) + 1);
+    END LOOP;
+    FORALL i IN 1..p_rows_per_second
+      INSERT INTO pharma_event (
+        patient_id, trial_id, event_type, event_date, description,
+        status, site_id, investigator_id, long_description
+      ) VALUES (
+        v_patient_ids(i), v_trial_ids(i), v_texts_a(i), v_timestamps(i),
+        'Generated event for testing purposes',
+        v_texts_b(i), v_numbers_a(i), v_numbers_b(i), v_clobs(i)
+      ) RETURNING event_id BULK COLLECT INTO v_event_ids;
+
+    -- dose regimens referencing the events of this second
+    FOR i IN 1..p_rows_per_second LOOP
+      v_numbers_a(i) := v_event_ids(TRUNC(DBMS_RANDOM.VALUE(1, p_rows_per_second + 1)));
+      v_patient_ids(i) := TRUNC(DBMS_RANDOM.VALUE(1000, 9999));
+      v_numbers_b(i) := TRUNC(DBMS_RANDOM.VALUE(100, 999));
+      v_trial_ids(i) := TRUNC(DBMS_RANDOM.VALUE(100, 999));
+      v_texts_a(i) := v_frequencies(TRUNC(DBMS_RANDOM.VALUE(1, 6)));
+      v_texts_b(i) := TRUNC(DBMS_RANDOM.VALUE(10, 500)) || 'mg';
+      v_texts_c(i) := v_statuses(TRUNC(DBMS_RANDOM.VALUE(4, 6)));
+      v_dates_a(i) := SYSDATE + TRUNC(DBMS_RANDOM.VALUE(0, 30));
+      v_dates_b(i) := SYSDATE + TRUNC(DBMS_RANDOM.VALUE(30, 365));
+      v_clobs(i) := v_blocks(MOD(sec * p_rows_per_second + i + 1, c_block_count) + 1);
+    END LOOP;
+    FORALL i IN 1..p_rows_per_second
+      INSERT INTO pharma_dose_regimens (
+        event_id, patient_id, medication_id, trial_id, frequency, dosage_amount,
+        start_date, end_date, instructions, status, long_description
+      ) VALUES (
+        v_numbers_a(i), v_patient_ids(i), v_numbers_b(i), v_trial_ids(i),
+        v_texts_a(i), v_texts_b(i), v_dates_a(i), v_dates_b(i),
+        'Take with food. Do not crush tablets.', v_texts_c(i), v_clobs(i)
+      ) RETURNING regimen_id BULK COLLECT INTO v_regimen_ids;
+
+    -- notes referencing the regimens of this second
+    FOR i IN 1..p_rows_per_second LOOP
+      v_numbers_a(i) := v_regimen_ids(TRUNC(DBMS_RANDOM.VALUE(1, p_rows_per_second + 1)));
+      v_texts_b(i) := v_att_types(TRUNC(DBMS_RANDOM.VALUE(1, 6)));
+      v_texts_a(i) := '/attachments/trial_' || TRUNC(DBMS_RANDOM.VALUE(1000, 9999)) || '.' || v_texts_b(i);
+      v_numbers_b(i) := TRUNC(DBMS_RANDOM.VALUE(100, 999));
+      v_clobs(i) := v_blocks(MOD(sec * p_rows_per_second + i + 2, c_block_count) + 1);
+    END LOOP;
+    FORALL i IN 1..p_rows_per_second
+      INSERT INTO pharma_notes_attach (
+        regimen_id, note_text, attachment_path, attachment_type, created_by
+      ) VALUES (
+        v_numbers_a(i), v_clobs(i), v_texts_a(i), v_texts_b(i), v_numbers_b(i)
+      ) RETURNING note_id BULK COLLECT INTO v_note_ids;
+
+    -- update mix: complete a share of the new events
+    v_change_ids.DELETE;
+    FOR i IN 1..TRUNC(p_rows_per_second * p_update_pct / 100) LOOP
+      v_change_ids(i) := v_event_ids(i);
+    END LOOP;
+    FORALL i IN 1..v_change_ids.COUNT
+      UPDATE pharma_event SET status = 'completed' WHERE event_id = v_change_ids(i);
+
+    -- delete mix: notes have no dependants and can be removed directly
+    v_change_ids.DELETE;
+    FOR i IN 1..TRUNC(p_rows_per_second * p_delete_pct / 100) LOOP
+      v_change_ids(i) := v_note_ids(i);
+    END LOOP;
+    FORALL i IN 1..v_change_ids.COUNT
+      DELETE FROM pharma_notes_attach WHERE note_id = v_change_ids(i);
+
+    COMMIT;
+
+    -- sleep for the rest of the second to hold the requested rate
+    v_elapsed := EXTRACT(SECOND FROM (SYSTIMESTAMP - v_started))
+               + 60 * EXTRACT(MINUTE FROM (SYSTIMESTAMP - v_started));
+    IF v_elapsed < 1 THEN
+      DBMS_LOCK.SLEEP(1 - v_elapsed);
+    END IF;
+  END LOOP;
+
+  FOR b IN 1..c_block_count LOOP
+    DBMS_LOB.FREETEMPORARY(v_blocks(b));
+  END LOOP;
+END;
+/
+
+-- To execute, e.g. 60 seconds at 50 rows/s and 10 MB/s per table, 20% updates, 5% deletes:
+-- EXEC generate_trial_data_bulk(60, 50, 10485760, 20, 5);
@@ -1,14 +1,36 @@
 -- !!! log in with the admin user
 
--- enable suppelmental logging
+-- enable supplemental logging for the captured tables only, instead of ALL
+-- columns database-wide; regenerate with `python supplemental_logging.py`
+-- (run in infra) when the table catalog or column lists change
+-- generated by infra/supplemental_logging.py
+-- minimal supplemental logging is required for capture
 begin
     rdsadmin.rdsadmin_util.alter_supplemental_logging(
-        p_action => 'ADD',
-        p_type   => 'ALL');
+        p_action => 'ADD');
 end;
 /
 
+-- when upgrading from database-wide ALL column logging, drop it
+-- begin
+--     rdsadmin.rdsadmin_util.alter_supplemental_logging(
+--         p_action => 'DROP',
+--         p_type   => 'ALL');
+-- end;
+-- /
+
+ALTER TABLE ADMIN.PHARMA_DOSE_REGIMENS
+  ADD SUPPLEMENTAL LOG GROUP CDC_PHARMA_DOSE_REGIMENS (REGIMEN_ID, EVENT_ID, PATIENT_ID, MEDICATION_ID, TRIAL_ID, FREQUENCY, DOSAGE_AMOUNT, START_DATE, END_DATE, INSTRUCTIONS, STATUS, CREATED_AT) ALWAYS;
+
+ALTER TABLE ADMIN.PHARMA_EVENT
+  ADD SUPPLEMENTAL LOG GROUP CDC_PHARMA_EVENT (EVENT_ID, PATIENT_ID, TRIAL_ID, EVENT_TYPE, EVENT_DATE, DESCRIPTION, STATUS, SITE_ID, INVESTIGATOR_ID, CREATED_AT) ALWAYS;
+
+ALTER TABLE ADMIN.PHARMA_NOTES_ATTACH
+  ADD SUPPLEMENTAL LOG GROUP CDC_PHARMA_NOTES_ATTACH (NOTE_ID, REGIMEN_ID, ATTACHMENT_PATH, ATTACHMENT_TYPE, CREATED_BY, CREATED_AT) ALWAYS;
+
 -- enable archivelog retention
+-- 24 hours fits the demo, `python redo.py` (run in infra) sizes retention and
+-- storage for the configured tableProfiles
 begin
     rdsadmin.rdsadmin_util.set_configuration(
         name  => 'archivelog retention hours',
@@ -53,6 +75,8 @@ GRANT FLASHBACK ANY TABLE TO cfltuser;
 -- !!! change user to cfltadmin here
 -- setup xstream outbound with the tables you want to xstream
 -- make sure the server_name matches config rds:xoutServerName in Pulumi.yaml
+-- when rds:xstreamShards > 1, replace the two blocks below with the output of
+-- `python xstream.py --stack <stack>` run from the infra directory
 DECLARE
   tables  DBMS_UTILITY.UNCL_ARRAY;
   schemas DBMS_UTILITY.UNCL_ARRAY;